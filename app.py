@@ -1,215 +1,193 @@
+import json
+import tempfile
+import time
+import zipfile
+from io import BytesIO
 import streamlit as st
-import feedparser
 import pandas as pd
 from datetime import datetime
-import time
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont 
+
+from hotnews.batch import BATCH_RATIOS, render_cards_zip
+from hotnews.export import EXPORT_FORMATS, export_filename, export_report
+from hotnews.feed_cache import get_feed_cache
+from hotnews.feeds import RSS_FEEDS, TOP_N
+from hotnews.poller import FeedPoller
+from hotnews.fonts import font_registry
+from hotnews.history import export_history
+from hotnews.metrics import ProfilerBusy, RunProfiler, get_metrics
+from hotnews.card_templates import get_card_registry
+from hotnews.encoding import FORMATS, available_formats, encode_image
+from hotnews.render import FONT_FILE_PATH, PREVIEW_SCALE, render_card_bytes, render_preview
+from hotnews.shared_cache import get_shared_cache
+from hotnews.store import latest_report, trending_report
 
 # 由於已移除 AI 功能，相關的 API 設定和 requests 庫已不再需要
+# RSS 來源設定與並行抓取引擎位於 hotnews/feeds.py，背景輪詢器位於 hotnews/poller.py
+
+
+@st.cache_resource
+def get_poller():
+    """整個 Streamlit 程序只啟動一個背景輪詢器，所有使用者共用同一個文章庫。"""
+    poller = FeedPoller()
+    poller.start()
+    return poller
+
+
+@st.cache_resource
+def preload_fonts():
+    """程序啟動時預先載入卡片用的字型，並回傳字型狀態提示 (只需計算一次)。"""
+    card_registry = get_card_registry()
+    font_registry.preload(sorted(
+        set(card_registry.font_sizes(["1:1", "4:3"])) | set(card_registry.font_sizes(["1:1", "4:3"], PREVIEW_SCALE))
+    ))
+    return font_registry.diagnostics()
 
-# 5 個網站的 RSS
-RSS_FEEDS = {
-    "妞新聞": "https://www.niusnews.com/feed",
-    "Women's Health TW": "https://www.womenshealthmag.com/tw/rss/all.xml",
-    "BEAUTY美人圈": "https://www.beauty321.com/feed_pin",
-    "A Day Magazine": "https://www.adaymag.com/feed",
-    "The Femin": "https://thefemin.com/category/editorial/issue/feed"
-}
-
-# ================= 輔助函式 (原有的 RSS 處理) =================
-
-def parse_entries(entries):
-    parsed_list = []
-    for entry in entries:
-        published_time = None
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            published_time = datetime(*entry.published_parsed[:6])
-        elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-            published_time = datetime(*entry.updated_parsed[:6])
-        if not published_time:
-            published_time = datetime.now()
-
-        parsed_list.append({
-            "標題": entry.title if "title" in entry else "(無標題)",
-            "連結": entry.link if "link" in entry else "",
-            "發佈時間": published_time.strftime("%Y-%m-%d %H:%M"),
-            "來源": ""
-        })
-    return parsed_list
-
-def fetch_top5_each_site():
-    all_entries = []
-    for site, url in RSS_FEEDS.items():
-        feed = feedparser.parse(url)
-        if not feed.entries:
-            continue
-
-        entries = parse_entries(feed.entries)
-        entries_sorted = entries[:5]
-        for item in entries_sorted:
-            item["來源"] = site
-        all_entries.extend(entries_sorted)
-
-        time.sleep(1)
-
-    all_entries.sort(key=lambda x: x["發佈時間"], reverse=True)
-    return pd.DataFrame(all_entries)
-
-# ================= 視覺內容生成 (Pillow 實現) =================
-
-# 根據您的檔案結構截圖，路徑修正為 ".devcontainer/NotoSansTC-Bold.ttf"
-FONT_FILE_PATH = ".devcontainer/NotoSansTC-Bold.ttf" 
-
-def get_font(size, bold=False):
+
+REPORT_TTL = 60  # 報表在所有 session 間共用的秒數
+
+
+def build_report(poller):
+    df = latest_report(poller.store, TOP_N, sites=RSS_FEEDS)
+    if df.empty:
+        # 剛啟動、背景輪詢尚未完成第一輪時，直接同步抓取一次
+        poller.tick(force=True)
+        df = latest_report(poller.store, TOP_N, sites=RSS_FEEDS)
+    return df
+
+
+def get_report(force_refresh=False):
     """
-    嘗試載入明確指定的 CJK 字型檔案。
+    取得跨 session 共用的報表。多個 session 同時要求時只會執行一次 (single-flight)；
+    強制重新整理會立即抓取所有來源，同時按下的其他 session 會共用這次結果。
     """
-    try:
-        # 強制使用上傳的字型檔路徑
-        return ImageFont.truetype(FONT_FILE_PATH, size)
-    except IOError:
-        # 如果找不到指定檔案，則退回預設字型並發出警告
-        st.warning(f"⚠️ 嚴重警告：找不到字型檔案 '{FONT_FILE_PATH}'。請確認檔案已上傳至應用程式根目錄。")
-        return ImageFont.load_default()
-
-def generate_visual_content(title, ratio='1:1', uploaded_file=None):
+    poller = get_poller()
+    cache = get_shared_cache()
+    if force_refresh:
+        cache.get_or_compute("feeds", lambda: poller.tick(force=True), ttl=REPORT_TTL, force=True)
+    return cache.get_or_compute(("report", TOP_N), lambda: build_report(poller), ttl=REPORT_TTL, force=force_refresh)
+
+
+def debug_sidebar(rerun_started, profiler, profiler_busy=None):
     """
-    使用 Pillow 函式庫，在伺服器端生成帶有文章標題的圖片模板。
-    Args:
-        title (str): 文章標題。
-        ratio (str): 圖片比例 ('1:1' 或 '4:3')。
-        uploaded_file (Optional): 上傳的背景圖片檔案。
+    效能偵錯側邊欄：本次重新執行的計時明細、累計統計與匯出，以及單次 cProfile / tracemalloc 分析。
+    開關只決定這個 session 是否顯示面板；計時與計數是否收集由環境變數 HOTNEWS_METRICS 決定 (整個程序共用)。
+    profiler_busy 為無法開始分析時的原因 (另一個 session 正在分析)。
     """
-    # 定義尺寸 (1000px max dimension)
-    MAX_DIM = 1000
-    if ratio == '4:3': # 3:4 直式版型 (750x1000)
-        WIDTH = int(MAX_DIM * 3 / 4) # 750
-        HEIGHT = MAX_DIM # 1000
-    else: # 1:1 (1000x1000)
-        WIDTH = MAX_DIM # 1000
-        HEIGHT = MAX_DIM # 1000
-    
-    # 1. 載入背景圖或建立基礎圖
-    if uploaded_file is not None:
-        try:
-            img = Image.open(uploaded_file).convert("RGB")
-            
-            # START: 圖片置中裁剪邏輯以保持比例
-            img_width, img_height = img.size
-            target_ratio = WIDTH / HEIGHT
-            
-            if img_width / img_height > target_ratio:
-                # 圖片太寬，按高度縮放，寬度裁剪
-                new_height = HEIGHT
-                new_width = int(img_width * (HEIGHT / img_height))
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # 置中裁剪
-                left = (new_width - WIDTH) / 2
-                top = 0
-                right = left + WIDTH
-                bottom = HEIGHT
-            else:
-                # 圖片太高，按寬度縮放，高度裁剪
-                new_width = WIDTH
-                new_height = int(img_height * (WIDTH / img_width))
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # 置中裁剪
-                left = 0
-                top = (new_height - HEIGHT) / 2
-                right = WIDTH
-                bottom = top + HEIGHT
-            
-            img = img.crop((int(left), int(top), int(right), int(bottom)))
-            # END: 圖片置中裁剪邏輯以保持比例
-            
-        except Exception:
-            img = Image.new('RGB', (WIDTH, HEIGHT), color='#1e3a8a')
-    else:
-        img = Image.new('RGB', (WIDTH, HEIGHT), color='#1e3a8a')
+    metrics = get_metrics()
+    with st.sidebar:
+        if not st.toggle("🐞 效能偵錯", key="debug_metrics"):
+            return
+        if metrics.enabled:
+            metrics_panel(metrics, rerun_started)
+        else:
+            st.info("計時與計數未開啟：以環境變數 HOTNEWS_METRICS=1 啟動後才會收集 (整個程序共用，包含背景輪詢)。")
 
+        st.toggle("🔬 分析下一次重新執行 (cProfile + tracemalloc)", key="profile_next_rerun")
+        if profiler_busy:
+            st.warning(f"無法分析這次重新執行：{profiler_busy}")
+        if profiler is not None:
+            st.markdown(f"##### 分析結果 ({profiler.seconds * 1000:.0f} ms，記憶體峰值 {profiler.peak_bytes / 1024 / 1024:.1f} MB)")
+            st.code(profiler.stats_text, language=None)
+            st.dataframe(pd.DataFrame(
+                [{"位置": where, "新增 KB": round(size / 1024, 1), "配置數": count}
+                 for where, size, count in profiler.allocations]
+            ), hide_index=True)
 
-    # 2. 新增底部半透明黑色遮罩 (Overlay)
-    OVERLAY_HEIGHT_RATIO = 0.15 
-    BOTTOM_GAP_RATIO = 0.10 
-    
-    OVERLAY_END_Y = int(HEIGHT * (1.0 - BOTTOM_GAP_RATIO)) 
-    OVERLAY_START_Y = int(HEIGHT * (1.0 - BOTTOM_GAP_RATIO - OVERLAY_HEIGHT_RATIO)) 
-    
-    overlay = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-    overlay_draw = ImageDraw.Draw(overlay)
-    
-    opacity = 180 
-    overlay_draw.rectangle([0, OVERLAY_START_Y, WIDTH, OVERLAY_END_Y], fill=(0, 0, 0, opacity))
-    
-    img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
-    draw = ImageDraw.Draw(img) 
 
-    # 3. 繪製文章標題 (置中靠下，在遮罩上)
-    
-    article_to_display = title or "請輸入文章標題以跟風熱點..."
-    
-    ARTICLE_FONT_SIZE = 40 
-    
-    article_font = get_font(ARTICLE_FONT_SIZE, bold=True) 
-    
-    # 實現多行自動換行
-    CHAR_LIMIT = 24 if WIDTH < 1000 else 36 
-    
-    # 支援 st.text_area 輸入的換行符號
-    final_lines = []
-    user_defined_lines = article_to_display.split('\n')
-    
-    for user_line in user_defined_lines:
-        current_line = ""
-        
-        # 對每一行應用自動換行邏輯 (防止單行過長)
-        for char in user_line:
-            if len(current_line) < CHAR_LIMIT:
-                current_line += char
-            else:
-                # 達到 CHAR_LIMIT，強制換行
-                final_lines.append(current_line)
-                current_line = char
-        
-        # 確保行尾的剩餘文字被加入
-        if current_line:
-            final_lines.append(current_line)
+def reset_metrics_baseline(metrics):
+    """清除統計只影響這個 session：記下目前的統計作為基準，之後只顯示基準之後的變化。"""
+    st.session_state.metrics_baseline = metrics.snapshot()
 
-    # 移除空行並清理
-    lines = [line.strip() for line in final_lines if line.strip()] 
-
-    # 定位：將文字區塊垂直置中於新的遮罩區塊內
-    line_height = ARTICLE_FONT_SIZE * 1.3 
-    total_text_height = len(lines) * line_height
-
-    # 計算新遮罩區塊的垂直中心點 (75% to 90%)
-    Y_OVERLAY_CENTER = (OVERLAY_START_Y + OVERLAY_END_Y) / 2
-    
-    # 計算文字區塊的起始 Y 座標，使其中心點對齊遮罩中心點
-    y_start = Y_OVERLAY_CENTER - (total_text_height / 2) 
-
-    # 繪製
-    for i, line in enumerate(lines):
-        draw.text((WIDTH / 2, y_start + i * line_height), 
-                  line, 
-                  fill="#ffffff", 
-                  font=article_font, 
-                  anchor="mt")
-    
-    return img
 
+def metrics_panel(metrics, rerun_started):
+    """
+    本次重新執行的計時明細、累計統計與匯出 (需在側邊欄內呼叫)。
+    累計統計與 JSON 匯出從這個 session 上次清除後算起；Prometheus 匯出一律為整個程序的累計值。
+    """
+    spans = metrics.recent(since=rerun_started)
+    st.markdown("##### 本次重新執行")
+    if spans:
+        st.dataframe(pd.DataFrame([
+            {
+                "區段": span["name"],
+                "標籤": ", ".join(f"{k}={v}" for k, v in span["labels"].items()),
+                "毫秒": round(span["seconds"] * 1000, 2),
+                "執行緒": span["thread"],
+            }
+            for span in spans
+        ]), hide_index=True)
+
+    baseline = st.session_state.get("metrics_baseline")
+    snapshot = metrics.snapshot_since(baseline)
+    st.markdown("##### 累計 (清除後)" if baseline else "##### 累計")
+    st.dataframe(pd.DataFrame([
+        {
+            "區段": span["name"],
+            "標籤": ", ".join(f"{k}={v}" for k, v in span["labels"].items()),
+            "次數": span["count"],
+            "平均 ms": round(span["mean"] * 1000, 2),
+            "最大 ms": round(span["max"] * 1000, 2) if span["max"] is not None else None,
+        }
+        for span in snapshot["spans"]
+    ]), hide_index=True)
+    if snapshot["counters"]:
+        st.dataframe(pd.DataFrame([
+            {
+                "計數器": counter["name"],
+                "標籤": ", ".join(f"{k}={v}" for k, v in counter["labels"].items()),
+                "值": counter["value"],
+            }
+            for counter in snapshot["counters"]
+        ]), hide_index=True)
+    col_json, col_prom = st.columns(2)
+    col_json.download_button("JSON", data=lambda: json.dumps(metrics.snapshot_since(baseline), ensure_ascii=False, indent=2),
+                             file_name="hotnews_metrics.json", mime="application/json", on_click="ignore")
+    col_prom.download_button("Prometheus", data=metrics.to_prometheus, file_name="hotnews_metrics.prom",
+                             mime="text/plain", on_click="ignore")
+    st.button("🧹 清除統計", on_click=reset_metrics_baseline, args=(metrics,))
+
+
+# 本次重新執行的開始時間；偵錯側邊欄只列出之後結束的計時區段
+rerun_started = time.time()
+rerun_clock = time.perf_counter()
+profiler = None
+profiler_busy = None
+# 上一次分析的重新執行中途結束 (例如 st.rerun()) 時沒有執行到 stop()，在這裡釋放分析器
+leftover_profiler = st.session_state.pop("running_profiler", None)
+if leftover_profiler is not None:
+    leftover_profiler.stop()
+if st.session_state.get("profile_next_rerun"):
+    # 只分析一次：在元件建立前關閉開關
+    st.session_state.profile_next_rerun = False
+    try:
+        profiler = st.session_state.running_profiler = RunProfiler().start()
+    except ProfilerBusy as exc:
+        profiler_busy = str(exc)
 
 # ================= Streamlit UI (主程式) =================
 
 st.title("📰 熱門新聞報表工具 (RSS)")
 
 # 報表產生區
+force_refresh = st.checkbox("🔄 強制重新抓取 (略過快取)")
+st.radio(
+    "報表匯出格式：",
+    list(EXPORT_FORMATS),
+    format_func=lambda fmt: EXPORT_FORMATS[fmt]["label"],
+    key="export_format",
+    horizontal=True
+)
 if st.button("📊 產生最新報表"):
-    df = fetch_top5_each_site()
+    poller = get_poller()
+    df = get_report(force_refresh)
     st.session_state.df = df 
+
+    shared_stats = get_shared_cache().stats()
+    report_age = get_shared_cache().age(("report", TOP_N)) or 0
+    st.caption(
+        f"共用報表快取：命中 {shared_stats['hits'] + shared_stats['deduplicated']}、"
+        f"未命中 {shared_stats['misses']}，資料產生於 {report_age:.0f} 秒前"
+    )
     
     if df.empty:
         st.warning("⚠️ 沒有抓到任何文章。")
@@ -217,20 +195,51 @@ if st.button("📊 產生最新報表"):
         st.success("✅ 報表已產生！")
         st.dataframe(df)
 
-        # 轉換為 Excel 並下載
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
-        excel_data = output.getvalue()
+        st.markdown("##### 🔥 正在升溫的話題")
+        hot_df = trending_report(poller.store)
+        if hot_df.empty:
+            st.caption("累積的文章還不足以判斷趨勢。")
+        else:
+            st.dataframe(hot_df)
+
+        with st.expander("⏱️ 各來源更新狀態"):
+            st.dataframe(pd.DataFrame([
+                {
+                    "來源": site,
+                    "上次成功": datetime.fromtimestamp(state["last_success"]).strftime("%H:%M:%S") if state["last_success"] else "",
+                    "下次更新": datetime.fromtimestamp(state["next_due"]).strftime("%H:%M:%S"),
+                    "耗時 (秒)": round(state["last_elapsed"], 3) if state["last_elapsed"] is not None else None,
+                    "新文章": state["last_new"],
+                    "連續失敗": state["failures"],
+                    "錯誤": state["last_error"] or "",
+                }
+                for site, state in poller.status().items()
+            ]))
+            cache_stats = get_feed_cache().stats()
+            st.caption(
+                f"快取命中率：{cache_stats['hit_ratio']:.0%} "
+                f"(TTL 命中 {cache_stats['fresh_hits']}、304 {cache_stats['not_modified']}、"
+                f"完整下載 {cache_stats['misses']})，已節省 {cache_stats['bytes_saved'] / 1024:.1f} KB"
+            )
 
+        # 匯出檔只在按下下載時才產生 (callable data)，下載時不重新執行整個頁面
         today = datetime.now().strftime("%Y-%m-%d")
-        filename = f"{today}_HotNews.xlsx"
+        export_format = st.session_state.export_format
 
         st.download_button(
-            label="⬇️ 下載 Excel 報表",
-            data=excel_data,
-            file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            label=f"⬇️ 下載報表 ({EXPORT_FORMATS[export_format]['label']})",
+            data=lambda: export_report(df, export_format),
+            file_name=export_filename(today, export_format),
+            mime=EXPORT_FORMATS[export_format]["mime"],
+            on_click="ignore"
+        )
+        # 完整歷史由欄式歷史逐日讀出，同樣只在按下時才產生
+        st.download_button(
+            label=f"⬇️ 下載全部歷史文章 ({EXPORT_FORMATS[export_format]['label']})",
+            data=lambda: export_history(poller.store.history, export_format),
+            file_name=f"{today}_HotNews_history.{export_format}",
+            mime=EXPORT_FORMATS[export_format]["mime"],
+            on_click="ignore"
         )
 else:
     if 'df' not in st.session_state:
@@ -253,6 +262,44 @@ if 'editable_article_title' not in st.session_state:
     st.session_state.editable_article_title = ""
 
 
+def use_search_result(results):
+    st.session_state.editable_article_title = results[st.session_state.search_result].title
+
+
+@st.fragment
+def article_search():
+    """搜尋所有歷史文章；輸入暫停後即時更新建議，只重新執行這個區塊。"""
+    query = st.text_input(
+        "🔎 搜尋歷史文章 (標題或摘要)：",
+        key="search_query",
+        type="search",
+        live=True,
+        placeholder="例如：防曬、保濕精華"
+    )
+    if not query:
+        return
+    started = time.perf_counter()
+    results = get_poller().store.search(query, limit=10)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not results:
+        st.caption(f"找不到相關文章 ({elapsed_ms:.1f} ms)")
+        return
+    st.caption(f"找到 {len(results)} 篇相關文章 ({elapsed_ms:.1f} ms)")
+    st.radio(
+        "搜尋結果：",
+        range(len(results)),
+        format_func=lambda i: f"{results[i].title} — {results[i].site}",
+        key="search_result",
+        label_visibility="collapsed"
+    )
+    if st.button("✏️ 使用此標題", on_click=use_search_result, args=(results,)):
+        # 標題編輯區在這個區塊之外，需要重新執行整個頁面
+        st.rerun()
+
+
+article_search()
+
+
 # 模組 1: 文章輸入與比例選擇
 with st.container():
     col1, col2 = st.columns([2, 1])
@@ -300,22 +347,45 @@ with st.container():
         
         uploaded_file = st.file_uploader("🖼️ 上傳背景圖片 (可選)", type=["jpg", "jpeg", "png"])
 
+        st.markdown("##### 下載格式")
+        download_format = st.selectbox(
+            "圖片格式：",
+            available_formats(),
+            format_func=lambda name: FORMATS[name].label,
+            key="download_format"
+        )
+        download_max_kb = st.number_input(
+            "檔案大小上限 (KB，0 為不限制)",
+            min_value=0,
+            value=0,
+            step=100,
+            key="download_max_kb"
+        )
+        if download_max_kb and FORMATS[download_format].quality is None:
+            st.caption("PNG 為無損格式，無法透過調整品質縮小檔案；需要限制大小時請改用 JPEG / WebP / AVIF。")
+
 # 模組 2: 視覺模板預覽
 st.markdown("#### 🖼️ 視覺模板預覽")
 
-# 1. 根據選定的比例生成圖片 (用於下載)
-visual_img_selected = generate_visual_content(
+for font_message in preload_fonts():
+    st.warning(f"⚠️ 嚴重警告：{font_message}請確認字型檔已上傳至 .devcontainer/ 目錄。")
+
+# 背景圖片以內容雜湊作為快取鍵，標題、比例與背景都沒變時直接使用快取結果
+background_bytes = uploaded_file.getvalue() if uploaded_file is not None else None
+
+# 1. 選定比例的預覽 (縮小渲染，下載時才以原尺寸渲染)
+visual_img_selected = render_preview(
     article_title, 
     ratio, 
-    uploaded_file
+    background_bytes
 )
 
-# 2. 生成另一個比例的圖片 (用於對照預覽)
+# 2. 另一個比例的預覽 (用於對照)
 other_ratio = '4:3' if ratio == '1:1' else '1:1'
-visual_img_other = generate_visual_content(
+visual_img_other = render_preview(
     article_title, 
     other_ratio, 
-    uploaded_file
+    background_bytes
 )
 
 # 3. 顯示兩個預覽
@@ -325,27 +395,83 @@ with col_1_1:
     st.markdown("**1:1 比例預覽**")
     st.image(visual_img_selected if ratio == '1:1' else visual_img_other, 
              caption=f"1:1 預覽 (字型檔: {FONT_FILE_PATH})", 
-             use_column_width='always')
+             width="stretch")
 
 with col_4_3:
     st.markdown("**4:3 比例預覽**")
     st.image(visual_img_selected if ratio == '4:3' else visual_img_other, 
              caption=f"4:3 預覽 (字型檔: {FONT_FILE_PATH})", 
-             use_column_width='always')
-
-# 下載按鈕 (PNG 格式)
-img_byte_arr_png = BytesIO()
-visual_img_selected.save(img_byte_arr_png, format='PNG') 
-img_byte_arr_png.seek(0)
+             width="stretch")
 
+# 下載按鈕：只在按下時編碼 (結果與圖片一起快取)，重新執行不會為了下載按鈕而編碼
+download_spec = FORMATS[download_format]
+download_max_bytes = int(download_max_kb * 1024) or None
 st.download_button(
-    label="⬇️ 下載成品 (PNG) - 無損畫質",
-    data=img_byte_arr_png.getvalue(),
-    file_name=f"{article_title[:10].replace('/', '_')}_image_{ratio}.png", 
-    mime="image/png"
+    label=f"⬇️ 下載成品 - {download_spec.label}",
+    data=lambda: render_card_bytes(article_title, ratio, background_bytes, download_format, download_max_bytes).data,
+    file_name=f"{article_title[:10].replace('/', '_')}_image_{ratio}.{download_spec.extension}", 
+    mime=download_spec.mime
 )
 
+# 其他平台格式：同一個標題一次渲染所有模板 (背景圖只解碼一次)
+with st.expander("📐 其他平台格式 (IG 限時動態、FB 連結、LINE...)"):
+    card_registry = get_card_registry()
+    if st.button("產生所有格式", key="render_all_formats"):
+        format_images = card_registry.render_all({"title": article_title}, image_bytes=background_bytes)
+        format_columns = st.columns(3)
+        zip_buffer = BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for i, (name, img) in enumerate(format_images.items()):
+                format_columns[i % 3].image(img, caption=card_registry.label(name))
+                encoded = encode_image(img, download_format, max_bytes=download_max_bytes)
+                archive.writestr(f"{name}.{download_spec.extension}", encoded.data)
+        st.download_button(
+            label="⬇️ 下載所有格式 (ZIP)",
+            data=zip_buffer.getvalue(),
+            file_name=f"{article_title[:10].replace('/', '_')}_formats.zip",
+            mime="application/zip"
+        )
 
+# 模組 3: 批次產生整份報表的卡片
+st.markdown("#### 📦 批次產生報表卡片")
+
+if st.session_state.df.empty:
+    st.info("請先產生報表，即可一次產生所有標題的 1:1 與 4:3 卡片。")
+elif st.button(f"🗂️ 產生全部 {len(st.session_state.df)} 則標題的卡片 (ZIP)"):
+    progress_bar = st.progress(0.0, text="渲染中...")
+
+    def update_progress(done, total):
+        progress_bar.progress(done / total, text=f"渲染中... {done}/{total}")
+
+    # 圖片逐張寫入磁碟上的暫存 ZIP，不會同時把所有圖片留在記憶體中
+    with tempfile.TemporaryFile() as zip_file:
+        batch_stats = render_cards_zip(
+            st.session_state.df["標題"].tolist(),
+            zip_file,
+            ratios=BATCH_RATIOS,
+            image_bytes=background_bytes,
+            progress=update_progress,
+            fmt=download_format,
+            max_bytes=download_max_bytes,
+        )
+        zip_file.seek(0)
+        progress_bar.progress(1.0, text="完成！")
+        st.caption(
+            f"共 {batch_stats['images']} 張，耗時 {batch_stats['seconds']:.1f} 秒 "
+            f"({batch_stats['images_per_sec']:.1f} 張/秒)，{batch_stats['bytes'] / 1024 / 1024:.1f} MB"
+        )
+        # Streamlit 送出下載時需要完整內容，只在這裡讀回一次
+        st.download_button(
+            label="⬇️ 下載全部卡片 (ZIP)",
+            data=zip_file.read(),
+            file_name=f"{datetime.now().strftime('%Y-%m-%d')}_HotNews_cards.zip",
+            mime="application/zip"
+        )
 
+# ================= 效能偵錯 =================
 
-
+if profiler is not None:
+    profiler.stop()
+    del st.session_state.running_profiler
+get_metrics().observe("rerun", time.perf_counter() - rerun_clock)
+debug_sidebar(rerun_started, profiler, profiler_busy)
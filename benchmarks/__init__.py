@@ -0,0 +1,5 @@
+"""
+離線效能量測腳本 (不需要 Streamlit 或網路)。
+
+在專案根目錄以模組方式執行，例如：python -m benchmarks.bench_parse
+"""
@@ -0,0 +1,69 @@
+"""
+比較宣告式版面引擎 (hotnews/canvas.py 的 800x450 橫幅) 與 generate_visual_content (1000x1000) 的渲染吞吐量：
+冷啟動 (含背景解碼)、背景已快取只重畫文字、整張命中快取，以及下載用的各格式編碼
+(各格式在大型照片卡片上的比較見 benchmarks/bench_encode.py)。
+
+    python -m benchmarks.bench_canvas [張數]
+"""
+import sys
+import time
+
+from hotnews import canvas, render
+from hotnews.card_templates import get_card_registry
+from hotnews.encoding import available_formats
+
+TITLE = "台灣國產「全新7人座MPV」挑戰百萬內！"
+BANNER_SPEC = get_card_registry().spec("news_banner")
+
+
+def clear_caches():
+    for cache in (canvas.canvas_cache, render.render_cache, render.background_cache, render.base_cache):
+        cache.clear()
+
+
+def throughput(fn, n):
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    return n / elapsed, elapsed / n * 1000
+
+
+def main(n):
+    def canvas_cold(i):
+        clear_caches()
+        canvas.render_canvas(BANNER_SPEC, {"title": f"{TITLE}{i}"})
+
+    def visual_cold(i):
+        clear_caches()
+        render.generate_visual_content(f"{TITLE}{i}", "1:1")
+
+    cases = (
+        ("Canvas 規格：冷啟動", canvas_cold),
+        ("Canvas 規格：只重畫文字", lambda i: canvas.render_canvas(BANNER_SPEC, {"title": f"{TITLE}{i}"})),
+        ("Canvas 規格：命中快取", lambda i: canvas.render_canvas(BANNER_SPEC, {"title": TITLE})),
+        ("generate_visual_content：冷啟動", visual_cold),
+        ("generate_visual_content：只重畫文字", lambda i: render.generate_visual_content(f"{TITLE}{i}", "1:1")),
+        ("render_card：命中快取", lambda i: render.render_card(TITLE, "1:1")),
+    )
+    print(f"{'情境':<36} {'張/秒':>10} {'ms/張':>8}")
+    for label, fn in cases:
+        clear_caches()
+        fn(-1)   # 預熱字型與背景
+        per_sec, ms = throughput(fn, n)
+        print(f"{label:<36} {per_sec:>10,.0f} {ms:>8.2f}")
+
+    print(f"\n{'編碼 (800x450，第一次下載)':<30} {'ms':>8} {'KB':>8}")
+    for fmt in available_formats():
+        samples = []
+        for i in range(min(n, 20)):
+            values = {"title": f"{TITLE}{i}"}
+            canvas.render_canvas(BANNER_SPEC, values)
+            started = time.perf_counter()
+            data = canvas.render_canvas_bytes(BANNER_SPEC, values, fmt=fmt).data
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"{fmt.upper():<30} {sorted(samples)[len(samples) // 2]:>8.2f} {len(data) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
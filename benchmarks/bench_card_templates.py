@@ -0,0 +1,78 @@
+"""
+圖卡模板登錄表 (hotnews/card_templates.json) 的渲染量測：
+
+- 以 12 MP 手機照片為背景，為同一個標題產生所有格式：逐一呼叫 generate_visual_content
+  (每個格式各自完整解碼一次照片) vs CardRegistry.render_all (照片只以 draft 縮小解碼一次)。
+- 背景已快取、只換標題時產生所有格式。
+- 靜態圖層預先畫進底圖 vs 每次重畫所有圖層 (新聞橫幅的遮罩與副標題)。
+
+    python -m benchmarks.bench_card_templates
+"""
+import statistics
+import time
+
+from benchmarks.fixtures import make_photo
+from hotnews import canvas
+from hotnews.canvas import CardPlan, decode_image
+from hotnews.card_templates import get_card_registry
+
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+ROUNDS = 5
+
+
+def clear_caches():
+    for cache in (canvas.background_cache, canvas.base_cache, canvas.canvas_cache):
+        cache.clear()
+
+
+def median_ms(fn, before=None, rounds=ROUNDS):
+    samples = []
+    for _ in range(rounds):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    registry = get_card_registry()
+    names = registry.names()
+    photo = make_photo()
+    print(f"格式：{'、'.join(names)}")
+    print(f"背景圖：4000x3000 JPEG，{len(photo) / 1024 / 1024:.1f} MB\n")
+
+    def one_by_one():
+        # 舊做法：每個格式各自從位元組完整解碼背景
+        for name in names:
+            plan = registry.plan(name)
+            decoded = decode_image(photo)
+            base = canvas.fit_cover(decoded, *plan.size)
+            plan.draw(base, {"title": TITLE})
+
+    cold_separate = median_ms(one_by_one, before=clear_caches)
+    cold_shared = median_ms(lambda: registry.render_all({"title": TITLE}, image_bytes=photo), before=clear_caches)
+    titles = iter(range(10 ** 9))
+    warm = median_ms(lambda: registry.render_all({"title": f"{TITLE}{next(titles)}"}, image_bytes=photo), rounds=20)
+
+    print(f"{'所有格式 (' + str(len(names)) + ' 張)':<36} {'ms':>10}")
+    print(f"  {'逐一完整解碼背景':<32} {cold_separate:>10.1f}")
+    print(f"  {'render_all (共用縮小解碼)':<32} {cold_shared:>10.1f}")
+    print(f"  {'render_all (背景已快取，只換標題)':<32} {warm:>10.1f}")
+
+    # 靜態圖層預先畫好 vs 每次重畫
+    spec = registry.spec("news_banner")
+    compiled = registry.plan("news_banner")
+    uncompiled = CardPlan(spec)
+    uncompiled.dynamic_layers = uncompiled.static_layers + uncompiled.dynamic_layers
+    uncompiled.static_layers = ()
+    uncompiled.digest = "uncompiled"
+    for label, plan in (("每次重畫所有圖層", uncompiled), ("靜態圖層預先畫進底圖", compiled)):
+        plan.render({"title": TITLE})
+        ms = median_ms(lambda: plan.render({"title": f"{TITLE}{next(titles)}"}), rounds=50)
+        print(f"  新聞橫幅：{label:<22} {ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+去重索引在合成語料上的吞吐量、每篇延遲隨歷史量的變化，以及分群的準確度。
+
+    python -m benchmarks.bench_dedup [標題數]
+"""
+import sys
+import time
+
+from benchmarks.fixtures import make_titles
+from hotnews.dedup import DedupIndex
+
+CHECKPOINTS = (1_000, 10_000, 50_000, 100_000)
+
+
+def main(n_titles):
+    corpus = make_titles(n_titles)
+    index = DedupIndex()
+    assigned = []
+    window_started = time.perf_counter()
+    started = window_started
+    last = 0
+    print(f"{'歷史文章數':>10} {'區間平均 (µs/篇)':>18}")
+    for i, (title, url, _, _) in enumerate(corpus, 1):
+        assigned.append(index.add(i - 1, title, url))
+        if i in CHECKPOINTS or i == n_titles:
+            now = time.perf_counter()
+            print(f"{i:>10} {(now - window_started) / (i - last) * 1e6:>18.1f}")
+            window_started, last = now, i
+    seconds = time.perf_counter() - started
+
+    # 準確度：轉載文章是否被歸到原文的群組 (召回)，原創文章是否被誤併 (誤併率)
+    duplicates = [(i, origin) for i, (_, _, _, origin) in enumerate(corpus) if origin != i]
+    recall = sum(assigned[i] == assigned[origin] for i, origin in duplicates) / max(1, len(duplicates))
+    originals = [i for i, (_, _, _, origin) in enumerate(corpus) if origin == i]
+    false_merge = sum(assigned[i] != i for i in originals) / max(1, len(originals))
+
+    print(f"\n{n_titles} 篇，共 {seconds:.1f} 秒 ({n_titles / seconds:,.0f} 篇/秒)，群組數 {len(index.clusters):,}")
+    print(f"轉載召回率 {recall:.1%}，原創誤併率 {false_merge:.2%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,89 @@
+"""
+卡片下載格式 (hotnews/encoding.py) 的編碼時間與檔案大小：
+
+- 照片背景 (12 MP 手機照片) 與內建背景的 1:1 卡片，各格式以預設參數編碼。
+- PNG 的 compress_level 比較 (決定 FORMATS 的預設值)。
+- 指定檔案大小上限時，品質搜尋選出的品質、編碼次數與總耗時。
+
+    python -m benchmarks.bench_encode
+"""
+import statistics
+import time
+from io import BytesIO
+
+from benchmarks.fixtures import make_photo
+from hotnews import encoding
+from hotnews.encoding import FORMATS, available_formats, encode_image
+from hotnews.render import generate_visual_content
+
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+ROUNDS = 5
+TARGETS_KB = (300, 150, 60)
+
+
+def median_ms(fn, rounds=ROUNDS):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def count_saves(fn):
+    """呼叫 fn 並計算期間實際編碼了幾次。"""
+    calls = []
+    original = encoding._save
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    encoding._save = counting
+    try:
+        return fn(), len(calls)
+    finally:
+        encoding._save = original
+
+
+def main():
+    cards = {
+        "照片背景": generate_visual_content(TITLE, "1:1", make_photo()),
+        "內建背景": generate_visual_content(TITLE, "1:1"),
+    }
+    formats = available_formats()
+    print(f"可用格式：{'、'.join(formats)}\n")
+
+    for label, image in cards.items():
+        print(f"{label} {image.width}x{image.height}")
+        print(f"  {'格式':<22} {'品質':>6} {'ms':>8} {'KB':>8}")
+        for fmt in formats:
+            ms, encoded = median_ms(lambda: encode_image(image, fmt))
+            quality = encoded.quality if encoded.quality is not None else "-"
+            print(f"  {FORMATS[fmt].label:<22} {quality:>6} {ms:>8.1f} {len(encoded.data) / 1024:>8.1f}")
+        for level in (1, 3, 6, 9):
+            def save_png():
+                output = BytesIO()
+                image.save(output, format="PNG", compress_level=level)
+                return output.getvalue()
+            ms, data = median_ms(save_png)
+            print(f"  {'PNG compress_level=' + str(level):<22} {'-':>6} {ms:>8.1f} {len(data) / 1024:>8.1f}")
+        print()
+
+    image = cards["照片背景"]
+    print("檔案大小上限 (照片背景)")
+    print(f"  {'格式':<14} {'上限 KB':>8} {'品質':>6} {'編碼次數':>8} {'ms':>8} {'KB':>8}")
+    for fmt in formats:
+        if FORMATS[fmt].quality is None:
+            continue
+        for target_kb in TARGETS_KB:
+            started = time.perf_counter()
+            encoded, saves = count_saves(lambda: encode_image(image, fmt, max_bytes=target_kb * 1024))
+            ms = (time.perf_counter() - started) * 1000
+            note = "" if encoded.fits else "  (最低品質仍超過上限)"
+            print(f"  {fmt:<14} {target_kb:>8} {encoded.quality:>6} {saves:>8} {ms:>8.1f} "
+                  f"{len(encoded.data) / 1024:>8.1f}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+報表匯出的時間與記憶體峰值：舊版 pd.ExcelWriter vs 串流寫出的 xlsx / csv / parquet。
+每個情境在獨立的子行程中執行，以 ru_maxrss 量測整個行程的記憶體峰值。
+
+    python -m benchmarks.bench_export [列數 ...]
+
+舊版路徑需要先建出整個 DataFrame 與活頁簿，超過 LEGACY_MAX_ROWS 列時略過。
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_ROWS = 100_000
+CASES = ["legacy-xlsx", "xlsx", "csv", "parquet"]
+
+
+def run_case(case, n_rows):
+    from benchmarks.fixtures import make_report_rows
+    from hotnews.export import export_rows
+
+    columns, rows = make_report_rows(n_rows)
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as output:
+        if case == "legacy-xlsx":
+            import pandas as pd
+
+            df = pd.DataFrame(list(rows), columns=columns)
+            with pd.ExcelWriter(output, engine="openpyxl") as writer:
+                df.to_excel(writer, index=False)
+        else:
+            export_rows(columns, rows, output, case)
+        size = output.tell()
+    seconds = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "peak_mb": peak_kb / 1024, "size_mb": size / 1024 / 1024}))
+
+
+def main(sizes):
+    print(f"{'列數':>10} {'格式':>12} {'時間 (s)':>10} {'記憶體峰值 (MB)':>16} {'檔案 (MB)':>10}")
+    for n_rows in sizes:
+        for case in CASES:
+            if case == "legacy-xlsx" and n_rows > LEGACY_MAX_ROWS:
+                print(f"{n_rows:>10} {case:>12} {'(略過)':>10}")
+                continue
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_export", "--case", case, str(n_rows)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{n_rows:>10} {case:>12} {result['seconds']:>10.2f} {result['peak_mb']:>16.0f} {result['size_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--case":
+        run_case(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,54 @@
+"""
+量測字型登錄表為每次預覽省下的時間：每次 ImageFont.truetype 重新載入 vs 共用的 FontRegistry。
+
+    python -m benchmarks.bench_fonts [字型檔路徑]
+
+預設使用 .devcontainer/NotoSansTC-Bold.ttf (CJK 字型檔越大，差異越明顯)。
+"""
+import os
+import statistics
+import sys
+import time
+
+from PIL import ImageFont
+
+from hotnews import canvas, render
+from hotnews.card_templates import get_card_registry
+from hotnews.fonts import FontRegistry
+
+ROUNDS = 20
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+
+
+def median_ms(fn):
+    samples = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else render.FONT_FILE_PATH
+    if not os.path.exists(path):
+        sys.exit(f"找不到字型檔 {path}，請以參數指定字型檔路徑。")
+    size = get_card_registry().font_sizes(["1:1"])[-1]
+    registry = FontRegistry({"bench": {"bold": path}}, default_family="bench")
+    canvas.font_registry = registry
+    base = render.base_layer("1:1")
+
+    reload_ms = median_ms(lambda: ImageFont.truetype(path, size))
+    cached_ms = median_ms(lambda: registry.get(size))
+    draw_ms = median_ms(lambda: render.draw_title(base, TITLE, "1:1"))
+
+    print(f"字型檔：{path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    print(f"ImageFont.truetype 重新載入：{reload_ms:.3f} ms")
+    print(f"FontRegistry 快取取用：      {cached_ms:.3f} ms")
+    print(f"標題文字層繪製 (已快取字型)：{draw_ms:.3f} ms")
+    # 每次預覽會渲染兩種比例，各載入一次字型
+    print(f"每次預覽節省：約 {2 * (reload_ms - cached_ms):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
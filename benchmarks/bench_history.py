@@ -0,0 +1,136 @@
+"""
+文章記錄的記憶體用量與載入時間：舊版的中文鍵 dict / DataFrame、Article (__slots__) 與 Arrow 欄式表，
+以及 SQLite 與 Parquet 歷史的完整載入、各來源最新 5 篇查詢。
+
+    python -m benchmarks.bench_history [文章數]
+"""
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from benchmarks.fixtures import SITES, make_titles
+from hotnews.history import LATEST_LOOKBACK_DAYS, articles_to_table, table_to_articles
+from hotnews.models import Article
+from hotnews.store import ArticleStore
+
+DAYS = 30
+
+
+def make_articles(n):
+    start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    articles = []
+    for i, (title, url, site, _) in enumerate(make_titles(n)):
+        first_seen = start + timedelta(seconds=DAYS * 86400 * i / n)
+        published = first_seen - timedelta(minutes=i % 90) if i % 10 else None
+        articles.append(Article(url, site, title, url, "", published, first_seen, url))
+    return articles
+
+
+def legacy_rows(articles):
+    """舊版 parse_entries 的輸出：中文鍵 dict，時間已格式化為字串。"""
+    return [
+        {"標題": a.title, "連結": a.link, "發佈時間": a.sort_time.strftime("%Y-%m-%d %H:%M"), "來源": a.site}
+        for a in articles
+    ]
+
+
+def traced(build):
+    """回傳 (結果, 建立結果時新增的記憶體位元組)。"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(n):
+    articles = make_articles(n)
+    source = articles_to_table(articles)
+    del articles
+
+    # 每種表示法都由 Arrow 表重新建立，計入它實際持有的字串與時間物件
+    print(f"{n:,} 篇文章\n\n{'表示法':<26} {'bytes/篇':>10}")
+    _, dict_bytes = traced(lambda: legacy_rows(table_to_articles(source)))
+    # pandas 3 的字串欄位存放在 Arrow 緩衝區 (tracemalloc 看不到)，改用 memory_usage(deep=True)
+    frame_bytes = pd.DataFrame(legacy_rows(table_to_articles(source))).memory_usage(deep=True).sum()
+    _, article_bytes = traced(lambda: table_to_articles(source))
+    print(f"{'dict 報表列 (舊版)':<24} {dict_bytes / n:>10.0f}")
+    print(f"{'DataFrame (舊版)':<24} {frame_bytes / n:>10.0f}")
+    print(f"{'Article (__slots__)':<24} {article_bytes / n:>10.0f}")
+    print(f"{'Arrow 欄式表':<24} {source.nbytes / n:>10.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArticleStore(os.path.join(tmp, "articles.sqlite3"))
+        articles = table_to_articles(source)
+        with closing(sqlite3.connect(store.path)) as conn, conn:
+            conn.executemany(
+                "INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (a.key, a.site, a.title, a.link, a.summary,
+                     a.published.timestamp() if a.published else None, a.first_seen.timestamp(), a.cluster)
+                    for a in articles
+                ),
+            )
+        store.history.append(articles)
+        del articles
+
+        def sqlite_frame():
+            with closing(sqlite3.connect(store.path)) as conn, conn:
+                rows = conn.execute("SELECT title, link, published, first_seen, site FROM articles").fetchall()
+            return pd.DataFrame([
+                {
+                    "標題": title, "連結": link,
+                    "發佈時間": datetime.fromtimestamp(published or first_seen, timezone.utc).strftime("%Y-%m-%d %H:%M"),
+                    "來源": site,
+                }
+                for title, link, published, first_seen, site in rows
+            ])
+
+        def parquet_table():
+            import pyarrow as pa
+            return pa.concat_tables(store.history.read_day(day) for day in store.history.days())
+
+        def sqlite_latest():
+            with closing(sqlite3.connect(store.path)) as conn, conn:
+                return conn.execute("""
+                    SELECT * FROM (
+                        SELECT *, ROW_NUMBER() OVER (
+                            PARTITION BY site ORDER BY COALESCE(published, first_seen) DESC
+                        ) AS rank FROM articles
+                    ) WHERE rank <= 5
+                """).fetchall()
+
+        print(f"\n{'載入方式':<34} {'毫秒':>10}")
+        cases = [
+            ("SQLite → dict → DataFrame (舊版)", sqlite_frame),
+            ("Parquet → Arrow 表", parquet_table),
+            ("Parquet → Article", lambda: table_to_articles(parquet_table())),
+            ("各來源最新 5 篇：SQLite 視窗函數", sqlite_latest),
+            ("各來源最新 5 篇：Parquet 由新往舊", lambda: store.history.latest_per_source(5, SITES)),
+            (f"同上，含停更的來源 (最多 {LATEST_LOOKBACK_DAYS} 天)", lambda: store.history.latest_per_source(5, SITES + ["停更的來源"])),
+        ]
+        for label, fn in cases:
+            print(f"{label:<30} {timed(fn):>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
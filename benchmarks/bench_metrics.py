@@ -0,0 +1,38 @@
+"""
+量測計時區段與計數器在關閉 / 開啟時的額外成本，以及對一次卡片渲染的影響。
+
+    python -m benchmarks.bench_metrics
+"""
+import timeit
+
+from hotnews.metrics import Metrics
+from hotnews.render import generate_visual_content
+
+N = 200_000
+
+
+def per_call_ns(statement, setup_globals):
+    return min(timeit.repeat(statement, globals=setup_globals, number=N, repeat=5)) / N * 1e9
+
+
+def main():
+    print(f"{'操作':<24} {'關閉 ns':>10} {'開啟 ns':>10}")
+    baseline = per_call_ns("pass", {})
+    for label, statement in (
+        ("with span(...)", "with metrics.span('render_card', ratio='1:1'): pass"),
+        ("count(...)", "metrics.count('render_cache', outcome='hit')"),
+    ):
+        costs = []
+        for enabled in (False, True):
+            metrics = Metrics(enabled=enabled)
+            costs.append(per_call_ns(statement, {"metrics": metrics}) - baseline)
+        print(f"{label:<24} {costs[0]:>10.0f} {costs[1]:>10.0f}")
+
+    # 實際熱路徑：卡片渲染本身的耗時，對照區段的成本
+    render_ms = min(timeit.repeat(lambda: generate_visual_content("夏季防曬與保濕全攻略", "1:1"),
+                                  number=20, repeat=3)) / 20 * 1000
+    print(f"\n一次 generate_visual_content：{render_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
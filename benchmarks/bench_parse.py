@@ -0,0 +1,56 @@
+"""
+比較完整解析 (feedparser + parse_entries 後再取前 5 篇) 與增量解析 (讀到前 5 篇即停止)
+的解析時間與記憶體峰值。
+
+    python -m benchmarks.bench_parse
+"""
+import time
+import tracemalloc
+from io import BytesIO
+from itertools import islice
+
+import feedparser
+
+from benchmarks.fixtures import make_rss
+from hotnews.feeds import TOP_N, parse_entries
+from hotnews.stream_parser import iter_feed_entries, iter_response_chunks
+
+SIZES = [(20, 2000), (60, 8000), (200, 20000)]
+REPEAT = 5
+
+
+def full_path(body):
+    entries = feedparser.parse(body).entries
+    return list(parse_entries(entries))[:TOP_N]
+
+
+def stream_path(body):
+    chunks = iter_response_chunks(BytesIO(body), deadline=float("inf"), consumed=[])
+    return list(islice(parse_entries(iter_feed_entries(chunks)), TOP_N))
+
+
+def measure(fn, body):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    print(f"{'文章數':>6} {'文件大小':>10} {'模式':>10} {'時間 (ms)':>10} {'記憶體峰值 (KB)':>16}")
+    for n_items, body_chars in SIZES:
+        body = make_rss(n_items, body_chars)
+        assert [a.report_row() for a in full_path(body)] == [a.report_row() for a in stream_path(body)]
+        for name, fn in (("feedparser", full_path), ("stream", stream_path)):
+            seconds, peak = measure(fn, body)
+            print(f"{n_items:>6} {len(body) / 1024:>8.0f}KB {name:>10} {seconds * 1000:>10.2f} {peak / 1024:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+畫面預覽 (render_preview，PREVIEW_SCALE 倍、draft 縮放) 與原尺寸渲染 (LANCZOS，下載用) 的延遲比較，
+以 12 MP 手機照片與內建背景為背景：
+
+- 冷啟動：解碼 + 縮放背景 + 遮罩 + 文字。
+- 每次按鍵：背景與底圖已快取，只重畫文字層 (app.py 每次重新執行會畫 1:1 與 4:3 兩張)。
+
+    python -m benchmarks.bench_preview
+"""
+import statistics
+import time
+
+from benchmarks.fixtures import make_photo
+from hotnews import render
+
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+ROUNDS = 10
+RATIOS = ("1:1", "4:3")
+
+
+def clear_caches():
+    for cache in (render.render_cache, render.background_cache, render.base_cache):
+        cache.clear()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(image_bytes, scale):
+    def both(title):
+        for ratio in RATIOS:
+            render.generate_visual_content(title, ratio, image_bytes, scale)
+
+    cold = []
+    for _ in range(3):
+        clear_caches()
+        cold.append(timed(lambda: both(TITLE)))
+    # 模擬逐字輸入：每次標題都不同，背景與底圖已在快取中
+    keystroke = [timed(lambda i=i: both(TITLE[:i + 1])) for i in range(ROUNDS)]
+    return statistics.median(cold), statistics.median(keystroke)
+
+
+def main():
+    backgrounds = {"12 MP 照片": make_photo(), "內建背景": None}
+    print(f"每次重新執行渲染 {' 與 '.join(RATIOS)} 兩張卡片；預覽為 {render.PREVIEW_SCALE} 倍\n")
+    print(f"{'背景':<12} {'情境':<14} {'原尺寸 (ms)':>12} {'預覽 (ms)':>12} {'加速':>8}")
+    for label, image_bytes in backgrounds.items():
+        full = measure(image_bytes, 1)
+        preview = measure(image_bytes, render.PREVIEW_SCALE)
+        for name, full_ms, preview_ms in zip(("冷啟動", "每次按鍵"), full, preview):
+            print(f"{label:<12} {name:<14} {full_ms:>12.2f} {preview_ms:>12.2f} {full_ms / preview_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
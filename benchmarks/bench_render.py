@@ -0,0 +1,51 @@
+"""
+以 12 MP 手機照片為背景，量測卡片渲染在各種快取狀態下的延遲：
+冷啟動 (解碼 + 縮放 + 遮罩 + 文字)、每次按鍵 (只重畫文字層)、未變更的重新執行 (整張命中)。
+
+    python -m benchmarks.bench_render
+"""
+import statistics
+import time
+
+from benchmarks.fixtures import make_photo
+from hotnews import render
+
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+ROUNDS = 10
+
+
+def clear_caches():
+    for cache in (render.render_cache, render.background_cache, render.base_cache):
+        cache.clear()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    photo = make_photo()
+    print(f"背景圖：4000x3000 JPEG，{len(photo) / 1024 / 1024:.1f} MB\n")
+    print(f"{'比例':>5} {'情境':<24} {'中位數 (ms)':>12}")
+    for ratio in ("1:1", "4:3"):
+        cold = []
+        for _ in range(3):
+            clear_caches()
+            cold.append(timed(lambda: render.generate_visual_content(TITLE, ratio, photo)))
+
+        # 模擬逐字輸入：每次標題都不同，背景與底圖已在快取中
+        keystroke = [
+            timed(lambda i=i: render.render_card(TITLE[:i + 1], ratio, photo))
+            for i in range(ROUNDS)
+        ]
+        unchanged = [timed(lambda: render.render_card(TITLE, ratio, photo)) for _ in range(ROUNDS)]
+
+        for name, samples in (("冷啟動 (無快取)", cold), ("每次按鍵 (只重畫文字)", keystroke),
+                              ("未變更的重新執行", unchanged)):
+            print(f"{ratio:>5} {name:<24} {statistics.median(samples):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
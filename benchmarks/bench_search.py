@@ -0,0 +1,85 @@
+"""
+全文搜尋索引的建立吞吐量與查詢延遲 (對照 LIKE '%...%' 全表掃描)。
+
+    python -m benchmarks.bench_search [文章數]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from benchmarks.fixtures import make_titles
+from hotnews.search import SEARCH_TABLE, ensure_schema
+from hotnews.store import ArticleStore
+
+N_QUERIES = 300
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main(n_articles):
+    corpus = make_titles(n_articles)
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArticleStore(os.path.join(tmp, "articles.sqlite3"))
+
+        # 增量寫入：與輪詢器相同，每批 20 篇呼叫一次 add_entries (含去重與搜尋索引)
+        entries = [
+            # 摘要取另一篇文章的標題，模擬內容與標題不完全相同的真實摘要
+            {"title": title, "link": url, "summary": f"<p>{rng.choice(corpus)[0]}</p>"}
+            for title, url, _, _ in corpus
+        ]
+        started = time.perf_counter()
+        for i in range(0, n_articles, 20):
+            store.add_entries(corpus[i][2], entries[i:i + 20])
+        ingest = time.perf_counter() - started
+
+        # 由既有文章重建索引 (升級時的一次性補建)
+        with closing(sqlite3.connect(store.path)) as conn, conn:
+            conn.execute(f"DROP TABLE {SEARCH_TABLE}")
+            started = time.perf_counter()
+            ensure_schema(conn)
+            rebuild = time.perf_counter() - started
+
+        queries = []
+        for _ in range(N_QUERIES):
+            title = rng.choice(corpus)[0]
+            start = rng.randrange(max(1, len(title) - 4))
+            queries.append(title[start:start + rng.randrange(2, 5)])
+
+        fts_ms = []
+        for query in queries:
+            started = time.perf_counter()
+            store.search(query, limit=10)
+            fts_ms.append((time.perf_counter() - started) * 1000)
+
+        like_ms = []
+        with closing(sqlite3.connect(store.path)) as conn, conn:
+            for query in queries[:50]:
+                started = time.perf_counter()
+                conn.execute(
+                    "SELECT title FROM articles WHERE title LIKE ? OR summary LIKE ? LIMIT 10",
+                    (f"%{query}%", f"%{query}%"),
+                ).fetchall()
+                like_ms.append((time.perf_counter() - started) * 1000)
+
+        size_mb = os.path.getsize(store.path) / 1024 / 1024
+
+    print(f"{n_articles:,} 篇文章，資料庫 {size_mb:.1f} MB")
+    print(f"增量寫入 (含去重與索引)：{n_articles / ingest:,.0f} 篇/秒")
+    print(f"重建搜尋索引：{n_articles / rebuild:,.0f} 篇/秒 ({rebuild:.2f} 秒)")
+    print(f"\n{'查詢方式':<22} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for label, samples in (("FTS5 二字詞 + BM25", fts_ms), ("LIKE 全表掃描", like_ms)):
+        p50, p95 = _percentiles(samples)
+        print(f"{label:<22} {p50:>10.2f} {p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
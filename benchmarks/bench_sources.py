@@ -0,0 +1,97 @@
+"""
+來源 connector 與容錯機制的量測 (本機 fixture 伺服器，不連外網)。
+
+1. 各格式 (RSS / JSON Feed / sitemap) 讀取前 20 篇的耗時與讀取量。
+2. 模擬一輪輪的輪詢：正常、緩慢、偶發 503 與完全故障的來源，
+   比較「不重試、不熔斷」與依來源設定重試 + 熔斷時的成功率、每輪耗時與打到故障來源的請求數。
+
+    python -m benchmarks.bench_sources [輪數]
+"""
+import statistics
+import sys
+import time
+from urllib.request import urlopen
+
+from benchmarks.fixtures import make_json_feed, make_rss, make_sitemap, serve_fixtures
+from hotnews.connectors import get_connector
+from hotnews.feeds import HostThrottle, fetch_all_feeds, fetch_feed
+from hotnews.sources import Source, SourceRegistry
+
+LIMIT = 20
+
+
+def bench_connectors(repeat=20):
+    routes = {
+        "/rss": {"body": make_rss(60)},
+        "/json": {"body": make_json_feed(60), "content_type": "application/feed+json"},
+        "/sitemap": {"body": make_sitemap(1000)},
+    }
+    server, base, _ = serve_fixtures(routes)
+    print(f"{'格式':<10} {'檔案 KB':>9} {'讀取 KB':>9} {'毫秒':>8} {'篇數':>6}")
+    try:
+        for connector, path in (("rss", "/rss"), ("jsonfeed", "/json"), ("sitemap", "/sitemap")):
+            times = []
+            for _ in range(repeat):
+                result = fetch_feed(connector, base + path, limit=LIMIT, connector=connector)
+                assert not result["error"], result["error"]
+                times.append(result["elapsed"] * 1000)
+            # 讀取量：以相同 connector 直接讀一次回應
+            with urlopen(base + path) as response:
+                _, body_size = get_connector(connector)(response, time.monotonic() + 10, LIMIT)
+            print(f"{connector:<10} {len(routes[path]['body']) / 1024:>9.1f} {body_size / 1024:>9.1f} "
+                  f"{statistics.median(times):>8.1f} {len(result['entries']):>6}")
+    finally:
+        server.shutdown()
+
+
+def run_rounds(base, settings, rounds):
+    """依 settings ({名稱: Source 參數}，網址為 base + "/名稱") 建立來源，執行 rounds 輪抓取。"""
+    registry = SourceRegistry([Source(name=name, url=f"{base}/{name}", **options) for name, options in settings.items()])
+    feeds = registry.feeds()
+    throttle = HostThrottle(min_interval=0, max_concurrency=len(feeds))
+    successes = {name: 0 for name in feeds}
+    round_times = []
+    for _ in range(rounds):
+        started = time.monotonic()
+        for result in fetch_all_feeds(feeds, deadline=5, throttle=throttle, cache=None, limit=LIMIT,
+                                      registry=registry):
+            successes[result["site"]] += not result["error"]
+        round_times.append(time.monotonic() - started)
+    return registry, successes, round_times
+
+
+def bench_resilience(rounds):
+    routes = {
+        "/healthy": {"body": make_rss(60, tag="healthy")},
+        "/slow": {"body": make_rss(60, tag="slow"), "delay": 0.3},
+        "/flaky": {"body": make_rss(60, tag="flaky"), "fail_rate": 0.4},
+        "/dead": {"body": b"", "status": 500, "delay": 0.2},
+    }
+    sources = {name.strip("/"): {"timeout": 2} for name in routes}
+    naive = {name: {**options, "retries": 0, "failure_threshold": 10 ** 9} for name, options in sources.items()}
+    tuned = {
+        name: {**options, "retries": 2, "backoff": 0.05, "failure_threshold": 3, "cooldown": 3600}
+        for name, options in sources.items()
+    }
+    for label, settings in (("不重試、不熔斷", naive), ("重試 2 次 + 熔斷", tuned)):
+        server, base, hits = serve_fixtures(routes)
+        try:
+            registry, successes, round_times = run_rounds(base, settings, rounds)
+        finally:
+            server.shutdown()
+        print(f"\n{label}：{rounds} 輪，每輪 p50 {statistics.median(round_times) * 1000:.0f} ms、"
+              f"最慢 {max(round_times) * 1000:.0f} ms")
+        print(f"{'來源':<10} {'成功率':>8} {'請求數':>8} {'p50 ms':>8} {'p95 ms':>8} {'狀態':>10}")
+        for row in registry.status():
+            print(f"{row['name']:<10} {successes[row['name']] / rounds:>8.0%} {hits['/' + row['name']]:>8} "
+                  f"{row['p50'] * 1000 if row['p50'] is not None else 0:>8.0f} "
+                  f"{row['p95'] * 1000 if row['p95'] is not None else 0:>8.0f} {row['state']:>10}")
+
+
+def main(rounds):
+    bench_connectors()
+    bench_resilience(rounds)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
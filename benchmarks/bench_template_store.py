@@ -0,0 +1,120 @@
+"""
+模板庫 (hotnews/template_store.py) 在數千個模板下的查詢延遲，以及多個寫入者同時儲存同一個模板時
+是否會遺失更新 (每個寫入者以 expected_version 重試，最後版本數應等於總寫入次數)。
+
+    python -m benchmarks.bench_template_store [模板數量]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+from hotnews.template_store import TemplateConflict, TemplateStore
+
+TAGS = ("IG", "FB", "LINE", "促銷", "活動", "產品", "節慶", "徵才")
+WRITERS = 8
+WRITES_PER_WRITER = 25
+
+
+def best_ms(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def populate(store, n_templates):
+    conn = store._connect()
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN")
+        for i in range(n_templates):
+            name = f"模板{i:05d}"
+            tags = (TAGS[i % len(TAGS)], TAGS[(i * 3 + 1) % len(TAGS)])
+            conn.execute("INSERT INTO templates VALUES (?, 1, 0, ?)", (name, now))
+            conn.execute("INSERT INTO template_versions VALUES (?, 1, ?, ?, ?)",
+                         (name, f"{name}：{{{{日期}}}} {{{{主題}}}}\n" * 20, ",".join(sorted(set(tags))), now))
+            conn.executemany("INSERT INTO template_tags VALUES (?, ?)", ((tag, name) for tag in set(tags)))
+        conn.execute("UPDATE template_meta SET value = value + 1 WHERE key = 'generation'")
+        conn.execute("COMMIT")
+    conn.close()
+
+
+def query_plans(store):
+    with closing(store._connect()) as conn:
+        for label, sql, params in (
+            ("名稱開頭", "SELECT name FROM templates WHERE deleted = 0 AND name >= ? AND name < ? ORDER BY name LIMIT 200",
+             ("模板012", "模板012\U0010ffff")),
+            ("標籤", "SELECT t.name FROM template_tags g JOIN templates t ON t.name = g.name "
+                     "WHERE g.tag = ? AND t.deleted = 0 ORDER BY g.name LIMIT 200", ("IG",)),
+        ):
+            plan = " / ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+            print(f"  {label:<8} {plan}")
+
+
+def concurrent_writes(path):
+    """每個寫入者各自開 TemplateStore (模擬不同 session/程序)，衝突時重新讀取版本後重試。"""
+    TemplateStore(path).save("共用模板", "初始內容", expected_version=0)
+    conflicts = [0] * WRITERS
+
+    def writer(index):
+        store = TemplateStore(path)
+        for n in range(WRITES_PER_WRITER):
+            while True:
+                version = store.get("共用模板").version
+                try:
+                    store.save("共用模板", f"寫入者 {index} 第 {n} 次", expected_version=version)
+                    break
+                except TemplateConflict:
+                    conflicts[index] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    final = TemplateStore(path).get("共用模板").version
+    return final, sum(conflicts), elapsed
+
+
+def main(n_templates):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TemplateStore(os.path.join(tmp, "templates.sqlite3"))
+        populate(store, n_templates)
+        print(f"模板數量：{store.count():,}")
+        print("查詢計畫")
+        query_plans(store)
+
+        cases = (
+            ("名稱清單 (前 200 個)", lambda: store.names()),
+            ("名稱開頭", lambda: store.names(prefix="模板012")),
+            ("標籤篩選", lambda: store.names(tag="IG")),
+            ("標籤清單", lambda: store.tags()),
+            ("讀取模板", lambda: store.get("模板01234")),
+        )
+        print(f"\n{'查詢':<24} {'未快取 ms':>10} {'快取 ms':>10}")
+        for label, fn in cases:
+            def cold():
+                store._cache.clear()
+                fn()
+            print(f"  {label:<22} {best_ms(cold):>10.3f} {best_ms(fn):>10.4f}")
+
+        started = time.perf_counter()
+        store.save("模板01234", "新內容 {{日期}}", ("IG",), expected_version=1)
+        print(f"\n儲存新版本：{(time.perf_counter() - started) * 1000:.2f} ms")
+
+        expected = 1 + WRITERS * WRITES_PER_WRITER
+        final, conflicts, elapsed = concurrent_writes(os.path.join(tmp, "concurrent.sqlite3"))
+        status = "OK" if final == expected else "遺失更新！"
+        print(f"{WRITERS} 個寫入者各寫 {WRITES_PER_WRITER} 次：最終第 {final} 版 (預期 {expected}) {status}，"
+              f"衝突重試 {conflicts} 次，{elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
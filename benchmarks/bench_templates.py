@@ -0,0 +1,104 @@
+"""
+比較舊版 Prompt 產生方式 (每次重新執行 re.findall、每個變數一次 str.replace) 與編譯後快取的模板：
+大型模板的變數擷取與單次套用，以及以 CSV 批次產生數千則 Prompt。
+
+    python -m benchmarks.bench_templates [批次列數]
+"""
+import csv
+import io
+import re
+import sys
+import time
+
+from benchmarks.fixtures import make_template
+from hotnews.prompts import DEFAULT_TEMPLATES, STYLE_CONFIG, generate_prompts
+from hotnews.templates import compile_template, read_csv_rows
+
+STYLE = next(iter(STYLE_CONFIG))
+
+
+def legacy_extract_variables(template_text):
+    variables = re.findall(r"\{\{([^}]+)\}\}", template_text)
+    return sorted(list(set(v.strip() for v in variables)))
+
+
+def legacy_render(template_text, variable_values):
+    processed_template = template_text
+    for var, value in variable_values.items():
+        processed_template = processed_template.replace(f"{{{{{var}}}}}", value)
+    return processed_template
+
+
+def legacy_generate_prompt(style_key, template_text, core_content, variable_values):
+    """舊版 generate_prompt (逐一 str.replace 後組合)。"""
+    style_prefix = STYLE_CONFIG.get(style_key, {}).get("prompt_prefix", "")
+    processed_template = legacy_render(template_text, variable_values)
+    return f"""
+--- Prompt 指令 ---
+{style_prefix}
+
+--- 核心內容 ---
+{core_content}
+
+--- 套用模板後的貼文草稿 ---
+{processed_template}
+"""
+
+
+def best_ms(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def make_csv(template_text, n_rows):
+    variables = legacy_extract_variables(template_text)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(variables)
+    for i in range(n_rows):
+        writer.writerow([f"{var} 第 {i} 列" for var in variables])
+    return output.getvalue().encode("utf-8")
+
+
+def main(n_rows):
+    print(f"{'情境':<34} {'舊版 ms':>10} {'編譯 ms':>10} {'倍數':>7}")
+    for label, template in (
+        ("預設模板 (8 個變數)", DEFAULT_TEMPLATES["活動宣傳基礎模板"]),
+        ("大型模板 (2000 行、200 個變數)", make_template()),
+    ):
+        values = {var: f"{var} 的內容" for var in legacy_extract_variables(template)}
+        compile_template(template)   # 第一次重新執行時編譯，之後皆命中快取
+        cases = (
+            ("擷取變數", lambda: legacy_extract_variables(template), lambda: compile_template(template).variables),
+            ("套用變數", lambda: legacy_render(template, values), lambda: compile_template(template).render(values)),
+        )
+        print(label)
+        for name, old, new in cases:
+            old_ms, new_ms = best_ms(old), best_ms(new)
+            print(f"  {name:<32} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / new_ms:>6.1f}x")
+
+    template = DEFAULT_TEMPLATES["產品發表模板"]
+    data = make_csv(template, n_rows)
+
+    def legacy_batch():
+        # 舊版頁面一次只能產生一則；以舊版 generate_prompt 逐列套用
+        return [
+            legacy_generate_prompt(STYLE, template, "核心內容", row)
+            for row in csv.DictReader(io.StringIO(data.decode("utf-8")))
+        ]
+
+    def compiled_batch():
+        return list(generate_prompts(STYLE, template, read_csv_rows(data), "核心內容"))
+
+    old_ms, new_ms = best_ms(legacy_batch, 5), best_ms(compiled_batch, 5)
+    print(f"\nCSV 批次 {n_rows:,} 列 (含讀取 CSV)")
+    print(f"  {'舊版 replace 迴圈':<30} {old_ms:>10.1f} ms  {n_rows / old_ms * 1000:>10,.0f} 則/秒")
+    print(f"  {'編譯模板 + 組合 Prompt':<28} {new_ms:>10.1f} ms  {n_rows / new_ms * 1000:>10,.0f} 則/秒")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,77 @@
+"""
+以合成的一個月文章流重播熱門趨勢計算：每週的每篇更新成本 (應維持固定)、熱門清單查詢延遲，
+以及事先植入的爆量話題在開始升溫 3 小時後是否進入前 5 名。
+
+    python -m benchmarks.bench_trending [每日文章數]
+"""
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import SITES, make_titles
+from hotnews.trending import TrendTracker
+
+DAYS = 30
+# 植入的話題，字元不在合成詞彙 (COMMON_CHARS) 中，不會與一般標題混淆
+BURST_TOPICS = ["櫻花聯名限定", "零卡甜點挑戰", "韓系裸妝教學", "冰肌防曬噴霧", "秋冬暖橘唇膏",
+                "抹茶拿鐵新品", "睫毛捲翹神器", "香氛蠟燭推薦", "瑜珈褲穿搭術", "氣墊粉餅評比"]
+BURST_ARTICLES = 30
+BURST_HOURS = 6
+
+
+def make_stream(per_day, seed=3):
+    """回傳依時間排序的 (時間, key, 來源, 標題) 與植入話題的 (話題, 開始時間)。"""
+    rng = random.Random(seed)
+    start = 1_780_000_000
+    titles = make_titles(per_day * DAYS, seed=seed)
+    stream = [
+        (start + rng.uniform(0, DAYS * 86400), f"a{i}", site, title)
+        for i, (title, _, site, _) in enumerate(titles)
+    ]
+    bursts = []
+    for n, topic in enumerate(BURST_TOPICS):
+        burst_start = start + rng.uniform(7, DAYS - 1) * 86400
+        bursts.append((topic, burst_start))
+        for j in range(BURST_ARTICLES):
+            base = rng.choice(titles)[0]
+            cut = rng.randrange(len(base))
+            stream.append((
+                burst_start + rng.uniform(0, BURST_HOURS * 3600),
+                f"b{n}-{j}",
+                rng.choice(SITES),
+                base[:cut] + topic + base[cut:],
+            ))
+    stream.sort()
+    return stream, bursts
+
+
+def main(per_day):
+    stream, bursts = make_stream(per_day)
+    tracker = TrendTracker()
+    checks = sorted((burst_start + 3 * 3600, topic) for topic, burst_start in bursts)
+    found, query_ms, weekly = [], [], []
+    week_started, week_count, week_end = time.perf_counter(), 0, stream[0][0] + 7 * 86400
+
+    for timestamp, key, site, title in stream:
+        while checks and checks[0][0] <= timestamp:
+            check_time, topic = checks.pop(0)
+            started = time.perf_counter()
+            top = tracker.hot_articles(5, now=check_time)
+            query_ms.append((time.perf_counter() - started) * 1000)
+            found.append(any(topic in article["title"] for article in top))
+        if timestamp >= week_end:
+            weekly.append((time.perf_counter() - week_started) / max(1, week_count) * 1e6)
+            week_started, week_count, week_end = time.perf_counter(), 0, week_end + 7 * 86400
+        tracker.add(key, site, title, "", timestamp)
+        week_count += 1
+    weekly.append((time.perf_counter() - week_started) / max(1, week_count) * 1e6)
+
+    print(f"重播 {DAYS} 天、{len(stream):,} 篇文章 (每日 {per_day:,} 篇)，追蹤中的詞 {len(tracker):,} 個")
+    print("每篇更新成本 (µs)：" + "、".join(f"第 {i + 1} 週 {us:.1f}" for i, us in enumerate(weekly)))
+    print(f"熱門清單查詢：p50 {statistics.median(query_ms):.1f} ms，最大 {max(query_ms):.1f} ms")
+    print(f"植入話題在升溫 3 小時後進入前 5 名：{sum(found)}/{len(found)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,71 @@
+"""
+標題排版的微型效能量測：舊版字數換行 vs 依字寬換行 (字寬快取冷 / 熱) 與自動縮字。
+
+    python -m benchmarks.bench_wrap [字型檔路徑]
+"""
+import statistics
+import sys
+import time
+
+from hotnews import render
+from hotnews.card_templates import get_card_registry
+from hotnews.fonts import FontRegistry
+from hotnews.text_layout import fit_text, glyph_widths, wrap_text
+
+ROUNDS = 200
+TITLES = [
+    "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳，SPF50+ PA++++ 也不黏膩！",
+    "「2026 春夏彩妝趨勢」Dior、Chanel、YSL 新品一次看，還有 Instagram 網友最愛的平價替代品完整清單",
+    "孕期保養怎麼做？婦產科醫師解答 12 個常見問題：A 酸、水楊酸、果酸能不能用、防曬該選物理性還是化學性" * 2,
+]
+
+
+def char_limit_wrap(title, char_limit=36):
+    """舊版換行邏輯：只計算字數。"""
+    lines = []
+    for user_line in title.split('\n'):
+        current_line = ""
+        for char in user_line:
+            if len(current_line) < char_limit:
+                current_line += char
+            else:
+                lines.append(current_line)
+                current_line = char
+        if current_line:
+            lines.append(current_line)
+    return [line.strip() for line in lines if line.strip()]
+
+
+def median_us(fn, before=None):
+    samples = []
+    for _ in range(ROUNDS):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    if len(sys.argv) > 1:
+        render.font_registry = FontRegistry({"bench": {"bold": sys.argv[1]}}, default_family="bench")
+    # 與 1:1 卡片的標題文字框相同的寬度與字級範圍
+    layer = next(layer for layer in get_card_registry().spec("1:1")["layers"] if layer["type"] == "textbox")
+    size, min_size = layer["font"]["size"], layer["font"]["min_size"]
+    x0, y0, x1, y1 = layer["box"]
+    font = render.get_font(size, bold=True)
+    max_width = x1 - x0
+    get_font = lambda size: render.get_font(size, bold=True)
+
+    print(f"{'字數':>5} {'舊版字數換行':>14} {'字寬換行 (冷)':>14} {'字寬換行 (熱)':>14} {'自動縮字 (熱)':>14}  (µs)")
+    for title in TITLES:
+        old = median_us(lambda: char_limit_wrap(title))
+        cold = median_us(lambda: wrap_text(title, font, max_width), before=glyph_widths.clear)
+        warm = median_us(lambda: wrap_text(title, font, max_width))
+        fit = median_us(lambda: fit_text(title, get_font, max_width, y1 - y0, size, min_size))
+        print(f"{len(title):>5} {old:>14.1f} {cold:>14.1f} {warm:>14.1f} {fit:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
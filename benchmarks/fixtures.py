@@ -0,0 +1,246 @@
+"""效能量測用的合成資料與錄製的來源 fixture。"""
+import os
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+
+def make_rss(n_items=60, body_chars=8000, tag="bench"):
+    """產生含 n_items 篇文章、每篇附 body_chars 字 HTML 內文的 RSS 2.0 文件 (bytes)。"""
+    start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    body = ("<p>美妝保養重點整理 skincare tips " * (body_chars // 30 + 1))[:body_chars]
+    items = []
+    for i in range(n_items):
+        items.append(
+            "<item>"
+            f"<title>{tag} 熱門文章 {i}：夏季防曬與保濕全攻略</title>"
+            f"<link>https://example.com/{tag}/{i}</link>"
+            f"<guid>https://example.com/{tag}/{i}</guid>"
+            f"<pubDate>{format_datetime(start - timedelta(hours=i))}</pubDate>"
+            f"<description><![CDATA[{body}]]></description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+        f"<title>{tag}</title>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def make_photo(width=4000, height=3000, quality=90):
+    """產生模擬手機照片的 JPEG (預設 12 MP，含雜訊以避免壓縮得過小)。"""
+    from io import BytesIO
+
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 40)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    photo = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    output = BytesIO()
+    photo.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def make_report_rows(n_rows):
+    """產生 n_rows 列與報表相同欄位的資料 (欄位名稱, 列迭代器)，不會一次建出所有列。"""
+    columns = ["標題", "連結", "發佈時間", "來源"]
+    sites = ["妞新聞", "Women's Health TW", "BEAUTY美人圈", "A Day Magazine", "The Femin"]
+    rows = (
+        (
+            f"熱門文章 {i}：夏季防曬與保濕全攻略",
+            f"https://example.com/articles/{i}",
+            f"2026-06-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}",
+            sites[i % len(sites)],
+        )
+        for i in range(n_rows)
+    )
+    return columns, rows
+
+
+SITES = ["妞新聞", "Women's Health TW", "BEAUTY美人圈", "A Day Magazine", "The Femin"]
+BRANDS = ["Dior", "Chanel", "YSL", "SK-II", "MAC", "NARS", "Kiehl's", "Clinique", "Sulwhasoo", "Laneige"]
+COMMON_CHARS = (
+    "的一是在不了有和人這中大為上個國我以要他時來用們生到作地於出就分對成會可主發年動同工也能下過子說產種面而方"
+    "後多定行學法所民得經十三之進著等部度家電力裡如水化高自二理起小物現實加量都兩體制機當使點從業本去把性好應開它"
+    "合還因由其些然前外天政四日那社義事平形相全表間樣與關各重新線內數正心反你明看原又麼利比或但質氣第向道命此變條"
+    "只沒結解問意建月公無系軍很情者最立代想已通並提直題黨程展五果料象員革位入常文總次品式活設及管特件長求老頭基資"
+    "邊流路級少圖山統接知較將組見計別她手角期根論運農指幾九區強放決西被幹做必戰先回則任取據處隊南給色光門即保治北"
+    "造百規熱領七海口東導器壓志世金增爭濟階油思術極交受聯什認六共權收證改清美再採轉更單風切打白教速花帶安場身車例"
+)
+
+
+def make_titles(n_titles, duplicate_rate=0.1, seed=7):
+    """
+    產生合成標題語料：原創標題由隨機詞彙與品牌組成，約 duplicate_rate 比例為既有標題的轉載版本
+    (加站名後綴、改標點或刪掉一個字)。
+    Returns:
+        list[tuple[str, str, str, int]]: (標題, 網址, 來源, 原始標題的索引；原創文章為自己的索引)
+    """
+    import random
+
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(COMMON_CHARS, k=rng.randrange(2, 5))) for _ in range(5000)]
+    corpus = []
+    for i in range(n_titles):
+        site = rng.choice(SITES)
+        if corpus and rng.random() < duplicate_rate:
+            title, _, _, origin = corpus[rng.randrange(len(corpus))]
+            variant = rng.randrange(3)
+            if variant == 0:
+                title = f"{title}｜{site}"
+            elif variant == 1:
+                title = title.replace("：", "！").replace("，", " ")
+            else:
+                cut = rng.randrange(len(title))
+                title = title[:cut] + title[cut + 1:]
+        else:
+            words = rng.choices(vocabulary, k=rng.randrange(5, 9))
+            words.insert(rng.randrange(len(words)), rng.choice(BRANDS))
+            split = rng.randrange(2, len(words) - 1)
+            title = "".join(words[:split]) + rng.choice("：，！") + "".join(words[split:])
+            origin = i
+        corpus.append((title, f"https://example.com/{site}/{i}", site, origin))
+    return corpus
+
+
+def make_json_feed(n_items=60, tag="bench"):
+    """產生與 make_rss 內容相同的 JSON Feed 1.1 文件 (bytes)。"""
+    import json
+
+    start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    items = [
+        {
+            "id": f"https://example.com/{tag}/{i}",
+            "url": f"https://example.com/{tag}/{i}",
+            "title": f"{tag} 熱門文章 {i}：夏季防曬與保濕全攻略",
+            "content_text": "美妝保養重點整理 skincare tips " * 20,
+            "date_published": (start - timedelta(hours=i)).isoformat(),
+        }
+        for i in range(n_items)
+    ]
+    return json.dumps({"version": "https://jsonfeed.org/version/1.1", "title": tag, "items": items},
+                      ensure_ascii=False).encode("utf-8")
+
+
+def make_sitemap(n_urls=1000, tag="bench"):
+    """產生 Google News sitemap (bytes)；網址順序刻意打亂，日期最新的不在最前面。"""
+    start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    urls = []
+    for i in range(n_urls):
+        j = (i * 7919) % n_urls
+        urls.append(
+            f"<url><loc>https://example.com/{tag}/{j}</loc><news:news>"
+            f"<news:publication_date>{(start - timedelta(hours=j)).isoformat()}</news:publication_date>"
+            f"<news:title>{tag} 熱門文章 {j}：夏季防曬與保濕全攻略</news:title></news:news></url>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">'
+        f"{''.join(urls)}</urlset>"
+    ).encode("utf-8")
+
+
+def serve_fixtures(routes):
+    """
+    在本機隨機埠啟動 HTTP 伺服器 (背景執行緒)，模擬各種來源行為。
+    Args:
+        routes (dict): {路徑: {"body": bytes, "delay": 秒, "fail_rate": 回傳 503 的機率,
+            "status": 固定狀態碼, "content_type": str}}
+    Returns:
+        tuple[ThreadingHTTPServer, str, dict]: (伺服器，呼叫 shutdown() 停止；網址前綴；{路徑: 請求次數})
+    """
+    import random
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng = random.Random(11)
+    hits = {path: 0 for path in routes}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            route = routes.get(self.path)
+            if route is None:
+                self.send_error(404)
+                return
+            with lock:
+                hits[self.path] += 1
+                failed = rng.random() < route.get("fail_rate", 0)
+            time.sleep(route.get("delay", 0))
+            status = 503 if failed else route.get("status", 200)
+            if status != 200:
+                self.send_error(status)
+                return
+            body = route["body"]
+            self.send_response(200)
+            self.send_header("Content-Type", route.get("content_type", "application/xml"))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass   # 客戶端讀到足夠的文章後提早關閉連線
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", hits
+
+
+FEED_FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "data", "feeds")
+
+
+def record_feeds(feeds, directory=FEED_FIXTURE_DIR, timeout=20):
+    """
+    下載真實來源的目前內容存為 fixture (需要網路，只在更新 fixture 時執行)。
+    檔名為來源序號，另存 index.json 對應來源名稱。
+    """
+    import json
+    from urllib.request import Request, urlopen
+
+    from hotnews.feeds import USER_AGENT
+
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+    for i, (site, url) in enumerate(feeds.items()):
+        with urlopen(Request(url, headers={"User-Agent": USER_AGENT}), timeout=timeout) as response:
+            body = response.read()
+        name = f"feed{i}.xml"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(body)
+        index[name] = site
+    with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index
+
+
+def load_feed_fixtures(directory=FEED_FIXTURE_DIR):
+    """
+    讀取 record_feeds 錄下的來源內容；沒有錄製檔時以 make_rss 產生 5 個合成來源。
+    Returns:
+        tuple[dict, str]: ({來源名稱: bytes}, "recorded" 或 "synthetic")
+    """
+    import json
+
+    index_path = os.path.join(directory, "index.json")
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        feeds = {}
+        for name, site in index.items():
+            with open(os.path.join(directory, name), "rb") as f:
+                feeds[site] = f.read()
+        return feeds, "recorded"
+    return {site: make_rss(60, tag=f"site{i}") for i, site in enumerate(SITES)}, "synthetic"
+
+
+def make_template(n_variables=200, n_lines=2000):
+    """產生大型 Prompt 模板：n_lines 行文字，穿插 n_variables 個不同的 {{變數}} (每個出現多次)。"""
+    lines = []
+    for i in range(n_lines):
+        name = f"變數{i % n_variables}"
+        lines.append(f"第 {i} 段：夏季防曬與保濕重點 {{{{{name}}}}}，搭配 {{{{ {name} }}}} 使用效果更好。")
+    return "\n".join(lines)
@@ -0,0 +1,400 @@
+"""
+離線的整體效能量測：抓取與報表、卡片渲染、Prompt 產生與匯出。
+
+不需要 Streamlit 或外部網路 (來源由本機 fixture 伺服器提供)，輸出 JSON，
+並可與儲存的基準值比較；p50 或記憶體峰值超過基準值 (1 + tolerance) 倍時視為退步，結束代碼為 1。
+記憶體峰值以 tracemalloc 量測，只含 Python 配置 (Pillow 影像與 Arrow 緩衝區不計入)。
+
+    python -m benchmarks.harness                          # 執行全部並與 benchmarks/baseline.json 比較
+    python -m benchmarks.harness -k render --output out.json
+    python -m benchmarks.harness --save-baseline          # 以這次結果更新基準值
+    python -m benchmarks.harness --record-feeds           # 重新錄製真實來源 (需要網路)
+
+基準值與機器有關，更換執行環境時請先在舊版程式上 --save-baseline 再比較。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from benchmarks import fixtures
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOLERANCE = 0.25
+MEMORY_FLOOR_KB = 64
+MIN_ITERATIONS = 5
+MAX_ITERATIONS = 200
+TIME_BUDGET = 2.0        # 每個項目最多量測幾秒 (至少 MIN_ITERATIONS 次)
+
+CASES = {}
+
+
+def case(name, unit="ops", items=1):
+    """
+    註冊量測項目。被裝飾的函式為 context manager 形式的產生器：準備資料後 yield 一個
+    無參數的函式 (每次迭代呼叫一次)，結束後清理。items 為每次呼叫處理的單位數，用於計算吞吐量。
+    """
+    def decorator(setup):
+        CASES[name] = {"setup": contextmanager(setup), "unit": unit, "items": items}
+        return setup
+    return decorator
+
+
+# ================= 抓取與報表 =================
+
+@case("ingest.fetch_top5_each_site", unit="feeds", items=len(fixtures.SITES))
+def _fetch_top5():
+    from hotnews.feeds import HostThrottle, fetch_top5_each_site
+    from hotnews.sources import SourceRegistry
+
+    bodies, _ = fixtures.load_feed_fixtures()
+    routes = {f"/feed{i}": {"body": body} for i, body in enumerate(bodies.values())}
+    server, base, _ = fixtures.serve_fixtures(routes)
+    feeds = {site: f"{base}/feed{i}" for i, site in enumerate(bodies)}
+    try:
+        yield lambda: fetch_top5_each_site(
+            feeds, cache=False, registry=SourceRegistry([]),
+            throttle=HostThrottle(min_interval=0, max_concurrency=len(feeds)),
+        )
+    finally:
+        server.shutdown()
+
+
+@case("ingest.stream_parse", unit="feeds", items=len(fixtures.SITES))
+def _stream_parse():
+    from itertools import islice
+
+    from hotnews.feeds import TOP_N, parse_entries
+    from hotnews.stream_parser import iter_feed_entries
+
+    bodies, _ = fixtures.load_feed_fixtures()
+    # 與網路讀取相同，以 16 KB 區塊逐段餵給解析器 (讀到前 5 篇即停止)
+    chunked = {site: [body[i:i + 16384] for i in range(0, len(body), 16384)] for site, body in bodies.items()}
+
+    def run():
+        for site, chunks in chunked.items():
+            list(islice(parse_entries(iter_feed_entries(chunks), site), TOP_N))
+    yield run
+
+
+@case("ingest.store_add_entries", unit="articles", items=100)
+def _store_add():
+    import tempfile
+
+    import feedparser
+
+    from hotnews.store import ArticleStore
+
+    entries = feedparser.parse(fixtures.make_rss(100, body_chars=500)).entries
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArticleStore(os.path.join(tmp, "articles.sqlite3"))
+        rounds = iter(range(10 ** 9))
+
+        def run():
+            # 每次換一個來源名稱與連結，確保都是新文章
+            i = next(rounds)
+            for entry in entries:
+                entry["link"] = entry["id"] = f"{entry['link'].split('#')[0]}#{i}"
+            store.add_entries(f"site{i}", entries, now=1_780_000_000 + i)
+        yield run
+
+
+# ================= 卡片渲染 =================
+
+TITLE = "夏季防曬全攻略：皮膚科醫師推薦的 10 款清爽防曬乳"
+BACKGROUNDS = {"small": (800, 600), "medium": (1920, 1080), "large": (4000, 3000)}
+
+
+def _clear_render_caches():
+    from hotnews import render
+
+    for cache in (render.render_cache, render.background_cache, render.base_cache):
+        cache.clear()
+
+
+def _register_render_cases():
+    for size, (width, height) in BACKGROUNDS.items():
+        @case(f"render.cold_{size}", unit="cards")
+        def _cold(width=width, height=height):
+            from hotnews.render import generate_visual_content
+
+            photo = fixtures.make_photo(width, height)
+
+            def run():
+                _clear_render_caches()
+                generate_visual_content(TITLE, "1:1", photo)
+            yield run
+
+
+_register_render_cases()
+
+
+@case("render.title_only", unit="cards")
+def _title_only():
+    from hotnews.render import generate_visual_content
+
+    photo = fixtures.make_photo(*BACKGROUNDS["medium"])
+    generate_visual_content(TITLE, "1:1", photo)
+    titles = iter(range(10 ** 9))
+    # 背景與遮罩已在快取中，每次只重畫不同的標題 (模擬逐字輸入)
+    yield lambda: generate_visual_content(f"{TITLE} {next(titles)}", "1:1", photo)
+
+
+@case("render.preview_title_only", unit="cards")
+def _preview_title_only():
+    from hotnews.render import PREVIEW_SCALE, generate_visual_content
+
+    photo = fixtures.make_photo(*BACKGROUNDS["medium"])
+    generate_visual_content(TITLE, "1:1", photo, PREVIEW_SCALE)
+    titles = iter(range(10 ** 9))
+    # 與 render.title_only 相同，但以畫面預覽的縮小版面渲染
+    yield lambda: generate_visual_content(f"{TITLE} {next(titles)}", "1:1", photo, PREVIEW_SCALE)
+
+
+@case("render.png_encode", unit="cards")
+def _png_encode():
+    from hotnews.encoding import encode_image
+    from hotnews.render import generate_visual_content
+
+    image = generate_visual_content(TITLE, "4:3", fixtures.make_photo(*BACKGROUNDS["medium"]))
+    yield lambda: encode_image(image, "png")
+
+
+@case("render.encode_target_size", unit="cards")
+def _encode_target_size():
+    from hotnews.encoding import encode_image
+    from hotnews.render import generate_visual_content
+
+    # 指定檔案大小上限 (約為預設品質 JPEG 的一半)，量測品質搜尋的總成本
+    image = generate_visual_content(TITLE, "1:1", fixtures.make_photo(*BACKGROUNDS["medium"]))
+    max_bytes = len(encode_image(image, "jpeg").data) // 2
+    yield lambda: encode_image(image, "jpeg", max_bytes=max_bytes)
+
+
+@case("render.canvas_banner", unit="cards")
+def _canvas_banner():
+    from hotnews.canvas import draw_spec
+    from hotnews.card_templates import get_card_registry
+
+    # 內建背景已在快取中，每次依版面規格重畫整張 800x450 橫幅
+    spec = get_card_registry().spec("news_banner")
+    draw_spec(spec, {"title": TITLE})
+    yield lambda: draw_spec(spec, {"title": TITLE})
+
+
+# ================= Prompt 產生 =================
+
+@case("prompt.extract_variables", unit="templates")
+def _extract_variables():
+    from hotnews.prompts import extract_variables
+
+    template = fixtures.make_template()
+    yield lambda: extract_variables(template)
+
+
+@case("prompt.generate_prompt", unit="prompts")
+def _generate_prompt():
+    from hotnews.prompts import STYLE_CONFIG, extract_variables, generate_prompt
+
+    template = fixtures.make_template()
+    values = {name: f"{name} 的內容" for name in extract_variables(template)}
+    style = next(iter(STYLE_CONFIG))
+    yield lambda: generate_prompt(style, template, "核心內容" * 100, values)
+
+
+@case("prompt.batch_csv_5k", unit="prompts", items=5000)
+def _batch_prompts():
+    import csv
+    import io
+
+    from hotnews.prompts import DEFAULT_TEMPLATES, STYLE_CONFIG, extract_variables, generate_prompts
+    from hotnews.templates import read_csv_rows
+
+    template = DEFAULT_TEMPLATES["產品發表模板"]
+    output = io.StringIO()
+    writer = csv.writer(output)
+    variables = extract_variables(template)
+    writer.writerow(variables)
+    writer.writerows([f"{var} 第 {i} 列" for var in variables] for i in range(5000))
+    data = output.getvalue().encode("utf-8")
+    style = next(iter(STYLE_CONFIG))
+    yield lambda: list(generate_prompts(style, template, read_csv_rows(data), "核心內容"))
+
+
+# ================= 命令列 =================
+
+@case("cli.startup", unit="runs")
+def _cli_startup():
+    import subprocess
+
+    # 排程工作的啟動成本：新的直譯器載入 hotnews.cli 並解析參數 (不應匯入 pandas / Pillow)
+    command = [sys.executable, "-m", "hotnews", "report", "--help"]
+    yield lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+
+
+# ================= 匯出 =================
+
+@case("export.xlsx_10k", unit="rows", items=10_000)
+def _export_xlsx():
+    from io import BytesIO
+
+    from hotnews.export import export_rows
+
+    columns, rows = fixtures.make_report_rows(10_000)
+    rows = list(rows)
+    yield lambda: export_rows(columns, iter(rows), BytesIO(), "xlsx")
+
+
+# ================= 執行與比較 =================
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_case(name, time_budget=TIME_BUDGET):
+    spec = CASES[name]
+    with spec["setup"]() as run:
+        run()   # 暖身 (載入字型、建立連線等一次性成本)
+        gc.collect()
+        latencies = []
+        started = time.perf_counter()
+        while len(latencies) < MAX_ITERATIONS and (
+            len(latencies) < MIN_ITERATIONS or time.perf_counter() - started < time_budget
+        ):
+            t0 = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - t0)
+
+        # 記憶體峰值另外量一次 (tracemalloc 會拖慢執行，不與計時混在一起)
+        gc.collect()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+        if not tracing:
+            tracemalloc.stop()
+
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    return {
+        "iterations": len(latencies),
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "mean_ms": mean * 1000,
+        "throughput": spec["items"] / mean,
+        "unit": f"{spec['unit']}/s",
+        "peak_kb": peak_bytes / 1024,
+    }
+
+
+def run_all(pattern=None, time_budget=TIME_BUDGET, log=None):
+    results = {}
+    for name in CASES:
+        if pattern and pattern not in name:
+            continue
+        results[name] = run_case(name, time_budget)
+        if log:
+            r = results[name]
+            log(f"{name:<32} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+                f"{r['throughput']:>10.1f} {r['unit']:<14} peak {r['peak_kb']:>9.0f} KB")
+    _, feed_fixtures = fixtures.load_feed_fixtures()
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "feed_fixtures": feed_fixtures,
+            "streamlit_loaded": "streamlit" in sys.modules,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """
+    與基準值比較。
+    Returns:
+        list[dict]: {"name", "metric", "baseline", "current", "ratio", "regressed"}，只含兩邊都有的項目。
+    """
+    rows = []
+    for name, current in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "peak_kb"):
+            if not previous[metric]:
+                continue
+            ratio = current[metric] / previous[metric]
+            # 記憶體只有幾 KB 的項目比例容易跳動，增加量低於 MEMORY_FLOOR_KB 時不算退步
+            significant = metric != "peak_kb" or current[metric] - previous[metric] > MEMORY_FLOOR_KB
+            rows.append({
+                "name": name, "metric": metric, "baseline": previous[metric], "current": current[metric],
+                "ratio": ratio, "regressed": ratio > 1 + tolerance and significant,
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HotNews 離線效能量測")
+    parser.add_argument("-k", dest="pattern", help="只執行名稱包含此字串的項目")
+    parser.add_argument("--output", help="將結果 JSON 寫入檔案 (預設輸出到標準輸出)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基準值 JSON 路徑")
+    parser.add_argument("--save-baseline", action="store_true", help="以這次結果更新基準值")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="允許的退步比例 (預設 0.25)")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET, help="每個項目的量測秒數")
+    parser.add_argument("--record-feeds", action="store_true", help="重新錄製真實來源 fixture (需要網路)")
+    args = parser.parse_args(argv)
+
+    if args.record_feeds:
+        from hotnews.feeds import RSS_FEEDS
+        for name, site in fixtures.record_feeds(RSS_FEEDS).items():
+            print(f"已錄製 {site} → {name}", file=sys.stderr)
+        return 0
+
+    log = lambda line: print(line, file=sys.stderr)
+    report = run_all(args.pattern, args.time_budget, log)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.save_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline["results"] = json.load(f)["results"]
+        baseline["results"].update(report["results"])
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        log(f"\n已更新基準值：{args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        log("\n沒有基準值，略過比較 (使用 --save-baseline 建立)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.tolerance)
+    log(f"\n{'項目':<32} {'指標':<8} {'基準':>10} {'目前':>10} {'比例':>7}")
+    for row in rows:
+        flag = "  ⚠️ 退步" if row["regressed"] else ""
+        log(f"{row['name']:<32} {row['metric']:<8} {row['baseline']:>10.2f} {row['current']:>10.2f} "
+            f"{row['ratio']:>7.2f}{flag}")
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
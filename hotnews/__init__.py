@@ -0,0 +1,11 @@
+"""
+熱門新聞報表工具的核心邏輯 (不依賴 Streamlit)。
+
+app.py 與 pages/ 只負責 UI，RSS 抓取、報表與圖片生成等功能都放在這個套件中，
+方便在測試、效能量測或排程工作中直接重用。
+"""
+
+import os
+
+# 快取、文章庫等本機資料檔的存放目錄 (可用環境變數 HOTNEWS_DATA_DIR 覆寫)
+DATA_DIR = os.environ.get("HOTNEWS_DATA_DIR", ".hotnews")
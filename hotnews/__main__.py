@@ -0,0 +1,5 @@
+import sys
+
+from hotnews.cli import main
+
+sys.exit(main())
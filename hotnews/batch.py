@@ -0,0 +1,130 @@
+"""
+批次產生報表中每個標題的卡片圖片，並逐張寫入 ZIP 或目錄。
+
+Pillow 的文字繪製與影像編碼都是 CPU 密集的工作，因此以行程池平行渲染；
+完成的圖片立刻寫入 ZIP 檔，同一時間只保留少量尚未寫出的結果在記憶體中。
+"""
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from hotnews.encoding import encode_image, get_format
+from hotnews.render import generate_visual_content
+
+BATCH_RATIOS = ('1:1', '4:3')
+# 不用 fork 啟動 worker：Streamlit 與背景輪詢器的執行緒在 fork 時可能正持有鎖，子行程會卡住。
+# forkserver 只在 POSIX 可用，其他平台使用 spawn。
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# 行程池中每個 worker 共用的背景圖片與編碼設定 (由 initializer 設定一次，不隨每個工作傳遞)
+_worker_background = None
+_worker_encoding = ("png", None)
+
+
+def _init_worker(image_bytes, fmt="png", max_bytes=None):
+    global _worker_background, _worker_encoding
+    _worker_background = image_bytes
+    _worker_encoding = (fmt, max_bytes)
+
+
+def _render_job(job):
+    index, title, ratio = job
+    img = generate_visual_content(title, ratio, _worker_background)
+    fmt, max_bytes = _worker_encoding
+    return index, title, ratio, encode_image(img, fmt, max_bytes=max_bytes).data
+
+
+def card_filename(index, title, ratio, extension="png"):
+    """ZIP 內的檔名，例如 01_夏季防曬全攻略_1x1.png。"""
+    safe_title = re.sub(r'[\\/:*?"<>|\s]+', '_', title.strip())[:20] or "untitled"
+    return f"{index + 1:02d}_{safe_title}_{ratio.replace(':', 'x')}.{extension}"
+
+
+def render_cards(titles, write, ratios=BATCH_RATIOS, image_bytes=None, max_workers=None, progress=None,
+                 fmt="png", max_bytes=None):
+    """
+    為每個標題 × 比例渲染卡片，依完成順序交給 write(檔名, 位元組)。
+    Args:
+        titles (list[str]): 文章標題。
+        write (Callable[[str, bytes], None]): 寫出一張卡片 (在呼叫端的執行緒執行)。
+        ratios (Iterable[str]): 要產生的比例或 card_templates.json 中的模板名稱。
+        image_bytes (Optional[bytes]): 背景圖片。
+        max_workers (Optional[int]): 行程數，預設為 CPU 核心數。
+        progress (Optional[Callable[[int, int], None]]): 每完成一張呼叫 progress(已完成, 總數)。
+        fmt (str): 圖片格式 (見 hotnews/encoding.py 的 FORMATS)。
+        max_bytes (Optional[int]): 每張圖片的檔案大小上限。
+    Returns:
+        dict: {"images", "bytes", "seconds", "images_per_sec"}
+    Raises:
+        ValueError: 不支援的圖片格式。
+    """
+    extension = get_format(fmt).extension
+    jobs = [(index, title, ratio) for index, title in enumerate(titles) for ratio in ratios]
+    total = len(jobs)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * 2
+    started = time.perf_counter()
+    done_count = 0
+    written = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(START_METHOD),
+                             initializer=_init_worker, initargs=(image_bytes, fmt, max_bytes)) as executor:
+        pending = set()
+        job_iter = iter(jobs)
+        while True:
+            # 只保留有限數量的進行中工作，避免結果堆積在記憶體
+            for job in job_iter:
+                pending.add(executor.submit(_render_job, job))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, title, ratio, data = future.result()
+                write(card_filename(index, title, ratio, extension), data)
+                written += len(data)
+                done_count += 1
+                if progress:
+                    progress(done_count, total)
+
+    seconds = time.perf_counter() - started
+    return {
+        "images": total,
+        "bytes": written,
+        "seconds": seconds,
+        "images_per_sec": total / seconds if seconds else 0.0,
+    }
+
+
+def render_cards_zip(titles, output, **options):
+    """
+    渲染卡片並依完成順序寫入 ZIP。
+    Args:
+        titles (list[str]): 文章標題。
+        output (file-like): 可寫入的二進位檔案 (建議使用暫存檔，避免整個 ZIP 留在記憶體)。
+        **options: 見 render_cards。
+    """
+    # 所有圖片格式都已經壓縮過，ZIP 內直接儲存即可
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        return render_cards(titles, archive.writestr, **options)
+
+
+def render_cards_dir(titles, directory, **options):
+    """
+    渲染卡片並逐張寫入目錄 (不存在時建立)。
+    Args:
+        titles (list[str]): 文章標題。
+        directory (str): 輸出目錄。
+        **options: 見 render_cards。
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def write(name, data):
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+    return render_cards(titles, write, **options)
@@ -0,0 +1,511 @@
+"""
+伺服器端的圖卡版面引擎：以宣告式的版面規格 (dict，可直接存成 JSON) 描述背景、色塊與文字，
+由 Pillow 繪製。各平台的版面定義在 hotnews/card_templates.json (見 hotnews/card_templates.py)。
+
+規格格式：
+    {
+        "size": [寬, 高],
+        "background": {"color": "#1e3a8a", "image": "default"},   # image 省略時只填底色
+        "resample": "lanczos",                                    # 背景縮放方式 (見 RESAMPLING)，預設 lanczos
+        "layers": [
+            {"type": "rect", "box": [x0, y0, x1, y1], "fill": [R, G, B, A]},
+            {"type": "text", "text": "今日熱點", "font": {"size": 45, "weight": "regular"},
+             "fill": "#FFD700", "x": 400, "chunk": 12, "baselines": [[310]]},
+            {"type": "textbox", "text": "{title}", "box": [x0, y0, x1, y1],
+             "font": {"size": 40, "min_size": 24, "weight": "bold"}, "line_spacing": 1.3,
+             "fill": "#ffffff", "align": "center", "valign": "middle", "placeholder": "..."},
+        ],
+    }
+
+文字可使用 {變數}。text 圖層依字數斷行 (chunk 為每行字數，baselines[n - 1] 為共 n 行時各行基線的 Y 座標，
+超過的行數會被截掉，x 為水平中心)；textbox 圖層依實際字寬換行，放不進文字框時在 size 與 min_size
+之間自動縮小字級。
+
+每份規格編譯一次為 CardPlan：第一個含變數的圖層之前的靜態圖層 (背景、遮罩、固定文字) 預先畫成底圖，
+依背景圖快取；之後每次渲染只需複製底圖並畫上含變數的圖層。
+
+畫面上的預覽以 scale_spec (CardPlan.scaled) 縮小整份規格 (尺寸、座標與字級等比例縮小，背景以 draft 方式縮放)
+後渲染，只有下載時才以原尺寸與 LANCZOS 渲染。
+"""
+import hashlib
+import json
+import math
+import os
+import string
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from hotnews.encoding import EncodedImage, encode_image
+from hotnews.fonts import font_registry
+from hotnews.metrics import get_metrics
+from hotnews.text_layout import fit_text
+
+BACKGROUND_COLOR = '#1e3a8a'
+DEFAULT_BACKGROUND_PATH = os.path.join(os.path.dirname(__file__), "assets", "default_background.jpg")
+
+# 各階段的快取上限：背景 (解碼 + 縮放裁剪) 與底圖 (背景 + 靜態圖層) 只與 (模板, 背景圖雜湊) 有關，
+# 修改標題時只需要重畫文字層
+BACKGROUND_CACHE_BYTES = 32 * 1024 * 1024
+BASE_CACHE_BYTES = 32 * 1024 * 1024
+CANVAS_CACHE_BYTES = 32 * 1024 * 1024
+DIGEST_CACHE_SIZE = 4            # 記住最近幾張背景圖的雜湊 (依物件身分)
+SHARED_SOURCE_MAX_SCALE = 0.75   # 共用背景圖需縮小到此比例以下時，才先縮小一次再給各版面使用
+
+# 背景縮放方式：{名稱: (濾波器, reducing_gap)}。draft 先以整數倍 reduce 再做雙線性插值，供預覽使用
+RESAMPLING = {
+    "lanczos": (Image.Resampling.LANCZOS, None),
+    "draft": (Image.Resampling.BILINEAR, 2.0),
+}
+
+metrics = get_metrics()
+
+# ================= 渲染快取 =================
+
+
+_digests = OrderedDict()  # id(bytes) -> (bytes, 雜湊)；保留物件參考，快取期間 id 不會被重複使用
+_digests_lock = threading.Lock()
+
+
+def image_digest(image_bytes):
+    """
+    背景圖片內容的雜湊，作為快取鍵的一部分；沒有背景圖時回傳 None。
+    12 MP 照片的 SHA-1 約需數毫秒，一次重新執行中同一個 bytes 物件會查詢多個快取，因此依物件身分記住結果。
+    """
+    if not image_bytes:
+        return None
+    with _digests_lock:
+        cached = _digests.get(id(image_bytes))
+        if cached is not None and cached[0] is image_bytes:
+            _digests.move_to_end(id(image_bytes))
+            return cached[1]
+    digest = hashlib.sha1(image_bytes).hexdigest()
+    with _digests_lock:
+        _digests[id(image_bytes)] = (image_bytes, digest)
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+class RenderCache:
+    """
+    LRU 快取，依圖片實際佔用的位元組數控制記憶體上限。
+    每筆資料同時保存渲染結果與 (需要時才產生的) 編碼結果，例如 {"image": Image, ("png", None): EncodedImage}。
+    取出的 Image 為共用物件，呼叫端不可直接修改。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> {"image": Image, 編碼鍵: EncodedImage, ...}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(entry):
+        img = entry["image"]
+        encoded = sum(len(value.data) for value in entry.values() if isinstance(value, EncodedImage))
+        return img.width * img.height * len(img.getbands()) + encoded
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(old)
+            self._entries[key] = entry
+            self._bytes += self._size(entry)
+            # 淘汰最久未使用的項目 (至少保留剛放入的這一筆)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+background_cache = RenderCache(BACKGROUND_CACHE_BYTES)
+base_cache = RenderCache(BASE_CACHE_BYTES)
+canvas_cache = RenderCache(CANVAS_CACHE_BYTES)
+
+
+def _cached_image(cache, key, build):
+    entry = cache.get(key)
+    if entry is None:
+        entry = {"image": build()}
+        cache.put(key, entry)
+    return entry["image"]
+
+# ================= 背景圖 =================
+
+
+@lru_cache(maxsize=1)
+def default_background():
+    """內建背景圖的位元組；檔案不存在時回傳 None (改用底色)。"""
+    try:
+        with open(DEFAULT_BACKGROUND_PATH, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def decode_image(image_bytes, min_size=None):
+    """
+    解碼背景圖為 RGB。指定 min_size 時，JPEG 直接以 DCT 縮小解碼 (draft)，
+    結果的寬高仍不小於 min_size，之後再以 LANCZOS 縮放，畫質不受影響。
+    """
+    img = Image.open(BytesIO(image_bytes))
+    if min_size is not None:
+        img.draft("RGB", tuple(int(v) for v in min_size))
+    return img.convert("RGB")
+
+
+class SharedSource:
+    """
+    同一張背景圖在多個版面間共用的解碼結果：第一次需要時才解碼一次 (依所有版面中最大的尺寸縮小解碼)，
+    再以 LANCZOS 縮小一次到所有版面都還能完整覆蓋的尺寸，之後各版面都從這張較小的圖縮放。
+    """
+
+    def __init__(self, image_bytes, sizes):
+        self.image_bytes = image_bytes
+        self.sizes = list(sizes)
+        self.min_size = (max(w for w, _ in self.sizes), max(h for _, h in self.sizes))
+        self._image = None
+
+    def image(self):
+        if self._image is None:
+            img = decode_image(self.image_bytes, self.min_size)
+            scale = max(max(w / img.width, h / img.height) for w, h in self.sizes)
+            if scale < SHARED_SOURCE_MAX_SCALE:
+                img = img.resize((math.ceil(img.width * scale), math.ceil(img.height * scale)), Image.Resampling.LANCZOS)
+            self._image = img
+        return self._image
+
+
+def fit_cover(img, WIDTH, HEIGHT, resample="lanczos"):
+    """等比例縮放到完全覆蓋 WIDTH x HEIGHT 後置中裁剪 (resample 見 RESAMPLING)。"""
+    # START: 圖片置中裁剪邏輯以保持比例
+    resample_filter, reducing_gap = RESAMPLING[resample]
+    img_width, img_height = img.size
+    target_ratio = WIDTH / HEIGHT
+
+    if img_width / img_height > target_ratio:
+        # 圖片太寬，按高度縮放，寬度裁剪
+        new_height = HEIGHT
+        new_width = int(img_width * (HEIGHT / img_height))
+        img = img.resize((new_width, new_height), resample_filter, reducing_gap=reducing_gap)
+
+        # 置中裁剪
+        left = (new_width - WIDTH) / 2
+        top = 0
+        right = left + WIDTH
+        bottom = HEIGHT
+    else:
+        # 圖片太高，按寬度縮放，高度裁剪
+        new_width = WIDTH
+        new_height = int(img_height * (WIDTH / img_width))
+        img = img.resize((new_width, new_height), resample_filter, reducing_gap=reducing_gap)
+
+        # 置中裁剪
+        left = 0
+        top = (new_height - HEIGHT) / 2
+        right = WIDTH
+        bottom = top + HEIGHT
+
+    return img.crop((int(left), int(top), int(right), int(bottom)))
+    # END: 圖片置中裁剪邏輯以保持比例
+
+# ================= 圖層 =================
+
+
+class _Values(dict):
+    """format_map 用：沒有提供值的變數以空字串代替。"""
+
+    def __missing__(self, key):
+        return ""
+
+
+def _format(layer, values, single_line=False):
+    """代入變數；single_line=True 時把換行改為空白 (只能排成固定字數一行的圖層)。"""
+    text = layer["text"].format_map(_Values(values))
+    return text.replace("\n", " ") if single_line else text
+
+
+def _font(layer, size=None):
+    font_spec = layer.get("font", {})
+    return font_registry.get(size or font_spec.get("size", 40), font_spec.get("family"), font_spec.get("weight", "bold"))
+
+
+def _fill(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _paint_rect(draw, layer, values):
+    draw.rectangle(layer["box"], fill=_fill(layer["fill"]))
+
+
+def _paint_text(draw, layer, values):
+    text = _format(layer, values, single_line=True)
+    chunk = layer.get("chunk")
+    baselines = layer["baselines"]
+    lines = [text[i:i + chunk] for i in range(0, len(text), chunk)] if chunk else [text]
+    lines = lines[:len(baselines)] or [""]
+    font = _font(layer)
+    for line, y in zip(lines, baselines[len(lines) - 1]):
+        # anchor "ms"：水平置中、y 為基線，與 canvas 的 textAlign center + alphabetic 相同
+        draw.text((layer["x"], y), line, fill=_fill(layer.get("fill", "#ffffff")), font=font,
+                  anchor=layer.get("anchor", "ms"))
+
+
+_ALIGN = {"left": ("l", 0.0), "center": ("m", 0.5), "right": ("r", 1.0)}
+_VALIGN = {"top": 0.0, "middle": 0.5, "bottom": 1.0}
+
+
+def _paint_textbox(draw, layer, values):
+    text = _format(layer, values) or layer.get("placeholder", "")
+    x0, y0, x1, y1 = layer["box"]
+    font_spec = layer.get("font", {})
+    size = font_spec.get("size", 40)
+    line_spacing = layer.get("line_spacing", 1.3)
+
+    # 依實際字寬換行 (避頭尾)，放不進文字框時自動縮小字級
+    font_size, font, lines = fit_text(
+        text,
+        lambda s: _font(layer, s),
+        max_width=x1 - x0,
+        max_height=y1 - y0,
+        max_size=size,
+        min_size=font_spec.get("min_size", size),
+        line_spacing=line_spacing,
+    )
+
+    # 文字區塊在文字框內依 valign 對齊 (預設垂直置中)
+    line_height = font_size * line_spacing
+    total_text_height = len(lines) * line_height
+    y_start = y0 + (y1 - y0 - total_text_height) * _VALIGN[layer.get("valign", "middle")]
+    anchor_x, position = _ALIGN[layer.get("align", "center")]
+    x = x0 + (x1 - x0) * position
+    for i, line in enumerate(lines):
+        draw.text((x, y_start + i * line_height), line, fill=_fill(layer.get("fill", "#ffffff")), font=font,
+                  anchor=anchor_x + "t")
+
+
+LAYER_PAINTERS = {
+    "rect": _paint_rect,
+    "text": _paint_text,
+    "textbox": _paint_textbox,
+}
+
+# ================= 編譯後的版面 =================
+
+
+def _scale_font(font_spec, scale):
+    scaled = dict(font_spec, size=max(1, round(font_spec.get("size", 40) * scale)))
+    if "min_size" in font_spec:
+        scaled["min_size"] = max(1, round(font_spec["min_size"] * scale))
+    return scaled
+
+
+def scale_spec(spec, scale, resample="draft"):
+    """
+    等比例縮放版面規格 (畫布尺寸、色塊與文字框座標、基線、字級)，供預覽使用。
+    Args:
+        spec (dict): 版面規格。
+        scale (float): 縮放比例，例如 0.5。
+        resample (str): 縮放後規格的背景縮放方式 (見 RESAMPLING)。
+    Returns:
+        dict: 新的版面規格 (不修改原規格)。
+    """
+    layers = []
+    for layer in spec.get("layers", []):
+        layer = dict(layer)
+        if "box" in layer:
+            layer["box"] = [value * scale for value in layer["box"]]
+        if "x" in layer:
+            layer["x"] = layer["x"] * scale
+        if "baselines" in layer:
+            layer["baselines"] = [[y * scale for y in row] for row in layer["baselines"]]
+        if "text" in layer:
+            layer["font"] = _scale_font(layer.get("font", {}), scale)
+        layers.append(layer)
+    size = [max(1, round(value * scale)) for value in spec["size"]]
+    return {**spec, "size": size, "layers": layers, "resample": resample}
+
+
+def spec_hash(spec, values=None, image_bytes=None):
+    """版面規格、變數與背景圖內容的雜湊，作為渲染快取的鍵。"""
+    payload = json.dumps([spec, values or {}, image_digest(image_bytes)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _fields(layer):
+    if "text" not in layer:
+        return set()
+    return {name for _, name, _, _ in string.Formatter().parse(layer["text"]) if name}
+
+
+class CardPlan:
+    """
+    編譯後的版面：第一個含變數的圖層之前都是靜態圖層，預先畫進底圖並依背景圖快取；
+    之後的圖層 (含變數或疊在其上的) 每次渲染時才畫。
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.size = tuple(spec["size"])
+        self.digest = spec_hash(spec)
+        background = spec.get("background", {})
+        self.color = background.get("color", BACKGROUND_COLOR)
+        self.default_image = background.get("image") == "default"
+        self.resample = spec.get("resample", "lanczos")
+        if self.resample not in RESAMPLING:
+            raise ValueError(f"不支援的縮放方式：{self.resample}")
+        self._scaled = {}
+
+        layers = []
+        for layer in spec.get("layers", []):
+            try:
+                layers.append((LAYER_PAINTERS[layer["type"]], layer))
+            except KeyError:
+                raise ValueError(f"不支援的圖層類型：{layer.get('type')}") from None
+        split = next((i for i, (_, layer) in enumerate(layers) if _fields(layer)), len(layers))
+        self.static_layers = tuple(layers[:split])
+        self.dynamic_layers = tuple(layers[split:])
+        self.variables = sorted(set().union(*(_fields(layer) for _, layer in layers)))
+
+    def scaled(self, scale):
+        """縮小後的預覽版面 (見 scale_spec)；scale 為 1 時回傳自己。"""
+        if scale == 1:
+            return self
+        plan = self._scaled.get(scale)
+        if plan is None:
+            plan = self._scaled.setdefault(scale, compile_spec(scale_spec(self.spec, scale)))
+        return plan
+
+    def _image_bytes(self, image_bytes):
+        if image_bytes is None and self.default_image:
+            return default_background()
+        return image_bytes
+
+    def background(self, image_bytes=None, source=None):
+        """第 1 階段：解碼並置中裁剪後的背景圖 (RGB)，依 (背景圖雜湊, 尺寸) 快取。"""
+        image_bytes = self._image_bytes(image_bytes)
+        width, height = self.size
+
+        def build():
+            if image_bytes:
+                try:
+                    decoded = source.image() if source is not None else decode_image(image_bytes, self.size)
+                    return fit_cover(decoded, width, height, self.resample)
+                except Exception:
+                    pass
+            return Image.new("RGB", self.size, color=self.color)
+
+        key = (image_digest(image_bytes), self.size, self.color, self.resample)
+        return _cached_image(background_cache, key, build)
+
+    def base(self, image_bytes=None, source=None):
+        """第 2 階段：背景加上所有靜態圖層的底圖，依 (模板, 背景圖雜湊) 快取。"""
+        image_bytes = self._image_bytes(image_bytes)
+
+        def build():
+            img = self.background(image_bytes, source)
+            if not self.static_layers:
+                return img
+            img = img.copy()
+            self._paint(img, self.static_layers, {})
+            return img
+
+        return _cached_image(base_cache, (self.digest, image_digest(image_bytes)), build)
+
+    @staticmethod
+    def _paint(img, layers, values):
+        # 以 RGBA 模式繪製，半透明的色塊與文字會直接與背景混色
+        draw = ImageDraw.Draw(img, "RGBA")
+        for painter, layer in layers:
+            painter(draw, layer, values)
+
+    def draw(self, base, values=None):
+        """第 3 階段：在底圖的複本上畫出含變數的圖層。"""
+        img = base.copy()
+        self._paint(img, self.dynamic_layers, values or {})
+        return img
+
+    def render(self, values=None, image_bytes=None, source=None):
+        """完整渲染 (底圖取自快取)。"""
+        return self.draw(self.base(image_bytes, source), values)
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def compile_spec(spec):
+    """把版面規格編譯為 CardPlan；相同內容的規格只編譯一次。"""
+    key = spec_hash(spec)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = CardPlan(spec)
+        with _plans_lock:
+            plan = _plans.setdefault(key, plan)
+    return plan
+
+
+def draw_spec(spec, values=None, image_bytes=None):
+    """
+    依版面規格繪製圖卡 (底圖取自快取，不快取最終結果)。
+    Args:
+        spec (dict): 版面規格 (見模組說明)。
+        values (Optional[dict]): 文字層的變數，例如 {"title": "..."}。
+        image_bytes (Optional[bytes]): 背景圖；None 時依規格使用內建背景或底色。
+    Returns:
+        PIL.Image.Image: RGB 圖片。
+    """
+    return compile_spec(spec).render(values, image_bytes)
+
+
+def _canvas_entry(spec, values, image_bytes):
+    key = spec_hash(spec, values, image_bytes)
+    entry = canvas_cache.get(key)
+    metrics.count("canvas_cache", outcome="miss" if entry is None else "hit")
+    if entry is None:
+        with metrics.span("render_canvas"):
+            entry = {"image": draw_spec(spec, values, image_bytes)}
+        canvas_cache.put(key, entry)
+    return key, entry
+
+
+def render_canvas(spec, values=None, image_bytes=None):
+    """與 draw_spec 相同，但規格、變數與背景圖都沒變時直接回傳快取的圖片 (共用物件，請勿修改)。"""
+    return _canvas_entry(spec, values, image_bytes)[1]["image"]
+
+
+def render_canvas_bytes(spec, values=None, image_bytes=None, fmt="png", max_bytes=None):
+    """
+    回傳編碼後的圖卡 (EncodedImage，格式見 hotnews/encoding.py)；只在第一次要求時編碼，結果與圖片一起快取。
+    """
+    key, entry = _canvas_entry(spec, values, image_bytes)
+    encoded = entry.get((fmt, max_bytes))
+    if encoded is None:
+        encoded = encode_image(entry["image"], fmt, max_bytes=max_bytes)
+        canvas_cache.put(key, {**entry, (fmt, max_bytes): encoded})
+    return encoded
@@ -0,0 +1,113 @@
+"""
+圖卡模板登錄表。
+
+各發布平台 (IG 貼文 / 限時動態、FB 連結、LINE、新聞橫幅) 的版面定義在設定檔
+(預設為 hotnews/card_templates.json，可用環境變數 HOTNEWS_CARD_TEMPLATES 指定)，
+格式見 hotnews/canvas.py。載入時每個模板編譯一次為 CardPlan，靜態圖層預先畫好；
+render_all 一次渲染同一個標題的所有格式，背景圖只解碼一次。
+"""
+import json
+import os
+import threading
+
+from hotnews.canvas import CardPlan, SharedSource
+from hotnews.metrics import get_metrics
+
+CARD_TEMPLATES_PATH = os.environ.get(
+    "HOTNEWS_CARD_TEMPLATES", os.path.join(os.path.dirname(__file__), "card_templates.json")
+)
+
+metrics = get_metrics()
+
+
+def load_card_templates(path=CARD_TEMPLATES_PATH):
+    """
+    讀取模板設定檔：{"defaults": {...}, "templates": {名稱: 版面規格, ...}}。
+    Returns:
+        dict[str, dict]: {名稱: 合併 defaults 後的版面規格}，依設定檔順序。
+    Raises:
+        ValueError: 缺少 size 或 layers。
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    defaults = config.get("defaults", {})
+    templates = {}
+    for name, entry in config.get("templates", {}).items():
+        spec = {**defaults, **entry}
+        if not spec.get("size") or "layers" not in spec:
+            raise ValueError(f"圖卡模板「{name}」缺少 size 或 layers")
+        templates[name] = spec
+    return templates
+
+
+class CardRegistry:
+    """
+    名稱 -> 編譯後的 CardPlan。模板可設定 aliases (例如舊版的比例代號 "1:1"、"4:3")。
+    Args:
+        templates (dict[str, dict]): load_card_templates 的結果。
+    """
+
+    def __init__(self, templates):
+        self.templates = templates
+        self.plans = {name: CardPlan(spec) for name, spec in templates.items()}
+        self.aliases = {alias: name for name, spec in templates.items() for alias in spec.get("aliases", ())}
+
+    def names(self):
+        return list(self.plans)
+
+    def resolve(self, name):
+        """
+        Raises:
+            ValueError: 沒有這個模板或別名。
+        """
+        name = self.aliases.get(name, name)
+        if name not in self.plans:
+            raise ValueError(f"不支援的圖卡模板：{name} (可用：{'、'.join(self.plans)})")
+        return name
+
+    def plan(self, name):
+        return self.plans[self.resolve(name)]
+
+    def spec(self, name):
+        return self.templates[self.resolve(name)]
+
+    def label(self, name):
+        name = self.resolve(name)
+        return self.templates[name].get("label", name)
+
+    def font_sizes(self, names=None, scale=1):
+        """指定模板 (預設全部) 文字圖層的最大字級，供程序啟動時預先載入字型；scale 為預覽的縮放比例。"""
+        names = [self.resolve(name) for name in (names or self.plans)]
+        return sorted({
+            layer["font"]["size"]
+            for name in names for layer in self.plans[name].scaled(scale).spec["layers"] if "font" in layer
+        })
+
+    def render_all(self, values, names=None, image_bytes=None):
+        """
+        一次渲染多個格式。背景圖只解碼一次 (依所有格式中最大的尺寸縮小解碼)，
+        各格式的背景與底圖仍依 (模板, 背景圖雜湊) 快取。
+        Args:
+            values (dict): 文字層的變數，例如 {"title": "..."}。
+            names (Optional[Iterable[str]]): 要產生的模板名稱或別名；None 表示全部。
+            image_bytes (Optional[bytes]): 背景圖。
+        Returns:
+            dict[str, PIL.Image.Image]: {模板名稱: 圖片}。
+        """
+        names = [self.resolve(name) for name in (names or self.plans)]
+        source = SharedSource(image_bytes, [self.plans[name].size for name in names]) if image_bytes else None
+        with metrics.span("render_all", formats=len(names)):
+            return {name: self.plans[name].render(values, image_bytes, source) for name in names}
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_card_registry():
+    """取得整個程序共用的 CardRegistry (由 CARD_TEMPLATES_PATH 載入)。"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = CardRegistry(load_card_templates())
+        return _default_registry
@@ -0,0 +1,162 @@
+"""
+不需要 Streamlit 的命令列工具，供排程工作 (例如每天 08:00 產生報表) 使用：
+
+    python -m hotnews report --out reports/ --cards
+    python -m hotnews report --out reports/ --cards --templates all --image-format webp --max-kb 300 --zip
+
+與 app.py 使用相同的函式：並行抓取所有來源 (hotnews/feeds.py)、匯出報表 (hotnews/export.py)、
+以行程池批次產生卡片 (hotnews/batch.py)。各階段需要的模組在該階段才匯入：整個流程不需要 pandas，
+Pillow 只在 --cards 時、openpyxl 只在匯出 Excel 時載入，--help 與參數錯誤幾乎立即回應。
+
+結束時輸出每個階段的耗時。結束代碼：0 成功；1 所有來源都抓取失敗；2 參數錯誤。
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from hotnews.export import EXPORT_FORMATS
+
+
+class StageTimer:
+    """記錄每個階段的耗時 (含該階段才匯入的模組)。"""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def report(self, out=sys.stdout):
+        print(f"\n{'階段':<12} {'秒':>8}", file=out)
+        for name, seconds in self.stages:
+            print(f"{name:<12} {seconds:>8.3f}", file=out)
+        print(f"{'總計':<12} {sum(seconds for _, seconds in self.stages):>8.3f}", file=out)
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _card_options(args, parser):
+    """檢查卡片相關參數 (在抓取前完成，參數錯誤時不必等待網路)。"""
+    from hotnews.card_templates import get_card_registry
+    from hotnews.encoding import get_format
+
+    registry = get_card_registry()
+    try:
+        get_format(args.image_format)
+        templates = registry.names() if args.templates == "all" else _split(args.templates)
+        for name in templates:
+            registry.resolve(name)
+    except ValueError as exc:
+        parser.error(str(exc))
+    image_bytes = None
+    if args.background:
+        try:
+            with open(args.background, "rb") as f:
+                image_bytes = f.read()
+        except OSError as exc:
+            parser.error(f"無法讀取背景圖片：{exc}")
+    return {
+        "ratios": templates,
+        "image_bytes": image_bytes,
+        "max_workers": args.workers,
+        "fmt": args.image_format,
+        "max_bytes": args.max_kb * 1024 if args.max_kb else None,
+    }
+
+
+def _write_cards(titles, out_dir, date_str, options, as_zip):
+    from hotnews.batch import render_cards_dir, render_cards_zip
+    from hotnews.fonts import font_registry
+
+    for message in font_registry.diagnostics():
+        print(f"警告：{message}", file=sys.stderr)
+    if as_zip:
+        path = os.path.join(out_dir, f"{date_str}_HotNews_cards.zip")
+        with open(path, "wb") as f:
+            return path, render_cards_zip(titles, f, **options)
+    path = os.path.join(out_dir, f"{date_str}_HotNews_cards")
+    return path, render_cards_dir(titles, path, **options)
+
+
+def run_report(args, parser):
+    """抓取 → 匯出報表 → (選用) 產生卡片。"""
+    card_options = _card_options(args, parser) if args.cards else None
+    timer = StageTimer()
+    date_str = datetime.now().strftime('%Y-%m-%d')
+
+    with timer.stage("抓取"):
+        from hotnews.feeds import RSS_FEEDS, fetch_report_articles
+
+        feeds = RSS_FEEDS
+        if args.sources:
+            unknown = [name for name in _split(args.sources) if name not in RSS_FEEDS]
+            if unknown:
+                parser.error(f"未知的來源：{'、'.join(unknown)} (可用：{'、'.join(RSS_FEEDS)})")
+            feeds = {name: RSS_FEEDS[name] for name in _split(args.sources)}
+        articles, fetch_stats = fetch_report_articles(feeds, cache=False if args.no_cache else None)
+
+    for site, stats in fetch_stats.items():
+        if stats["error"]:
+            print(f"警告：{site} 抓取失敗：{stats['error']}", file=sys.stderr)
+    if feeds and all(stats["error"] for stats in fetch_stats.values()):
+        print("錯誤：所有來源都抓取失敗，未產生報表。", file=sys.stderr)
+        timer.report(sys.stderr)
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    with timer.stage("匯出"):
+        from hotnews.export import export_filename, export_rows
+        from hotnews.models import REPORT_COLUMNS
+
+        report_path = os.path.join(args.out, export_filename(date_str, args.format))
+        rows = (tuple(article.report_row()[column] for column in REPORT_COLUMNS) for article in articles)
+        with open(report_path, "wb") as f:
+            export_rows(list(REPORT_COLUMNS), rows, f, args.format)
+    print(f"報表：{report_path} ({len(articles)} 則，{len(fetch_stats)} 個來源)")
+
+    if card_options is not None:
+        with timer.stage("卡片"):
+            titles = [article.title for article in articles]
+            cards_path, stats = _write_cards(titles, args.out, date_str, card_options, args.zip)
+        print(f"卡片：{cards_path} ({stats['images']} 張，{stats['bytes'] / 1024 / 1024:.1f} MB，"
+              f"{stats['images_per_sec']:.1f} 張/秒)")
+
+    timer.report()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m hotnews", description="HotNews 熱門新聞報表 (命令列版)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="抓取所有來源並輸出報表 (可選擇同時產生卡片)")
+    report.add_argument("--out", default=".", help="輸出目錄 (預設為目前目錄)")
+    report.add_argument("--format", choices=list(EXPORT_FORMATS), default="xlsx", help="報表格式 (預設 xlsx)")
+    report.add_argument("--sources", help="只抓取這些來源 (以逗號分隔的名稱)")
+    report.add_argument("--no-cache", action="store_true", help="不使用條件式請求的磁碟快取")
+    report.add_argument("--cards", action="store_true", help="為每個標題產生卡片圖片")
+    report.add_argument("--templates", default="1:1,4:3",
+                        help="卡片模板或比例 (以逗號分隔，all 為 card_templates.json 中的全部模板；預設 1:1,4:3)")
+    report.add_argument("--image-format", default="png", help="卡片圖片格式：png、jpeg、webp、avif (預設 png)")
+    report.add_argument("--max-kb", type=int, default=0, help="每張卡片的檔案大小上限 (KB，0 為不限制)")
+    report.add_argument("--background", help="卡片背景圖片檔")
+    report.add_argument("--workers", type=int, help="產生卡片的行程數 (預設為 CPU 核心數)")
+    report.add_argument("--zip", action="store_true", help="卡片寫入單一 ZIP 檔 (預設寫入目錄)")
+    report.set_defaults(handler=run_report)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args, parser)
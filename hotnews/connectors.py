@@ -0,0 +1,135 @@
+"""
+各種來源格式的解析器 (connector)。
+
+每個 connector 從 HTTP 回應讀出最多 limit 篇文章，回傳 (文章, 實際讀取的位元組數)。
+文章為與 feedparser 相容的 FeedParserDict (title、link、id、summary、published_parsed、updated_parsed)，
+之後的快取、文章庫與報表不需要知道來源是哪一種格式。
+新的格式以 @register_connector("名稱") 註冊，來源設定檔 (sources.json) 的 type 欄位即為名稱。
+"""
+import heapq
+import json
+import os
+import xml.etree.ElementTree as ET
+from itertools import islice
+from urllib.parse import unquote, urlsplit
+
+import feedparser
+
+from hotnews.stream_parser import iter_feed_entries, iter_response_chunks, parse_date
+
+CONNECTORS = {}
+
+
+def register_connector(*names):
+    def decorator(read):
+        for name in names:
+            CONNECTORS[name] = read
+        return read
+    return decorator
+
+
+def get_connector(name):
+    try:
+        return CONNECTORS[name]
+    except KeyError:
+        raise ValueError(f"不支援的來源類型：{name} (可用：{', '.join(sorted(CONNECTORS))})") from None
+
+
+def _read_body(response, deadline):
+    consumed = []
+    for _ in iter_response_chunks(response, deadline, consumed):
+        pass
+    return b"".join(consumed)
+
+
+@register_connector("rss", "atom")
+def read_feed(response, deadline, limit, parser="stream"):
+    """
+    RSS / Atom。stream 模式讀到 limit 篇即停止讀取；
+    若內容不是格式正確的 XML，則讀完剩餘內容改用 feedparser 解析。
+    """
+    consumed = []
+    if parser == "stream":
+        try:
+            entries = list(islice(iter_feed_entries(iter_response_chunks(response, deadline, consumed)), limit))
+            return entries, sum(map(len, consumed))
+        except ET.ParseError:
+            pass
+    for _ in iter_response_chunks(response, deadline, consumed):
+        pass
+    body = b"".join(consumed)
+    return feedparser.parse(body).entries[:limit], len(body)
+
+
+@register_connector("jsonfeed")
+def read_json_feed(response, deadline, limit, parser=None):
+    """JSON Feed 1.x (https://jsonfeed.org/version/1.1)，items 依規格為新到舊。"""
+    body = _read_body(response, deadline)
+    try:
+        items = json.loads(body).get("items") or []
+    except (ValueError, AttributeError) as exc:
+        raise ValueError(f"JSON Feed 格式錯誤：{exc}") from exc
+    entries = []
+    for item in items[:limit]:
+        fields = {
+            "id": item.get("id"),
+            "link": item.get("url") or item.get("external_url"),
+            "title": item.get("title") or (item.get("content_text") or "")[:80],
+            "summary": item.get("summary") or item.get("content_text") or item.get("content_html"),
+            "published_parsed": parse_date(item.get("date_published")),
+            "updated_parsed": parse_date(item.get("date_modified")),
+        }
+        entries.append(feedparser.FeedParserDict({k: v for k, v in fields.items() if v}))
+    return entries, len(body)
+
+
+def _title_from_url(url):
+    """沒有標題的 sitemap 網址，以路徑最後一段代替 (例如 /2024/summer-skincare → summer skincare)。"""
+    slug = os.path.basename(urlsplit(url).path.rstrip("/")) or url
+    return unquote(os.path.splitext(slug)[0]).replace("-", " ").replace("_", " ")
+
+
+@register_connector("sitemap")
+def read_sitemap(response, deadline, limit, parser=None):
+    """
+    XML sitemap (含 Google News sitemap 的 news:title / news:publication_date)。
+    sitemap 不保證排序，因此逐筆解析整份文件，只保留日期最新的 limit 筆。
+    """
+    consumed = []
+    parser = ET.XMLPullParser(events=("end",))
+    newest = []   # (時間, 序號, 欄位)，最小堆積
+    order = 0
+    for chunk in iter_response_chunks(response, deadline, consumed):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            name = elem.tag.rsplit("}", 1)[-1]
+            if name == "sitemap":
+                raise ValueError("不支援 sitemap index，請在設定檔中指定個別的 sitemap")
+            if name != "url":
+                continue
+            fields = {}
+            for child in elem.iter():
+                child_name = child.tag.rsplit("}", 1)[-1]
+                text = (child.text or "").strip()
+                if child_name == "loc" and "link" not in fields:
+                    fields["link"] = text
+                elif child_name == "title" and text:
+                    fields["title"] = text
+                elif child_name == "publication_date":
+                    fields["published_parsed"] = parse_date(text)
+                elif child_name == "lastmod":
+                    fields["updated_parsed"] = parse_date(text)
+            elem.clear()
+            if not fields.get("link"):
+                continue
+            fields.setdefault("title", _title_from_url(fields["link"]))
+            date = fields.get("published_parsed") or fields.get("updated_parsed")
+            item = (tuple(date) if date else (), order, fields)
+            order += 1
+            if len(newest) < limit:
+                heapq.heappush(newest, item)
+            elif item[:2] > newest[0][:2]:
+                heapq.heapreplace(newest, item)
+    parser.close()
+    entries = [feedparser.FeedParserDict(fields) for _, _, fields in sorted(newest, key=lambda i: i[:2], reverse=True)]
+    return entries, sum(map(len, consumed))
@@ -0,0 +1,179 @@
+"""
+跨來源的文章去重與近似重複分群。
+
+美妝與女性生活網站常互相轉載同一篇文章，標題只差幾個字或多了站名後綴。
+這裡先以正規化後的網址判斷完全相同的文章，再以 CJK 字元 n-gram 的 MinHash 簽章
+搭配 LSH 分桶找出相似標題：每篇新文章只需查詢固定數量的桶，不必與全部歷史逐一比較。
+標題中的數字 (日期、期數、排名) 不同時不視為同一篇，例如「今日星座運勢 10/16」與「10/17」。
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+# 追蹤用的查詢參數，不影響文章內容
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "from", "spm"}
+TRACKING_PREFIXES = ("utm_",)
+
+SHINGLE_SIZE = 2          # 中文標題短，以 2 字元 n-gram 比較
+NUM_PERM = 64             # MinHash 簽章長度
+LSH_BANDS = 16            # 16 個 band × 4 列，約在 Jaccard 0.5 附近開始成為候選
+SIMILARITY_THRESHOLD = 0.6
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+
+# 標題正規化時移除的字元：空白、標點與符號
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+")
+# 轉載時常見的站名後綴，例如「｜BEAUTY美人圈」、「 - 妞新聞」
+_SITE_SUFFIX_RE = re.compile(r"\s*[|｜]\s*[^|｜]{1,20}$|\s+[-–—]\s+[^-–—]{1,20}$")
+
+
+def canonical_url(url):
+    """
+    正規化網址：統一 https、移除 www. 與片段 (#...)、去掉追蹤參數並排序其餘參數、移除結尾斜線。
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def normalize_title(title):
+    """全形轉半形、去掉站名後綴、轉小寫並移除空白與標點。"""
+    text = unicodedata.normalize("NFKC", title or "")
+    text = _SITE_SUFFIX_RE.sub("", text) or text
+    return _NON_WORD_RE.sub("", text.lower())
+
+
+def numeric_tokens(title):
+    """標題中依序出現的數字 (去掉站名後綴，前導 0 不計)，例如「星座運勢 10/06」→ ("10", "6")。"""
+    text = unicodedata.normalize("NFKC", title or "")
+    text = _SITE_SUFFIX_RE.sub("", text) or text
+    return tuple(number.lstrip("0") or "0" for number in _NUMBER_RE.findall(text))
+
+
+def shingles(title, size=SHINGLE_SIZE):
+    text = normalize_title(title)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(title):
+    """回傳標題的 MinHash 簽章 (長度 NUM_PERM 的 uint64 陣列)；空標題回傳 None。"""
+    grams = shingles(title)
+    if not grams:
+        return None
+    hashes = np.fromiter((_shingle_hash(g) for g in grams), dtype=np.uint64, count=len(grams))
+    hashes %= np.uint64(_MERSENNE_PRIME)
+    # (a * x + b) mod p；uint64 乘法會溢位，但對所有簽章一致，仍是有效的雜湊族
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % np.uint64(_MERSENNE_PRIME)
+    return permuted.min(axis=1)
+
+
+class DedupIndex:
+    """
+    增量式的去重索引。add() 會回傳文章所屬的群組 ID：
+    網址正規化後相同，或與既有文章的 MinHash 相似度達門檻且標題中的數字相同時歸入同一群，
+    否則建立新群組。
+    """
+
+    def __init__(self, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD):
+        if NUM_PERM % bands:
+            raise ValueError("NUM_PERM 必須能被 bands 整除")
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._by_url = {}                                  # 正規化網址 -> 群組 ID
+        self._buckets = [dict() for _ in range(bands)]     # band 雜湊 -> [文章 ID]
+        self._signatures = {}                              # 文章 ID -> 簽章
+        self._numbers = {}                                 # 文章 ID -> 標題中的數字
+        self._cluster_of = {}                              # 文章 ID -> 群組 ID
+        self.clusters = {}                                 # 群組 ID -> [文章 ID]
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _best_match(self, signature, band_keys, numbers):
+        candidates = set()
+        for band, key in zip(self._buckets, band_keys):
+            candidates.update(band.get(key, ()))
+        # 數字不同 (例如日期或期數) 的標題即使其餘文字相同也是不同文章
+        candidates = [c for c in candidates if self._numbers[c] == numbers]
+        if not candidates:
+            return None
+        # 簽章相同位置的比例即為 Jaccard 相似度的估計值
+        scores = (np.stack([self._signatures[c] for c in candidates]) == signature).mean(axis=1)
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+        return self._cluster_of[candidates[best]]
+
+    def add(self, article_id, title, url=""):
+        """
+        將文章加入索引並回傳其群組 ID (新群組的 ID 即為該文章的 ID)。
+        同一 article_id 重複加入時直接回傳原本的群組。
+        """
+        with self._lock:
+            if article_id in self._cluster_of:
+                return self._cluster_of[article_id]
+            url_key = canonical_url(url)
+            cluster = self._by_url.get(url_key) if url_key else None
+            signature = minhash(title)
+            numbers = numeric_tokens(title)
+            band_keys = self._band_keys(signature) if signature is not None else []
+            if cluster is None and signature is not None:
+                cluster = self._best_match(signature, band_keys, numbers)
+            if cluster is None:
+                cluster = article_id
+                self.clusters[cluster] = []
+            self.clusters[cluster].append(article_id)
+            self._cluster_of[article_id] = cluster
+            if url_key:
+                self._by_url.setdefault(url_key, cluster)
+            if signature is not None:
+                self._signatures[article_id] = signature
+                self._numbers[article_id] = numbers
+                for band, key in zip(self._buckets, band_keys):
+                    band.setdefault(key, []).append(article_id)
+            return cluster
+
+    def __len__(self):
+        return len(self._cluster_of)
+
+
+def collapse_clusters(rows, cluster_of, sep="、"):
+    """
+    將同一群組的報表列合併成一列 (保留排在最前面的一列)，來源欄位列出所有來源。
+    Args:
+        rows (list[dict]): 含「來源」欄位的報表列，已依時間排序。
+        cluster_of (Callable[[int, dict], Hashable]): 回傳第 i 列所屬群組的函式。
+    """
+    merged = {}
+    for i, row in enumerate(rows):
+        cluster = cluster_of(i, row)
+        if cluster not in merged:
+            merged[cluster] = dict(row, 來源=[row["來源"]])
+        elif row["來源"] not in merged[cluster]["來源"]:
+            merged[cluster]["來源"].append(row["來源"])
+    return [dict(row, 來源=sep.join(row["來源"])) for row in merged.values()]
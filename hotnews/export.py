@@ -0,0 +1,100 @@
+"""
+報表匯出：Excel (openpyxl write-only)、CSV 與 Parquet。
+
+所有格式都以「欄位名稱 + 逐列迭代」的方式寫出，資料可以來自 DataFrame 或直接來自資料庫游標，
+寫入時不需要在記憶體中建出整份活頁簿。
+"""
+import io
+from itertools import islice
+
+from hotnews.metrics import get_metrics
+
+EXPORT_FORMATS = {
+    "xlsx": {"label": "Excel (.xlsx)", "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+    "csv": {"label": "CSV (.csv)", "mime": "text/csv"},
+    "parquet": {"label": "Parquet (.parquet)", "mime": "application/vnd.apache.parquet"},
+}
+
+PARQUET_BATCH_ROWS = 50_000
+
+metrics = get_metrics()
+
+
+def dataframe_rows(df):
+    """將 DataFrame 轉為 (欄位名稱, 列迭代器)。"""
+    return list(df.columns), df.itertuples(index=False, name=None)
+
+
+def write_excel(columns, rows, output):
+    """以 openpyxl 的 write-only 模式逐列寫出，記憶體用量不隨列數成長。"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(output)
+
+
+def write_csv(columns, rows, output):
+    """寫出 UTF-8 (含 BOM) 的 CSV，Excel 直接開啟時中文不會亂碼。"""
+    import csv
+
+    text = io.TextIOWrapper(output, encoding="utf-8-sig", newline="")
+    try:
+        writer = csv.writer(text)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def write_parquet(columns, rows, output, batch_rows=PARQUET_BATCH_ROWS):
+    """每 batch_rows 列寫出一個 row group。需要 pyarrow (Streamlit 已內含)。"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("匯出 Parquet 需要安裝 pyarrow：pip install pyarrow") from exc
+
+    rows = iter(rows)
+    writer = None
+    try:
+        for batch in iter(lambda: list(islice(rows, batch_rows)), []):
+            table = pa.table({name: list(values) for name, values in zip(columns, zip(*batch))})
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            # 沒有資料時仍寫出只有欄位的空檔案
+            writer = pq.ParquetWriter(output, pa.schema([(name, pa.string()) for name in columns]))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"xlsx": write_excel, "csv": write_csv, "parquet": write_parquet}
+
+
+def export_rows(columns, rows, output, fmt="xlsx"):
+    """以指定格式將資料寫入可寫入的二進位檔案。"""
+    if fmt not in WRITERS:
+        raise ValueError(f"不支援的匯出格式：{fmt}")
+    with metrics.span("export", format=fmt):
+        WRITERS[fmt](columns, rows, output)
+
+
+def export_report(df, fmt="xlsx"):
+    """
+    將報表轉為指定格式的位元組，供 st.download_button 使用。
+    搭配 download_button 的 callable data，只有在使用者按下下載時才會執行。
+    """
+    output = io.BytesIO()
+    export_rows(*dataframe_rows(df), output, fmt)
+    return output.getvalue()
+
+
+def export_filename(date_str, fmt):
+    return f"{date_str}_HotNews.{fmt}"
@@ -0,0 +1,195 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import feedparser
+
+from hotnews import DATA_DIR
+
+# 快取設定
+CACHE_PATH = os.path.join(DATA_DIR, "feed_cache.sqlite3")
+CACHE_TTL = 120                      # 秒；TTL 內直接使用快取，不發出任何請求
+CACHE_MAX_BYTES = 50 * 1024 * 1024   # 快取內容總大小上限，超過時淘汰最久未使用的來源
+
+# 只保存 parse_entries 與後續處理會用到的欄位
+ENTRY_FIELDS = ("id", "title", "link", "summary", "published_parsed", "updated_parsed")
+
+
+def _entry_to_json(entry):
+    data = {}
+    for field in ENTRY_FIELDS:
+        value = entry.get(field)
+        if value is None:
+            continue
+        # time.struct_time 轉為串列，讀回後 datetime(*value[:6]) 一樣可用
+        data[field] = list(value) if isinstance(value, time.struct_time) else value
+    return data
+
+
+class FeedCache:
+    """
+    以 SQLite 保存每個 RSS 來源的 ETag、Last-Modified 與已解析的文章，
+    讓重新整理時可以送出條件式請求 (conditional GET)，並在 304 時直接重用。
+    資料存在磁碟上，Streamlit 重新啟動後仍然有效。
+    connector 讀到 limit 篇即停止，因此每筆快取同時記錄當時的 limit；
+    需要更多文章的請求 (見 covers) 不能使用這筆快取，也不能送出條件式請求。
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "fresh_hits": 0, "not_modified": 0, "misses": 0, "bytes_saved": 0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    entries TEXT NOT NULL,
+                    body_size INTEGER NOT NULL DEFAULT 0,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    entry_limit INTEGER
+                )
+            """)
+            # 舊版快取沒有 entry_limit 欄位 (NULL 表示不知道當時的 limit)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(feeds)")}
+            if "entry_limit" not in columns:
+                conn.execute("ALTER TABLE feeds ADD COLUMN entry_limit INTEGER")
+
+    @contextmanager
+    def _connect(self):
+        """一次交易用的連線：成功時提交、出錯時回復，結束後一律關閉。"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, key, bytes_saved=0):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats[key] += 1
+            self._stats["bytes_saved"] += bytes_saved
+
+    def get(self, url):
+        """取得來源的快取資料；沒有快取時回傳 None。"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, entries, body_size, fetched_at, entry_limit FROM feeds WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, entries, body_size, fetched_at, limit = row
+        return {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "entries": [feedparser.FeedParserDict(e) for e in json.loads(entries)],
+            "body_size": body_size,
+            "fetched_at": fetched_at,
+            "limit": limit,
+        }
+
+    def covers(self, cached, limit):
+        """
+        快取的文章是否足以回應最多 limit 篇的請求：快取已有 limit 篇以上，
+        或當時讀完整份來源仍不到當時的 limit 篇 (來源本身就只有這些文章)。
+        """
+        count = len(cached["entries"])
+        return count >= limit or (cached["limit"] is not None and count < cached["limit"])
+
+    def is_fresh(self, cached):
+        return time.time() - cached["fetched_at"] < self.ttl
+
+    def conditional_headers(self, cached):
+        """依快取內容組出 If-None-Match / If-Modified-Since 標頭。"""
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def record_fresh_hit(self, cached):
+        """TTL 內直接命中，完全沒有發出請求。"""
+        self._count("fresh_hits", cached["body_size"])
+        self._touch(cached["url"], refetched=False)
+
+    def record_not_modified(self, cached):
+        """伺服器回傳 304，重用快取文章並重新計算 TTL。"""
+        self._count("not_modified", cached["body_size"])
+        self._touch(cached["url"], refetched=True)
+
+    def store(self, url, etag, last_modified, entries, body_size, limit):
+        """
+        儲存完整下載 (200) 的結果，並視需要淘汰舊資料。
+        Args:
+            body_size (int): 讀取這些文章實際下載的位元組數 (命中時計入 bytes_saved)。
+            limit (int): 這次請求的文章數上限。
+        """
+        self._count("misses")
+        now = time.time()
+        payload = json.dumps([_entry_to_json(e) for e in entries], ensure_ascii=False)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO feeds "
+                "(url, etag, last_modified, entries, body_size, fetched_at, accessed_at, entry_limit) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, payload, body_size, now, now, limit),
+            )
+        self._evict()
+
+    def _touch(self, url, refetched):
+        now = time.time()
+        with self._connect() as conn:
+            if refetched:
+                conn.execute("UPDATE feeds SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            else:
+                conn.execute("UPDATE feeds SET accessed_at = ? WHERE url = ?", (now, url))
+
+    def _evict(self):
+        """總大小超過 max_bytes 時，依最久未使用的順序刪除來源 (至少保留最新的一筆)。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, length(CAST(entries AS BLOB)) FROM feeds ORDER BY accessed_at DESC"
+            ).fetchall()
+            total = 0
+            stale = []
+            for i, (url, size) in enumerate(rows):
+                total += size
+                if i > 0 and total > self.max_bytes:
+                    stale.append((url,))
+            if stale:
+                conn.executemany("DELETE FROM feeds WHERE url = ?", stale)
+
+    def stats(self):
+        """回傳本程序啟動以來的命中統計 (hit_ratio 含 TTL 命中與 304)。"""
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["fresh_hits"] + stats["not_modified"]
+        stats["hit_ratio"] = hits / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_feed_cache():
+    """取得整個程序共用的 FeedCache。"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = FeedCache()
+        return _default_cache
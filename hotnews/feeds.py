@@ -0,0 +1,312 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+from datetime import datetime, timezone
+from itertools import islice
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from hotnews.connectors import get_connector
+from hotnews.feed_cache import get_feed_cache
+from hotnews.metrics import get_metrics
+from hotnews.models import Article
+from hotnews.sources import get_source_registry
+
+# 來源清單 {名稱: 網址}，由 hotnews/sources.json 載入 (各來源的格式、逾時與重試設定見 sources.py)
+RSS_FEEDS = get_source_registry().feeds()
+
+# 抓取設定 (秒)
+FEED_TIMEOUT = 10         # 單一來源的逾時 (設定檔未列出的來源)
+GLOBAL_DEADLINE = 20      # 整批抓取的總期限
+HOST_MIN_INTERVAL = 1.0   # 同一主機兩次請求之間的最小間隔 (取代原本每抓一個就 sleep(1))
+HOST_MAX_CONCURRENCY = 1  # 同一主機同時最多幾個連線
+MAX_WORKERS = 8
+TOP_N = 5
+PARSER = "stream"         # "stream"：讀到前 N 篇即停止；"feedparser"：完整解析整份文件
+
+metrics = get_metrics()
+
+USER_AGENT = "Mozilla/5.0 (compatible; HotNewsApp/1.0; +https://github.com/minilandmi-sys/HotNewsApp)"
+
+# ================= 輔助函式 (原有的 RSS 處理) =================
+
+def parse_entries(entries, site="", first_seen=None):
+    """
+    逐筆將 feedparser 文章轉為 Article (產生器，搭配 islice 只轉換需要的筆數)。
+    沒有日期的文章 published 為 None，不再以現在時間代替。
+    Args:
+        first_seen (Optional[datetime]): 這次抓取的時間 (UTC)，預設為現在。
+    """
+    first_seen = first_seen or datetime.now(timezone.utc)
+    for entry in entries:
+        yield Article.from_entry(site, entry, first_seen)
+
+# ================= 並行抓取引擎 =================
+
+class HostThrottle:
+    """
+    以主機為單位的禮貌限制：限制同一主機的同時連線數，
+    並保證兩次請求之間至少間隔 min_interval 秒。不同主機之間互不影響。
+    """
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL, max_concurrency=HOST_MAX_CONCURRENCY):
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrency))
+        with semaphore:
+            # 在鎖內預約下一個可用時間點，鎖外再等待，避免拖慢其他主機
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_slot.get(host, now))
+                self._next_slot[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def _is_retryable(exc):
+    """網路錯誤、逾時、429 與 5xx 值得重試；其他 4xx 與格式錯誤重試也不會成功。"""
+    if isinstance(exc, HTTPError):
+        return exc.code == 429 or exc.code >= 500
+    return isinstance(exc, (URLError, TimeoutError, ConnectionError))
+
+
+def fetch_feed(site, url, timeout=FEED_TIMEOUT, throttle=None, cache=None, limit=TOP_N, parser=PARSER,
+               revalidate=False, connector="rss"):
+    """
+    抓取並解析單一來源 (一次請求，不重試)。
+    Args:
+        site (str): 來源名稱。
+        url (str): 來源網址。
+        timeout (float): 此來源的逾時秒數 (含排隊等待主機空檔的時間)。
+        throttle (Optional[HostThrottle]): 主機禮貌限制。
+        cache (Optional[FeedCache]): 條件式請求快取；TTL 內直接回傳快取，過期則送出
+            If-None-Match / If-Modified-Since，304 時重用快取文章。快取文章不足 limit 篇
+            (以較小的 limit 讀取) 時不使用快取，改送一般請求。
+        limit (int): 最多保留幾篇文章。
+        parser (str): RSS / Atom 的解析模式："stream" 增量解析 (讀到 limit 篇即停止) 或 "feedparser" 完整解析。
+        revalidate (bool): 忽略快取 TTL，一律向伺服器送出條件式請求 (強制重新整理時使用)。
+        connector (str): 來源格式，見 connectors.py。
+    Returns:
+        dict: {"site", "url", "entries", "elapsed", "latency", "error", "cache", "retryable"}，出錯時 entries 為空串列；
+            latency 為送出請求到讀取完成的秒數 (不含排隊等待主機空檔，未送出請求時為 None)；
+            cache 為 "hit"、"not_modified"、"miss" 或 None (未使用快取)；
+            retryable 表示錯誤是否為暫時性 (網路、逾時、429、5xx)。
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    result = {"site": site, "url": url, "entries": [], "elapsed": 0.0, "latency": None, "error": None,
+              "cache": None, "retryable": False}
+    cached = cache.get(url) if cache else None
+    if cached and not cache.covers(cached, limit):
+        # 快取是以較小的 limit 讀取的：不使用快取，也不送條件式請求 (304 只會拿回同樣不足的文章)
+        cached = None
+    if cached and not revalidate and cache.is_fresh(cached):
+        cache.record_fresh_hit(cached)
+        result.update(entries=cached["entries"][:limit], cache="hit", elapsed=time.monotonic() - started)
+        return result
+
+    try:
+        read = get_connector(connector)
+        host = urlsplit(url).netloc
+        headers = {"User-Agent": USER_AGENT}
+        if cache:
+            headers.update(cache.conditional_headers(cached))
+        with throttle.slot(host) if throttle else nullcontext():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("等待主機空檔逾時")
+            request = Request(url, headers=headers)
+            requested = time.monotonic()
+            try:
+                with urlopen(request, timeout=remaining) as response:
+                    entries, body_size = read(response, deadline, limit, parser)
+                    response_headers = response.headers
+            except HTTPError as exc:
+                if exc.code != 304 or not cached:
+                    raise
+                entries = None
+            finally:
+                result["latency"] = time.monotonic() - requested
+        if entries is None:
+            cache.record_not_modified(cached)
+            result.update(entries=cached["entries"][:limit], cache="not_modified")
+        else:
+            result["entries"] = entries
+            if cache:
+                cache.store(url, response_headers.get("ETag"), response_headers.get("Last-Modified"),
+                            entries, body_size, limit)
+                result["cache"] = "miss"
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        result["retryable"] = _is_retryable(exc)
+    result["elapsed"] = time.monotonic() - started
+    return result
+
+
+def fetch_source(source, registry=None, throttle=None, cache=None, limit=None, parser=PARSER,
+                 revalidate=False, deadline=None, clock=time.monotonic, sleep=time.sleep):
+    """
+    依來源設定抓取：暫時性錯誤以指數退避重試，連續失敗時熔斷 (冷卻期間直接略過)，
+    並將每次請求的耗時與結果記錄到來源的健康狀態。
+    Args:
+        source (Source): 來源設定。
+        registry (Optional[SourceRegistry]): 熔斷器與健康紀錄，預設為 get_source_registry()。
+        limit (Optional[int]): 最多保留幾篇文章，不超過來源設定的 limit。
+        deadline (Optional[float]): clock() 的絕對期限，重試不會超過此時間。
+        clock (Callable[[], float]): 計算期限與耗時用的時鐘 (測試時可替換)。
+        sleep (Callable[[float], None]): 退避等待 (測試時可替換)。
+    Returns:
+        dict: fetch_feed 的結果，另加 "attempts" (請求次數) 與 "skipped" (是否因熔斷而略過)。
+    """
+    registry = registry or get_source_registry()
+    breaker = registry.breakers[source.name]
+    health = registry.health[source.name]
+    limit = source.limit if limit is None else min(limit, source.limit)
+    if not breaker.allow():
+        health.record_skipped()
+        metrics.count("feed_fetches", source=source.name, outcome="skipped")
+        return {
+            "site": source.name, "url": source.url, "entries": [], "elapsed": 0.0, "latency": None,
+            "error": f"CircuitOpen: 連續失敗 {breaker.failures} 次，{breaker.retry_in():.0f} 秒後再試",
+            "cache": None, "retryable": False, "attempts": 0, "skipped": True,
+        }
+
+    started = clock()
+    attempt = 0
+    while True:
+        attempt += 1
+        timeout = source.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - clock())
+        result = fetch_feed(source.name, source.url, timeout, throttle, cache, limit, parser,
+                            revalidate, source.type)
+        if result["latency"] is not None:
+            # 只計入實際送出的請求 (快取命中與排隊逾時不算)
+            health.record(result["latency"], result["error"])
+        if not result["error"] or not result["retryable"] or attempt > source.retries:
+            break
+        delay = source.backoff * 2 ** (attempt - 1)
+        if deadline is not None and clock() + delay >= deadline:
+            break
+        sleep(delay)
+
+    if result["error"]:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    result.update(elapsed=clock() - started, attempts=attempt, skipped=False)
+    metrics.observe("feed_fetch", result["elapsed"], source=source.name)
+    metrics.count("feed_fetches", source=source.name, outcome="error" if result["error"] else result["cache"] or "ok")
+    return result
+
+
+def fetch_all_feeds(feeds=None, timeout=None, deadline=GLOBAL_DEADLINE,
+                    max_workers=MAX_WORKERS, throttle=None, cache=None, limit=TOP_N, parser=PARSER,
+                    revalidate=False, registry=None):
+    """
+    以執行緒池並行抓取所有來源 (各來源的格式、重試與熔斷依設定檔，見 fetch_source)。
+    Args:
+        feeds (Optional[dict]): {來源名稱: 網址}，預設為 RSS_FEEDS；設定檔未列出的來源使用預設設定。
+        timeout (Optional[float]): 單次請求逾時秒數，None 時使用各來源設定。
+        deadline (float): 整批抓取的總期限 (含重試)，期限內未完成的來源會被標記為逾時並略過。
+        max_workers (int): 執行緒數量上限。
+        throttle (Optional[HostThrottle]): 主機禮貌限制，預設每次建立新的 HostThrottle。
+        cache (Optional[FeedCache]): 條件式請求快取，見 fetch_feed。
+        limit (int): 每個來源最多保留幾篇文章。
+        parser (str): 解析模式，見 fetch_feed。
+        revalidate (bool): 忽略快取 TTL，見 fetch_feed。
+        registry (Optional[SourceRegistry]): 來源設定與健康紀錄，預設為 get_source_registry()。
+    Returns:
+        list[dict]: 依 feeds 原順序排列的 fetch_source 結果。
+    """
+    feeds = RSS_FEEDS if feeds is None else feeds
+    if not feeds:
+        return []
+    registry = registry or get_source_registry()
+    throttle = throttle or HostThrottle()
+    started = time.monotonic()
+    sources = {site: registry.resolve(site, url) for site, url in feeds.items()}
+    if timeout is not None:
+        sources = {site: replace(source, timeout=timeout) for site, source in sources.items()}
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(feeds)))
+    try:
+        futures = {
+            site: executor.submit(fetch_source, source, registry, throttle, cache, limit, parser, revalidate,
+                                  started + deadline)
+            for site, source in sources.items()
+        }
+        wait(futures.values(), timeout=deadline)
+    finally:
+        # 不等待超過期限的執行緒 (它們會在自己的 timeout 內結束)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for site, future in futures.items():
+        if future.done() and not future.cancelled():
+            results.append(future.result())
+        else:
+            results.append({
+                "site": site, "url": feeds[site], "entries": [], "elapsed": time.monotonic() - started,
+                "latency": None, "error": "TimeoutError: 超過整批抓取期限",
+                "cache": None, "retryable": True, "attempts": 0, "skipped": False,
+            })
+    return results
+
+
+def fetch_report_articles(feeds=None, cache=None, **fetch_options):
+    """
+    並行抓取每個來源的最新 5 篇文章 (可用 limit 指定篇數)，依時間新到舊合併 (不需要 pandas，供排程工作直接匯出)。
+    cache 預設使用共用的磁碟快取 (get_feed_cache)，傳入 False 可停用；其餘參數見 fetch_all_feeds。
+    Returns:
+        tuple[list[Article], dict]: (文章, {來源: {"elapsed", "count", "cache", "error"}})
+    """
+    if cache is None:
+        cache = get_feed_cache()
+    limit = fetch_options.get("limit", TOP_N)
+    all_entries = []
+    fetch_stats = {}
+    for result in fetch_all_feeds(feeds, cache=cache or None, **fetch_options):
+        site = result["site"]
+        fetch_stats[site] = {
+            "elapsed": round(result["elapsed"], 3),
+            "count": 0,
+            "cache": result["cache"],
+            "error": result["error"],
+        }
+        if not result["entries"]:
+            continue
+
+        with metrics.span("parse_entries", source=site):
+            articles = list(islice(parse_entries(result["entries"], site), limit))
+        all_entries.extend(articles)
+        fetch_stats[site]["count"] = len(articles)
+
+    # 依實際時間排序 (而非格式化後的字串)；沒有日期的文章排在最後，不會每次抓取都跳到最前面
+    all_entries.sort(key=lambda a: (a.published is not None, a.sort_time), reverse=True)
+    return all_entries, fetch_stats
+
+
+def fetch_top5_each_site(feeds=None, cache=None, **fetch_options):
+    """
+    並行抓取每個來源的最新 5 篇文章，合併成報表 DataFrame (見 fetch_report_articles)。
+    各來源的耗時、快取狀態與錯誤記錄在 df.attrs["fetch_stats"]。
+    """
+    import pandas as pd
+
+    articles, fetch_stats = fetch_report_articles(feeds, cache, **fetch_options)
+    with metrics.span("report_dataframe"):
+        df = pd.DataFrame([article.report_row() for article in articles])
+    df.attrs["fetch_stats"] = fetch_stats
+    return df
@@ -0,0 +1,92 @@
+"""
+整個程序共用的字型登錄表。
+
+ImageFont.truetype 每次呼叫都會重新開檔並解析字型表，對數 MB 的 CJK 字型相當昂貴。
+這裡每個 (字型檔, 字級) 只載入一次；以路徑載入時 FreeType 會自行以 mmap 對應字型檔，
+不會把整個檔案複製到記憶體中。
+"""
+import logging
+import os
+import threading
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+# 根據您的檔案結構截圖，路徑修正為 ".devcontainer/NotoSansTC-Bold.ttf"
+FONT_DIR = ".devcontainer"
+
+# 字型家族 -> {字重: 字型檔路徑}
+FONT_FAMILIES = {
+    "NotoSansTC": {
+        "bold": os.path.join(FONT_DIR, "NotoSansTC-Bold.ttf"),
+        "regular": os.path.join(FONT_DIR, "NotoSansTC-Regular.ttf"),
+    },
+}
+DEFAULT_FAMILY = "NotoSansTC"
+
+
+class FontRegistry:
+    """
+    依 (字型檔, 字級) 快取 FreeTypeFont。找不到指定字重時改用同家族的其他字重，
+    整個家族都不存在時退回 Pillow 預設字型；每個缺少的檔案只記錄一次警告。
+    """
+
+    def __init__(self, families=None, default_family=DEFAULT_FAMILY):
+        self.families = FONT_FAMILIES if families is None else families
+        self.default_family = default_family
+        self._lock = threading.Lock()
+        self._fonts = {}
+        self._missing = set()
+
+    def resolve(self, family=None, weight="bold"):
+        """回傳實際要使用的字型檔路徑；整個家族都找不到時回傳 None。"""
+        weights = self.families.get(family or self.default_family, {})
+        candidates = [weights[weight]] if weight in weights else []
+        candidates += [path for w, path in weights.items() if w != weight]
+        for path in candidates:
+            if os.path.exists(path):
+                return path
+            self._report_missing(path)
+        return None
+
+    def _report_missing(self, path):
+        with self._lock:
+            if path in self._missing:
+                return
+            self._missing.add(path)
+        logger.warning("找不到字型檔案 '%s'。", path)
+
+    def get(self, size, family=None, weight="bold"):
+        """取得指定字級的字型物件 (共用物件，請勿修改)。"""
+        path = self.resolve(family, weight)
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(path, size) if path else ImageFont.load_default()
+            with self._lock:
+                font = self._fonts.setdefault(key, font)
+        return font
+
+    def preload(self, sizes, families=None, weights=("bold", "regular")):
+        """程序啟動時預先載入常用字級，避免第一次預覽時才解析字型。"""
+        for family in families or [self.default_family]:
+            for weight in weights:
+                for size in sizes:
+                    self.get(size, family, weight)
+
+    def diagnostics(self):
+        """
+        回傳字型狀態的提示訊息 (給 UI 顯示一次即可)；一切正常時回傳空串列。
+        """
+        messages = []
+        for family, weights in self.families.items():
+            missing = [path for path in weights.values() if not os.path.exists(path)]
+            if len(missing) == len(weights):
+                messages.append(f"找不到字型家族「{family}」的任何字型檔 ({', '.join(missing)})，已改用 Pillow 預設字型，中文可能無法顯示。")
+            elif missing:
+                messages.append(f"字型家族「{family}」缺少 {', '.join(missing)}，將以同家族的其他字重代替。")
+        return messages
+
+
+font_registry = FontRegistry()
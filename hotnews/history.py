@@ -0,0 +1,237 @@
+"""
+以 Parquet 欄式儲存的文章歷史。
+
+每天 (依第一次看到文章的 UTC 日期) 一個分割目錄，新文章以追加的方式寫成新檔，
+同一天的檔案數超過 COMPACT_AFTER 時合併為一個。報表與歷史匯出只讀取需要的日期與欄位。
+SQLite 文章庫 (store.py) 仍負責去重鍵、近似重複分群與全文搜尋索引。
+需要 pyarrow (Streamlit 已內含)。
+"""
+import io
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from hotnews.export import export_rows
+from hotnews.models import Article, REPORT_TIME_FORMAT
+
+COMPACT_AFTER = 32           # 同一天的檔案數超過此值時合併
+PARTITION_PREFIX = "day="
+# latest_per_source 最多往回讀幾天 (以最新的分割日期起算)；停更或剛加入的來源不會讓每次查詢都讀完整個歷史
+LATEST_LOOKBACK_DAYS = 30
+ARTICLE_COLUMNS = ("key", "site", "title", "link", "summary", "published", "first_seen", "cluster")
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("文章歷史需要安裝 pyarrow：pip install pyarrow") from exc
+    return pa, pq
+
+
+def article_schema():
+    pa, _ = _arrow()
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("key", pa.string()),
+        ("site", pa.string()),
+        ("title", pa.string()),
+        ("link", pa.string()),
+        ("summary", pa.string()),
+        ("published", timestamp),
+        ("first_seen", timestamp),
+        ("cluster", pa.string()),
+    ])
+
+
+def articles_to_table(articles):
+    pa, _ = _arrow()
+    return pa.table(
+        {column: [getattr(article, column) for article in articles] for column in ARTICLE_COLUMNS},
+        schema=article_schema(),
+    )
+
+
+def _column_values(table, name):
+    """取出欄位值；時間欄位經由 int64 微秒轉換，比 pyarrow 直接轉 datetime (ZoneInfo) 快數倍。"""
+    column = table.column(name)
+    if name not in ("published", "first_seen"):
+        return column.to_pylist()
+    pa, _ = _arrow()
+    return [
+        None if value is None else datetime.fromtimestamp(value / 1e6, timezone.utc)
+        for value in column.cast(pa.int64()).to_pylist()
+    ]
+
+
+def table_to_articles(table):
+    """
+    Arrow 表轉為 Article (缺少的欄位以空值補上)。
+    來源名稱共用同一個字串物件；連結與群組 ID 和 key 相同時 (大多數文章如此) 直接共用 key，節省記憶體。
+    """
+    defaults = {"summary": "", "published": None, "cluster": None}
+    columns = [
+        _column_values(table, name) if name in table.column_names else [defaults[name]] * table.num_rows
+        for name in ARTICLE_COLUMNS
+    ]
+    sites = {}
+    articles = []
+    for key, site, title, link, summary, published, first_seen, cluster in zip(*columns):
+        articles.append(Article(
+            key,
+            sites.setdefault(site, site),
+            title,
+            key if link == key else link,
+            summary,
+            published,
+            first_seen,
+            key if cluster == key else cluster,
+        ))
+    return articles
+
+
+class ColumnarHistory:
+    """依日期分割的 Parquet 文章歷史 (只追加)。"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()    # 追加、合併與讀取一天的檔案時持有
+        os.makedirs(path, exist_ok=True)
+
+    def _partition(self, day):
+        return os.path.join(self.path, f"{PARTITION_PREFIX}{day}")
+
+    def _files(self, day):
+        directory = self._partition(day)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet")
+        )
+
+    def days(self):
+        """所有分割日期 (字串 YYYY-MM-DD)，新到舊。"""
+        return sorted(
+            (name[len(PARTITION_PREFIX):] for name in os.listdir(self.path) if name.startswith(PARTITION_PREFIX)),
+            reverse=True,
+        )
+
+    def _write(self, day, table):
+        _, pq = _arrow()
+        directory = self._partition(day)
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        temp_path = os.path.join(directory, "." + name + ".tmp")
+        pq.write_table(table, temp_path, compression="zstd")
+        # 寫完再改名，讀取端不會讀到寫到一半的檔案
+        os.replace(temp_path, os.path.join(directory, name))
+
+    def append(self, articles):
+        """將新文章依第一次看到的日期寫入對應分割。"""
+        by_day = {}
+        for article in articles:
+            by_day.setdefault(article.first_seen.strftime("%Y-%m-%d"), []).append(article)
+        with self._lock:
+            for day, day_articles in by_day.items():
+                self._write(day, articles_to_table(day_articles))
+                if len(self._files(day)) > COMPACT_AFTER:
+                    self._compact(day)
+
+    def _compact(self, day):
+        files = self._files(day)
+        self._write(day, self._read_files(files))
+        for path in files:
+            os.remove(path)
+
+    def _read_files(self, files, columns=None):
+        pa, pq = _arrow()
+        if not files:
+            schema = article_schema()
+            return schema.empty_table() if columns is None else pa.schema([schema.field(c) for c in columns]).empty_table()
+        return pa.concat_tables(pq.read_table(path, columns=columns) for path in files)
+
+    def read_day(self, day, columns=None):
+        """
+        讀取一天的文章 (Arrow 表)，columns 可只讀需要的欄位。
+        列出與讀取檔案時持有寫入鎖：合併 (_compact) 寫入新檔後才刪除舊檔，
+        不加鎖時可能讀到已刪除的檔案，或同時讀到合併檔與舊檔而重複計算。
+        """
+        with self._lock:
+            return self._read_files(self._files(day), columns)
+
+    def count(self):
+        _, pq = _arrow()
+        total = 0
+        for day in self.days():
+            with self._lock:
+                total += sum(pq.ParquetFile(path).metadata.num_rows for path in self._files(day))
+        return total
+
+    def articles_since(self, since):
+        """第一次看到的時間晚於 since (UTC datetime) 的文章。"""
+        articles = []
+        for day in self.days():
+            if day < since.strftime("%Y-%m-%d"):
+                break
+            articles.extend(a for a in table_to_articles(self.read_day(day)) if a.first_seen >= since)
+        return articles
+
+    def latest_per_source(self, n=5, sites=None, lookback_days=LATEST_LOOKBACK_DAYS):
+        """
+        每個來源最新的 n 篇文章，依時間新到舊。
+        從最新的日期往回讀，排序時間 (不晚於第一次看到的時間) 一定落在所屬分割日期之前，
+        因此當每個來源都已有 n 篇比目前讀到的最舊日期更新的文章時即可停止；
+        有來源停更或剛加入時，最多只讀到最新分割日期往前 lookback_days 天。
+        Args:
+            sites (Optional[Iterable[str]]): 只查詢這些來源；None 表示全部。
+            lookback_days (Optional[int]): 最多往回讀幾天的分割；None 表示不限制。
+        Returns:
+            list[Article]
+        """
+        wanted = set(sites) if sites is not None else None
+        columns = ["key", "site", "title", "link", "published", "first_seen", "cluster"]
+        by_site = {}
+        days = self.days()
+        if days and lookback_days is not None:
+            oldest = datetime.strptime(days[0], "%Y-%m-%d") - timedelta(days=lookback_days)
+            days = [day for day in days if day >= oldest.strftime("%Y-%m-%d")]
+        for day in days:
+            for article in table_to_articles(self.read_day(day, columns)):
+                if wanted is None or article.site in wanted:
+                    by_site.setdefault(article.site, []).append(article)
+            if wanted:
+                day_start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                if all(sum(a.sort_time >= day_start for a in by_site.get(site, ())) >= n for site in wanted):
+                    break
+        latest = []
+        for site_articles in by_site.values():
+            site_articles.sort(key=lambda a: a.sort_time, reverse=True)
+            latest.extend(site_articles[:n])
+        latest.sort(key=lambda a: a.sort_time, reverse=True)
+        return latest
+
+    def iter_report_rows(self):
+        """
+        以報表欄位逐列輸出全部歷史 (新到舊)，一次只讀一天的資料。
+        Returns:
+            tuple[list[str], Iterator[tuple]]
+        """
+        columns = ["標題", "連結", "發佈時間", "來源"]
+
+        def rows():
+            for day in self.days():
+                articles = table_to_articles(self.read_day(day, ["key", "site", "title", "link", "published", "first_seen"]))
+                articles.sort(key=lambda a: a.sort_time, reverse=True)
+                for article in articles:
+                    yield article.title, article.link, article.sort_time.strftime(REPORT_TIME_FORMAT), article.site
+
+        return columns, rows()
+
+
+def export_history(history, fmt="xlsx"):
+    """將完整歷史匯出為指定格式的位元組 (搭配 download_button 的 callable data 使用)。"""
+    output = io.BytesIO()
+    export_rows(*history.iter_report_rows(), output, fmt)
+    return output.getvalue()
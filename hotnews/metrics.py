@@ -0,0 +1,314 @@
+"""
+輕量的效能量測：計時區段 (span)、計數器與單次重新執行的 cProfile / tracemalloc 分析。
+
+    with get_metrics().span("render_card", ratio="1:1"):
+        ...
+    get_metrics().count("feed_fetches", source=site, outcome="ok")
+
+預設關閉，以環境變數 HOTNEWS_METRICS=1 開啟 (整個程序共用，包含背景輪詢)；關閉時 span() 直接回傳
+共用的空 context manager、count() 立即返回，額外成本只有一次屬性判斷。
+結果可輸出為 JSON (snapshot) 或 Prometheus 文字格式 (to_prometheus)；統計由所有 session 共用，
+單一 session 要「清除」時記下當時的 snapshot，之後以 snapshot_since(基準) 只看之後的變化。
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+# 計時的直方圖區間 (秒)，與 Prometheus 預設值相同
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SPANS = 500       # 保留最近幾筆計時紀錄，供偵錯面板顯示單次重新執行的明細
+METRIC_PREFIX = "hotnews_"
+
+_DISABLED = nullcontext()
+# cProfile 在 Python 3.12+ 以 sys.monitoring 實作，整個程序同時只能有一個分析器
+_profiler_lock = threading.Lock()
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)   # 最後一格為 +Inf
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = self.metrics.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, self.metrics.clock() - self.started, **self.labels)
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Metrics:
+    """整個程序共用的計時與計數紀錄 (執行緒安全)。"""
+
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._histograms = {}                    # (名稱, 標籤) -> _Histogram
+        self._counters = {}                      # (名稱, 標籤) -> 數值
+        self._recent = deque(maxlen=RECENT_SPANS)  # (結束的 time.time(), 名稱, 標籤, 秒數, 執行緒名稱)
+
+    def span(self, name, **labels):
+        """計時區段；關閉時回傳共用的空 context manager。"""
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, name, labels)
+
+    def observe(self, name, seconds, **labels):
+        """直接記錄一筆已量好的耗時 (例如由其他執行緒回報的結果)。"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+            self._recent.append((time.time(), name, key[1], seconds, threading.current_thread().name))
+
+    def count(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def timed(self, name, **labels):
+        """將整個函式包成計時區段的裝飾器。"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._recent.clear()
+
+    def recent(self, since=None):
+        """
+        最近的計時紀錄 (舊到新)。
+        Args:
+            since (Optional[float]): 只回傳在這個 time.time() 之後結束的紀錄。
+        Returns:
+            list[dict]: {"time", "name", "labels", "seconds", "thread"}
+        """
+        with self._lock:
+            records = list(self._recent)
+        return [
+            {"time": ended, "name": name, "labels": dict(labels), "seconds": seconds, "thread": thread}
+            for ended, name, labels, seconds, thread in records
+            if since is None or ended >= since
+        ]
+
+    def snapshot(self):
+        """
+        目前所有統計 (可直接 json.dumps)。
+        Returns:
+            dict: {"spans": [{"name", "labels", "count", "total", "mean", "min", "max"}],
+                   "counters": [{"name", "labels", "value"}]}
+        """
+        with self._lock:
+            histograms = [(key, h.count, h.total, h.min, h.max) for key, h in self._histograms.items()]
+            counters = list(self._counters.items())
+        return {
+            "spans": [
+                {"name": name, "labels": dict(labels), "count": count, "total": total,
+                 "mean": total / count, "min": minimum, "max": maximum}
+                for (name, labels), count, total, minimum, maximum in sorted(histograms)
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters)
+            ],
+        }
+
+    def snapshot_since(self, baseline=None):
+        """
+        與 snapshot() 相同格式，但只包含基準 (先前的 snapshot()) 之後的變化；沒有變化的項目省略。
+        區段的 min / max 無法由兩次快照相減得到，為 None。
+        """
+        current = self.snapshot()
+        if baseline is None:
+            return current
+        before_spans = {(s["name"], _label_key(s["labels"])): s for s in baseline["spans"]}
+        before_counters = {(c["name"], _label_key(c["labels"])): c["value"] for c in baseline["counters"]}
+        spans = []
+        for span in current["spans"]:
+            before = before_spans.get((span["name"], _label_key(span["labels"])))
+            count = span["count"] - (before["count"] if before else 0)
+            if count <= 0:
+                continue
+            total = span["total"] - (before["total"] if before else 0.0)
+            spans.append({"name": span["name"], "labels": span["labels"], "count": count, "total": total,
+                          "mean": total / count, "min": None, "max": None})
+        counters = []
+        for counter in current["counters"]:
+            value = counter["value"] - before_counters.get((counter["name"], _label_key(counter["labels"])), 0)
+            if value:
+                counters.append({"name": counter["name"], "labels": counter["labels"], "value": value})
+        return {"spans": spans, "counters": counters}
+
+    def to_prometheus(self):
+        """Prometheus 文字格式 (計時為 <名稱>_seconds 直方圖，計數器為 <名稱>_total)。"""
+        with self._lock:
+            histograms = sorted((key, h.count, h.total, list(h.buckets)) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        lines = []
+        typed = set()
+        for (name, labels), count, total, buckets in histograms:
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS + ("+Inf",), buckets):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{format_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfilerBusy(RuntimeError):
+    """另一個分析器正在執行。"""
+
+
+class RunProfiler:
+    """
+    以 cProfile 與 tracemalloc 分析一段程式 (例如一次 Streamlit 重新執行)。
+    cProfile 只記錄呼叫 start() 的執行緒；tracemalloc 記錄所有執行緒的配置。
+    整個程序同時只能有一個 RunProfiler 在執行，start() 到 stop() 之間持有程序層級的鎖。
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self._profile = cProfile.Profile()
+        self._started_tracing = False
+        self._before = None
+        self.seconds = None
+        self.stats_text = ""
+        self.allocations = []     # [(位置, 大小 bytes, 次數)]
+        self.peak_bytes = None
+        self.running = False
+
+    def start(self):
+        """
+        開始分析。
+        Raises:
+            ProfilerBusy: 另一個 RunProfiler (或程序外掛的分析器，例如除錯器) 正在執行。
+        """
+        if not _profiler_lock.acquire(blocking=False):
+            raise ProfilerBusy("另一個 session 正在分析，請稍後再試")
+        try:
+            if self.trace_memory:
+                self._started_tracing = not tracemalloc.is_tracing()
+                if self._started_tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                self._before = tracemalloc.take_snapshot()
+            self._started = time.perf_counter()
+            self._profile.enable()
+        except BaseException as exc:
+            if self._started_tracing:
+                tracemalloc.stop()
+            _profiler_lock.release()
+            if isinstance(exc, ValueError):
+                # Python 3.12+：已有其他分析器註冊 sys.monitoring
+                raise ProfilerBusy(f"已有其他分析器在執行：{exc}") from exc
+            raise
+        self.running = True
+        return self
+
+    def stop(self, top=25, sort="cumulative"):
+        """結束分析並整理結果；未在執行時不做任何事 (可重複呼叫)。"""
+        if not self.running:
+            return self
+        try:
+            self._profile.disable()
+            self.seconds = time.perf_counter() - self._started
+            if self.trace_memory:
+                # 先取記憶體快照，不計入下面整理分析結果時的配置
+                after = tracemalloc.take_snapshot()
+                self.peak_bytes = tracemalloc.get_traced_memory()[1]
+                if self._started_tracing:
+                    tracemalloc.stop()
+                self.allocations = [
+                    (str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                    for stat in after.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+                    .compare_to(self._before, "lineno")[:top]
+                ]
+        finally:
+            self.running = False
+            _profiler_lock.release()
+        output = io.StringIO()
+        pstats.Stats(self._profile, stream=output).strip_dirs().sort_stats(sort).print_stats(top)
+        self.stats_text = output.getvalue()
+        return self
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """取得整個程序共用的 Metrics；環境變數 HOTNEWS_METRICS=1 時開啟。"""
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = Metrics(enabled=os.environ.get("HOTNEWS_METRICS") == "1")
+        return _default_metrics
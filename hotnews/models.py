@@ -0,0 +1,79 @@
+"""
+文章記錄。
+
+舊版以中文鍵的 dict 表示文章，發佈時間在排序前就格式化為「%Y-%m-%d %H:%M」字串 (失去秒數與時區)，
+沒有日期的文章則以 datetime.now() 代替，每次抓取都會跳到最前面。
+這裡改用固定欄位 (__slots__) 的 dataclass，時間一律為帶時區的 UTC datetime；
+沒有日期的文章 published 為 None，排序改用第一次看到的時間。
+"""
+import calendar
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+REPORT_TIME_FORMAT = "%Y-%m-%d %H:%M"
+REPORT_COLUMNS = ("標題", "連結", "發佈時間", "來源")  # Article.report_row 的欄位順序
+
+
+def entry_key(entry):
+    """文章的唯一鍵：優先使用 GUID，其次連結，都沒有時以標題雜湊代替。"""
+    for field in ("id", "link"):
+        value = entry.get(field)
+        if value:
+            return value
+    return "title:" + hashlib.sha1(entry.get("title", "").encode("utf-8")).hexdigest()
+
+
+def entry_datetime(entry):
+    """feedparser 的 *_parsed 為 UTC struct_time，轉為帶時區的 datetime；沒有日期時回傳 None。"""
+    for field in ("published_parsed", "updated_parsed"):
+        value = entry.get(field)
+        if value:
+            return datetime.fromtimestamp(calendar.timegm(tuple(value[:6]) + (0, 0, 0)), timezone.utc)
+    return None
+
+
+def from_timestamp(value):
+    """epoch 秒轉為 UTC datetime (None 維持 None)。"""
+    return None if value is None else datetime.fromtimestamp(value, timezone.utc)
+
+
+@dataclass(slots=True, eq=False)
+class Article:
+    key: str
+    site: str
+    title: str
+    link: str
+    summary: str
+    published: Optional[datetime]   # UTC；來源沒有提供日期時為 None
+    first_seen: datetime            # UTC；第一次抓到這篇文章的時間
+    cluster: Optional[str] = None   # 去重群組 ID
+
+    @classmethod
+    def from_entry(cls, site, entry, first_seen):
+        return cls(
+            key=entry_key(entry),
+            site=site,
+            title=entry.get("title") or "(無標題)",
+            link=entry.get("link") or "",
+            summary=entry.get("summary") or "",
+            published=entry_datetime(entry),
+            first_seen=first_seen,
+        )
+
+    @property
+    def sort_time(self):
+        """排序用的時間：發佈時間，但不晚於第一次看到的時間 (避免未來日期)；沒有日期時用第一次看到的時間。"""
+        if self.published is None:
+            return self.first_seen
+        return min(self.published, self.first_seen)
+
+    def report_row(self):
+        """報表列 (中文欄位)。時間只在這裡格式化為字串，與舊版報表相同不帶時區。"""
+        return {
+            "標題": self.title,
+            "連結": self.link,
+            "發佈時間": self.sort_time.strftime(REPORT_TIME_FORMAT),
+            "來源": self.site,
+        }
@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+
+from hotnews.feed_cache import get_feed_cache
+from hotnews.feeds import RSS_FEEDS, HostThrottle, fetch_all_feeds
+from hotnews.metrics import get_metrics
+from hotnews.sources import get_source_registry
+from hotnews.store import get_article_store
+
+logger = logging.getLogger(__name__)
+
+# 輪詢設定 (秒)
+POLL_INTERVAL = 300      # 預設每個來源多久更新一次
+MAX_BACKOFF = 3600       # 連續失敗時的最長等待
+POLL_LIMIT = 20          # 每次輪詢每個來源最多讀取幾篇 (報表只取前 5 篇，多存一些供歷史查詢)
+
+
+class FeedPoller:
+    """
+    單一程序內的背景輪詢器：依各來源的間隔定期抓取 RSS，只把新文章寫入文章庫。
+    失敗時以指數退避延後下一次抓取。時間來源 (clock) 與抓取函式 (fetcher) 可以替換，
+    測試時搭配假時鐘與本機 RSS 檔案，直接呼叫 tick() 即可。
+    """
+
+    def __init__(self, feeds=None, store=None, intervals=None, interval=POLL_INTERVAL,
+                 max_backoff=MAX_BACKOFF, limit=POLL_LIMIT, clock=time.time,
+                 fetcher=fetch_all_feeds, cache=None):
+        """
+        Args:
+            feeds (Optional[dict]): {來源名稱: 網址}，預設為 RSS_FEEDS。
+            store (Optional[ArticleStore]): 文章庫，預設為共用的 get_article_store()。
+            intervals (Optional[dict]): {來源名稱: 間隔秒數}，未列出的來源使用設定檔 (sources.json)
+                的 interval，設定檔也沒有的來源使用 interval。
+            interval (float): 預設輪詢間隔。
+            max_backoff (float): 失敗退避的上限。
+            limit (int): 每次每個來源最多讀取幾篇文章。
+            clock (Callable[[], float]): 回傳目前時間 (秒) 的函式。
+            fetcher (Callable): 與 fetch_all_feeds 相同介面的抓取函式。
+            cache (Optional[FeedCache]): 條件式請求快取，預設為 get_feed_cache()。
+        """
+        feeds = RSS_FEEDS if feeds is None else feeds
+        intervals = {**get_source_registry().intervals(), **(intervals or {})}
+        self.store = store or get_article_store()
+        self.max_backoff = max_backoff
+        self.limit = limit
+        self.clock = clock
+        self.fetcher = fetcher
+        self.cache = cache if cache is not None else get_feed_cache()
+        self.throttle = HostThrottle()
+        now = clock()
+        self.schedule = {
+            site: {
+                "url": url,
+                "interval": intervals.get(site, interval),
+                "next_due": now,
+                "failures": 0,
+                "last_success": None,
+                "last_error": None,
+                "last_elapsed": None,
+                "last_new": 0,
+            }
+            for site, url in feeds.items()
+        }
+        self._tick_lock = threading.Lock()    # 同一時間只執行一次 tick
+        self._state_lock = threading.Lock()   # 保護 schedule，讓 status() 不必等待抓取完成
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def due_sites(self, now=None):
+        now = self.clock() if now is None else now
+        return [site for site, state in self.schedule.items() if state["next_due"] <= now]
+
+    def tick(self, force=False):
+        """
+        抓取所有到期的來源，寫入新文章並安排下一次時間。
+        force=True 時抓取全部來源，並略過條件式請求快取的 TTL。
+        抓取或寫入文章庫失敗 (例如資料庫被鎖定) 都記錄在該來源的 last_error 並退避，
+        不會讓其他來源停在到期狀態。
+        Returns:
+            dict: {來源名稱: 新增文章數}，失敗的來源不會出現在結果中。
+        """
+        with self._tick_lock:
+            now = self.clock()
+            sites = list(self.schedule) if force else self.due_sites(now)
+            if not sites:
+                return {}
+            feeds = {site: self.schedule[site]["url"] for site in sites}
+            started = self.clock()
+            try:
+                with get_metrics().span("poll_fetch"):
+                    results = list(self.fetcher(feeds, throttle=self.throttle, cache=self.cache,
+                                                limit=self.limit, revalidate=force))
+            except Exception as exc:
+                logger.exception("抓取來源失敗")
+                now = self.clock()
+                with self._state_lock:
+                    for site in sites:
+                        self._record_failure(site, {"error": f"{type(exc).__name__}: {exc}",
+                                                    "elapsed": now - started}, now)
+                return {}
+
+            added = {}
+            now = self.clock()
+            for result in results:
+                site = result["site"]
+                if not result["error"]:
+                    try:
+                        added[site] = self.store.add_entries(site, result["entries"], now=now)
+                    except Exception as exc:
+                        logger.exception("寫入文章庫失敗：%s", site)
+                        result = dict(result, error=f"{type(exc).__name__}: {exc}")
+                if result["error"]:
+                    with self._state_lock:
+                        self._record_failure(site, result, now)
+                    continue
+                with self._state_lock:
+                    self.schedule[site].update(
+                        failures=0, last_error=None, last_success=now, last_new=added[site],
+                        last_elapsed=result["elapsed"], next_due=now + self.schedule[site]["interval"],
+                    )
+            return added
+
+    def _record_failure(self, site, result, now):
+        """失敗時以指數退避安排下一次抓取 (interval * 2^連續失敗次數，上限 max_backoff)。"""
+        state = self.schedule[site]
+        state["failures"] += 1
+        state["last_error"] = result["error"]
+        state["last_elapsed"] = result["elapsed"]
+        backoff = state["interval"] * (2 ** state["failures"])
+        state["next_due"] = now + min(backoff, self.max_backoff)
+
+    def seconds_until_next(self):
+        now = self.clock()
+        return max(0.0, min(state["next_due"] for state in self.schedule.values()) - now)
+
+    def start(self):
+        """在背景 daemon 執行緒中持續輪詢；重複呼叫不會啟動第二個執行緒。"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+
+    def wake(self):
+        """要求背景執行緒立即檢查到期的來源。"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                # 背景執行緒不可因單次錯誤而停止；各來源的錯誤已在 tick() 中記錄，這裡只會是非預期的錯誤
+                logger.exception("背景輪詢發生非預期的錯誤")
+            self._wakeup.wait(timeout=max(1.0, self.seconds_until_next()))
+            self._wakeup.clear()
+
+    def status(self):
+        """各來源目前的輪詢狀態 (複本)。"""
+        with self._state_lock:
+            return {site: dict(state) for site, state in self.schedule.items()}
@@ -0,0 +1,115 @@
+"""
+社群 Prompt 系統的風格設定、預設模板與 Prompt 組合邏輯 (不依賴 Streamlit)。
+頁面 UI 位於 pages/02_社群Prompt系統.py。
+"""
+from types import MappingProxyType
+
+from hotnews.templates import compile_template
+
+# ================= 風格與預設模板 =================
+
+# 預設的風格清單及其描述 (S1.1, S1.2)
+STYLE_CONFIG = {
+    "專業正式 (Professional)": {
+        "description": "嚴謹、數據導向，適合商業報告、正式公告。",
+        "prompt_prefix": "請以專業且正式的語氣，基於以下內容生成社群貼文。確保語法嚴謹，並在結尾加上相關數據或結論。",
+    },
+    "幽默活潑 (Casual & Lively)": {
+        "description": "用語輕鬆、貼近年輕人，適合互動、娛樂內容。",
+        "prompt_prefix": "請以幽默、活潑且具吸引力的語氣，改寫以下內容。多使用表情符號和網路流行語。",
+    },
+    "緊急促銷 (Urgent Promo)": {
+        "description": "強調時效性、稀缺性，促使使用者立即行動 (CTA)。",
+        "prompt_prefix": "請以緊急促銷的語氣生成貼文。必須包含強烈的行動呼籲 (CTA) 和截止日期。",
+    },
+    "教育分享 (Educational)": {
+        "description": "清晰、步驟化、知識性，適合教學或深度解說。",
+        "prompt_prefix": "請將以下內容整理為步驟清晰、易於理解的教育分享貼文。每個重點請使用條列式呈現。",
+    },
+}
+
+# 預設模板 (T2.1, T2.2)；唯讀，使用者的模板存放在模板庫 (hotnews/template_store.py)
+DEFAULT_TEMPLATES = MappingProxyType({
+    "活動宣傳基礎模板": """
+🎉 重磅消息！我們的 [活動名稱] 活動即將開始！
+日期：{{日期}}
+地點：{{地點}}
+主題：{{主題}}
+
+詳細內容：
+{{核心內容}}
+
+趕快點擊 {{報名連結}} 了解更多資訊並報名參加吧！
+#{{Hashtag1}} #{{Hashtag2}}
+""",
+    "產品發表模板": """
+✨ 全新登場！隆重介紹我們的 {{產品名稱}}！
+這款產品擁有以下突破性特色：
+1. {{特色一}}
+2. {{特色二}}
+
+{{核心內容}}
+
+立即體驗，享受 {{限時優惠}}！
+👉 購買連結：{{購買連結}}
+""",
+})
+
+# ================= 核心邏輯 =================
+
+# 模板語法 (預設值、過濾器、跳脫) 與編譯快取位於 hotnews/templates.py
+CORE_CONTENT_COLUMN = "核心內容"    # 批次 CSV 中可逐列覆寫核心內容的欄位
+
+
+def extract_variables(template_text):
+    """
+    從模板文字中提取所有 {{...}} 變數名稱 (A3.2, T2.4)。
+    模板只在第一次使用時編譯，之後的重新執行直接取用快取。
+    Raises:
+        TemplateError: 模板語法錯誤。
+    """
+    return list(compile_template(template_text).variables)
+
+
+def required_variables(template_text):
+    """沒有預設值、必須由使用者填寫的變數。"""
+    return list(compile_template(template_text).required)
+
+
+def _compose(style_prefix, core_content, processed_template):
+    return f"""
+--- Prompt 指令 ---
+{style_prefix}
+
+--- 核心內容 ---
+{core_content}
+
+--- 套用模板後的貼文草稿 ---
+{processed_template}
+"""
+
+
+def generate_prompt(style_key, template_text, core_content, variable_values, escape=None):
+    """
+    結合風格、模板、核心內容和變數，生成最終 Prompt (A3.3)。
+    變數一次代入 (不會取代到其他變數的值中)，未填寫的變數使用模板中的預設值。
+    Args:
+        escape (Optional[str]): 變數值的自動跳脫方式，見 CompiledTemplate.render。
+    """
+    style_prefix = STYLE_CONFIG.get(style_key, {}).get("prompt_prefix", "")
+    processed_template = compile_template(template_text).render(variable_values, escape)
+    return _compose(style_prefix, core_content, processed_template)
+
+
+def generate_prompts(style_key, template_text, rows, core_content="", escape=None):
+    """
+    批次產生 Prompt：模板對每一列變數值 (例如 read_csv_rows 的結果) 各產生一份。
+    列中若有「核心內容」欄位且不為空，則取代共用的 core_content。
+    Returns:
+        Iterator[str]
+    """
+    style_prefix = STYLE_CONFIG.get(style_key, {}).get("prompt_prefix", "")
+    template = compile_template(template_text)
+    for values in rows:
+        row_content = values.get(CORE_CONTENT_COLUMN) or core_content
+        yield _compose(style_prefix, row_content, template.render(values, escape))
@@ -0,0 +1,103 @@
+# 渲染快取與背景 / 底圖快取位於 hotnews/canvas.py，這裡沿用舊名稱 (benchmarks 以 render.background_cache 等清除快取)
+from hotnews.canvas import RenderCache, background_cache, base_cache, image_digest
+from hotnews.card_templates import get_card_registry
+from hotnews.encoding import encode_image
+from hotnews.fonts import DEFAULT_FAMILY, FONT_FAMILIES, font_registry
+from hotnews.metrics import get_metrics
+
+# ================= 視覺內容生成 (Pillow 實現) =================
+
+# 字型檔路徑與字型家族設定位於 hotnews/fonts.py；版面 (尺寸、遮罩、字級與顏色) 位於 hotnews/card_templates.json
+FONT_FILE_PATH = FONT_FAMILIES[DEFAULT_FAMILY]["bold"]
+
+metrics = get_metrics()
+
+def get_font(size, bold=False):
+    """
+    從共用的字型登錄表取得 CJK 字型；每個字級只會從磁碟載入一次。
+    找不到字型檔時退回預設字型，警告只記錄一次 (UI 端的提示由 app.py 負責)。
+    """
+    return font_registry.get(size, weight="bold" if bold else "regular")
+
+# ================= 渲染快取 =================
+
+RENDER_CACHE_BYTES = 64 * 1024 * 1024  # 渲染快取的記憶體上限
+PREVIEW_SCALE = 0.5  # 畫面預覽的縮放比例：兩欄並排時每張約顯示 350 px，0.5 倍在高 DPI 螢幕上仍清晰
+
+# 以 (標題, 比例, 背景圖雜湊, 縮放比例) 為鍵的整張卡片快取
+render_cache = RenderCache(RENDER_CACHE_BYTES)
+
+
+def card_plan(ratio):
+    """比例代號 ('1:1'、'4:3') 或模板名稱對應的 CardPlan。"""
+    return get_card_registry().plan(ratio)
+
+
+def card_size(ratio):
+    """回傳 (寬, 高)。'4:3' 實際為 3:4 直式版型 (750x1000)，'1:1' 為 1000x1000。"""
+    return card_plan(ratio).size
+
+
+def background_layer(ratio, image_bytes=None):
+    """第 1 階段：解碼並置中裁剪後的背景圖 (RGB)，依 (背景圖雜湊, 尺寸) 快取。"""
+    return card_plan(ratio).background(image_bytes)
+
+
+def base_layer(ratio, image_bytes=None):
+    """第 2 階段：背景加上底部半透明黑色遮罩的底圖，依 (模板, 背景圖雜湊) 快取。"""
+    return card_plan(ratio).base(image_bytes)
+
+
+def draw_title(base, title, ratio):
+    """第 3 階段：在底圖的複本上繪製文章標題 (置中靠下，在遮罩上)。"""
+    return card_plan(ratio).draw(base, {"title": title})
+
+
+def generate_visual_content(title, ratio='1:1', uploaded_file=None, scale=1):
+    """
+    使用 Pillow 函式庫，在伺服器端生成帶有文章標題的圖片模板。
+    背景與遮罩底圖會被快取，重複呼叫時只重畫標題文字。
+    Args:
+        title (str): 文章標題。
+        ratio (str): 圖片比例 ('1:1' 或 '4:3')，或 card_templates.json 中的模板名稱。
+        uploaded_file (Optional): 上傳的背景圖片檔案 (file-like 或 bytes)。
+        scale (float): 小於 1 時為預覽模式：尺寸與字級等比例縮小，背景以 draft 方式縮放 (見 canvas.scale_spec)。
+    """
+    image_bytes = uploaded_file
+    if uploaded_file is not None and not isinstance(uploaded_file, bytes):
+        image_bytes = uploaded_file.getvalue() if hasattr(uploaded_file, "getvalue") else uploaded_file.read()
+    with metrics.span("generate_visual_content", ratio=ratio, preview=scale != 1):
+        return card_plan(ratio).scaled(scale).render({"title": title}, image_bytes)
+
+
+def _cached_entry(title, ratio, image_bytes, scale=1):
+    key = (title, ratio, image_digest(image_bytes), scale)
+    entry = render_cache.get(key)
+    metrics.count("render_cache", outcome="miss" if entry is None else "hit")
+    if entry is None:
+        entry = {"image": generate_visual_content(title, ratio, image_bytes, scale)}
+        render_cache.put(key, entry)
+    return key, entry
+
+
+def render_card(title, ratio='1:1', image_bytes=None, scale=1):
+    """與 generate_visual_content 相同，但參數不變時直接回傳快取的圖片。"""
+    return _cached_entry(title, ratio, image_bytes, scale)[1]["image"]
+
+
+def render_preview(title, ratio='1:1', image_bytes=None):
+    """畫面預覽用的縮小卡片 (PREVIEW_SCALE 倍)；下載請用 render_card_bytes (原尺寸、LANCZOS)。"""
+    return render_card(title, ratio, image_bytes, PREVIEW_SCALE)
+
+
+def render_card_bytes(title, ratio='1:1', image_bytes=None, fmt="png", max_bytes=None):
+    """
+    回傳編碼後的卡片 (EncodedImage，格式與檔案大小上限見 hotnews/encoding.py)。
+    只在第一次要求時編碼，結果與圖片一起快取，之後的重新執行不會再編碼。
+    """
+    key, entry = _cached_entry(title, ratio, image_bytes)
+    encoded = entry.get((fmt, max_bytes))
+    if encoded is None:
+        encoded = encode_image(entry["image"], fmt, max_bytes=max_bytes)
+        render_cache.put(key, {**entry, (fmt, max_bytes): encoded})
+    return encoded
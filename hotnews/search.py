@@ -0,0 +1,130 @@
+"""
+歷史文章全文搜尋 (SQLite FTS5)。
+
+FTS5 內建的 unicode61 斷詞會把整段中文視為一個詞，因此寫入與查詢前都先自行斷詞：
+中文等 CJK 字元切成重疊的二字詞 (bigram)，英數字以單字為單位，再以空白連接交給 FTS5。
+索引與文章庫存放在同一個 SQLite 檔，新文章寫入時在同一個交易內更新索引。
+"""
+import html
+import re
+
+from hotnews.models import Article, from_timestamp
+
+SEARCH_TABLE = "article_search"
+SUMMARY_MAX_CHARS = 2000
+TITLE_WEIGHT = 10.0
+SUMMARY_WEIGHT = 1.0
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_CJK = r"぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W{_CJK}]+", re.UNICODE)
+
+
+def _cjk(text):
+    return "぀" <= text[0] <= "힯" or "豈" <= text[0] <= "﫿"
+
+
+def tokenize(text):
+    """將文字切成搜尋用的詞：CJK 連續字元切成二字詞，英數字轉小寫後整個單字為一詞。"""
+    tokens = []
+    for run in _TOKEN_RE.findall(text or ""):
+        if _cjk(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def _index_text(text):
+    return " ".join(tokenize(text))
+
+
+def clean_summary(summary):
+    """移除 HTML 標籤與實體並截斷長度。"""
+    text = html.unescape(_TAG_RE.sub(" ", summary or ""))
+    return " ".join(text.split())[:SUMMARY_MAX_CHARS]
+
+
+def ensure_schema(conn):
+    """
+    建立搜尋索引 (以 site、key 對應 articles 的主鍵)。第一次建立時會把既有文章全部補進索引；
+    舊版只有 key 欄位的索引會重建。
+    Returns:
+        int: 本次補建的文章數 (索引已存在時為 0)。
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({SEARCH_TABLE})")}
+    if "site" in columns:
+        return 0
+    if columns:
+        conn.execute(f"DROP TABLE {SEARCH_TABLE}")
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(site UNINDEXED, key UNINDEXED, title, summary, "
+        "tokenize = 'unicode61')"
+    )
+    # 以 FTS5 內建的 rank 排序 (BM25，標題權重較高)，比在 SELECT 中呼叫 bm25() 快
+    conn.execute(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', ?)",
+        (f"bm25(0, 0, {TITLE_WEIGHT}, {SUMMARY_WEIGHT})",),
+    )
+    rows = conn.execute("SELECT site, key, title, summary FROM articles").fetchall()
+    conn.executemany(
+        f"INSERT INTO {SEARCH_TABLE} (site, key, title, summary) VALUES (?, ?, ?, ?)",
+        ((site, key, _index_text(title), _index_text(clean_summary(summary))) for site, key, title, summary in rows),
+    )
+    return len(rows)
+
+
+def index_article(conn, site, key, title, summary):
+    """將一篇文章加入索引 (呼叫端負責交易)。"""
+    conn.execute(
+        f"INSERT INTO {SEARCH_TABLE} (site, key, title, summary) VALUES (?, ?, ?, ?)",
+        (site, key, _index_text(title), _index_text(clean_summary(summary))),
+    )
+
+
+def build_match_query(query, prefix=True):
+    """
+    將使用者輸入轉為 FTS5 查詢：每個詞都必須出現 (AND)。
+    prefix=True 時最後一個詞以前綴比對，輸入到一半也能找到結果 (即時建議)。
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    quoted = ['"' + token.replace('"', '""') + '"' for token in tokens]
+    # 完整的二字詞不需要前綴比對；只有英數字或單獨一個中文字時才可能是輸入到一半
+    if prefix and not (_cjk(tokens[-1]) and len(tokens[-1]) == 2):
+        quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+def search_articles(conn, query, limit=20, prefix=True):
+    """
+    依相關度 (BM25) 搜尋文章。
+    Returns:
+        list[Article]: 最相關的在前。
+    """
+    match = build_match_query(query, prefix)
+    if match is None:
+        return []
+    # 先在索引內排序取前 limit 筆，再回文章表取欄位，避免常見詞命中大量文章時逐筆 JOIN
+    rows = conn.execute(
+        f"""
+        SELECT a.key, a.site, a.title, a.link, a.summary, a.published, a.first_seen, a.cluster
+        FROM (
+            SELECT site, key, rank FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ) AS hits JOIN articles AS a ON a.site = hits.site AND a.key = hits.key
+        ORDER BY hits.rank
+        """,
+        (match, limit),
+    ).fetchall()
+    return [
+        Article(key, site, title, link, summary, from_timestamp(published), from_timestamp(first_seen), cluster)
+        for key, site, title, link, summary, published, first_seen, cluster in rows
+    ]
+
@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+class SharedCache:
+    """
+    整個程序共用、具 TTL 的快取，語意類似 st.cache_data / st.cache_resource：
+    所有瀏覽器 session 共享同一份結果。同一個 key 同時有多個請求時只會執行一次計算
+    (single-flight)，其他請求等待並直接取用該結果。
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}    # key -> (value, created_at)
+        self._key_locks = {}
+        self._stats = {"hits": 0, "misses": 0, "deduplicated": 0}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fresh(self, key, ttl, not_before=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        _, created_at = entry
+        if self.clock() - created_at >= ttl:
+            return None
+        if not_before is not None and created_at < not_before:
+            return None
+        return entry
+
+    def get_or_compute(self, key, compute, ttl, force=False):
+        """
+        取得 key 的快取值，過期或不存在時呼叫 compute() 重新計算。
+        Args:
+            key (Hashable): 快取鍵。
+            compute (Callable[[], Any]): 計算函式。
+            ttl (float): 有效秒數。
+            force (bool): 強制重新計算；若等待期間已有其他請求完成計算，則直接使用其結果。
+        """
+        requested_at = self.clock()
+        if not force:
+            entry = self._fresh(key, ttl)
+            if entry is not None:
+                self._count("hits")
+                return entry[0]
+
+        with self._key_lock(key):
+            # 等待鎖的期間，其他 session 可能已經算好了
+            entry = self._fresh(key, ttl, not_before=requested_at if force else None)
+            if entry is not None:
+                self._count("deduplicated")
+                return entry[0]
+            self._count("misses")
+            value = compute()
+            self._entries[key] = (value, self.clock())
+            return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def age(self, key):
+        """快取值已存在多少秒；沒有快取時回傳 None。"""
+        entry = self._entries.get(key)
+        return None if entry is None else self.clock() - entry[1]
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_default_cache = SharedCache()
+
+
+def get_shared_cache():
+    """取得整個程序共用的 SharedCache。"""
+    return _default_cache
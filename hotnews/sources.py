@@ -0,0 +1,222 @@
+"""
+來源設定與健康狀態。
+
+來源清單由設定檔 (預設為 hotnews/sources.json，可用環境變數 HOTNEWS_SOURCES 指定) 載入，
+每個來源可各自設定格式 (type)、逾時、重試與退避、熔斷門檻與冷卻時間、文章數上限與輪詢間隔。
+SourceRegistry 保存每個來源的熔斷器與最近的抓取紀錄 (延遲分位數、錯誤率、最後成功時間)，
+供狀態頁顯示。
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+
+SOURCES_PATH = os.environ.get("HOTNEWS_SOURCES", os.path.join(os.path.dirname(__file__), "sources.json"))
+HEALTH_WINDOW = 200      # 每個來源保留最近幾次抓取的紀錄
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    url: str
+    type: str = "rss"               # connectors.py 中註冊的格式名稱
+    timeout: float = 10.0           # 單次請求逾時 (秒)
+    retries: int = 1                # 網路錯誤或 5xx 時額外重試幾次
+    backoff: float = 1.0            # 第 n 次重試前等待 backoff * 2^(n-1) 秒
+    limit: int = 20                 # 每次最多讀取幾篇
+    failure_threshold: int = 3      # 連續失敗幾次後熔斷
+    cooldown: float = 300.0         # 熔斷後多久才再試一次 (秒)
+    interval: float = 300.0         # 背景輪詢間隔 (秒)
+
+
+def load_sources(path=SOURCES_PATH):
+    """
+    讀取來源設定檔：{"defaults": {...}, "sources": [{"name", "url", ...}, ...]}。
+    Returns:
+        list[Source]: 依設定檔順序。
+    Raises:
+        ValueError: 欄位名稱錯誤、缺少 name / url 或格式不支援。
+    """
+    from hotnews.connectors import get_connector
+
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    known = {field.name for field in fields(Source)}
+    defaults = config.get("defaults", {})
+    sources = []
+    for entry in config.get("sources", []):
+        options = {**defaults, **entry}
+        unknown = set(options) - known
+        if unknown:
+            raise ValueError(f"來源設定有未知的欄位：{', '.join(sorted(unknown))}")
+        if not options.get("name") or not options.get("url"):
+            raise ValueError(f"來源設定缺少 name 或 url：{entry}")
+        source = Source(**options)
+        get_connector(source.type)
+        sources.append(source)
+    return sources
+
+
+class CircuitBreaker:
+    """
+    連續失敗 failure_threshold 次後進入「open」，cooldown 秒內直接略過請求；
+    冷卻結束後為「half_open」，允許一次試探請求，成功即恢復、失敗則重新計時。
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=300.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.clock() - self.opened_at < self.cooldown else "half_open"
+
+    def allow(self):
+        """是否可以送出請求。half_open 時只放行一次，並重新計時直到該次結果回報。"""
+        with self._lock:
+            state = self.state
+            if state == "half_open":
+                self.opened_at = self.clock()
+            return state != "open"
+
+    def retry_in(self):
+        """熔斷中還要多久才會再試 (秒)。"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class SourceHealth:
+    """最近 window 次抓取的延遲與結果。"""
+
+    def __init__(self, window=HEALTH_WINDOW):
+        self._records = deque(maxlen=window)   # (時間, 耗時, 是否成功)
+        self._lock = threading.Lock()
+        self.last_success = None
+        self.last_error = None
+        self.last_error_at = None
+        self.skipped = 0                       # 熔斷期間略過的次數
+
+    def record(self, elapsed, error=None, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._records.append((now, elapsed, error is None))
+            if error is None:
+                self.last_success = now
+            else:
+                self.last_error, self.last_error_at = error, now
+
+    def record_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def snapshot(self):
+        with self._lock:
+            records = list(self._records)
+        latencies = sorted(elapsed for _, elapsed, _ in records)
+        errors = sum(1 for _, _, ok in records if not ok)
+        return {
+            "requests": len(records),
+            "error_rate": errors / len(records) if records else None,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+            "skipped": self.skipped,
+        }
+
+
+class SourceRegistry:
+    """所有來源的設定、熔斷器與健康紀錄。"""
+
+    def __init__(self, sources):
+        self._lock = threading.Lock()
+        self.sources = {}
+        self.breakers = {}
+        self.health = {}
+        for source in sources:
+            self._register(source)
+
+    def _register(self, source):
+        self.sources[source.name] = source
+        self.breakers[source.name] = CircuitBreaker(source.failure_threshold, source.cooldown)
+        self.health[source.name] = SourceHealth()
+        return source
+
+    def resolve(self, name, url):
+        """
+        取得來源設定。設定檔中沒有的來源 (例如臨時指定的網址) 以預設值建立；
+        網址與設定檔不同時沿用同名來源的其他設定。
+        """
+        with self._lock:
+            source = self.sources.get(name)
+            if source is None:
+                return self._register(Source(name=name, url=url))
+            if source.url != url:
+                source = self.sources[name] = replace(source, url=url)
+            return source
+
+    def feeds(self):
+        """{來源名稱: 網址}，與舊版 RSS_FEEDS 相同格式。"""
+        return {name: source.url for name, source in self.sources.items()}
+
+    def intervals(self):
+        return {name: source.interval for name, source in self.sources.items()}
+
+    def status(self):
+        """
+        各來源的設定與健康狀態，供狀態頁使用。
+        Returns:
+            list[dict]: {"name", "type", "url", "state", "retry_in", ...SourceHealth.snapshot()}
+        """
+        rows = []
+        for name, source in list(self.sources.items()):
+            breaker = self.breakers[name]
+            rows.append({
+                "name": name,
+                "type": source.type,
+                "url": source.url,
+                "state": breaker.state,
+                "retry_in": breaker.retry_in(),
+                **self.health[name].snapshot(),
+            })
+        return rows
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_source_registry():
+    """取得整個程序共用的 SourceRegistry (由 SOURCES_PATH 載入)。"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = SourceRegistry(load_sources())
+        return _default_registry
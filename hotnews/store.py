@@ -0,0 +1,275 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from hotnews import DATA_DIR
+from hotnews.dedup import DedupIndex, collapse_clusters
+from hotnews.history import ColumnarHistory
+from hotnews.metrics import get_metrics
+from hotnews.models import Article, from_timestamp
+from hotnews.search import ensure_schema, index_article, search_articles
+from hotnews.trending import LONG_HALF_LIFE, TrendTracker
+
+metrics = get_metrics()
+
+STORE_PATH = os.path.join(DATA_DIR, "articles.sqlite3")
+# 建立趨勢索引時回溯的歷史長度；更早的文章在長窗口中已衰減到可忽略
+TREND_LOOKBACK = 5 * LONG_HALF_LIFE
+ARTICLE_FIELDS = "key, site, title, link, summary, published, first_seen, cluster"
+# 同一篇文章 (相同 GUID / 連結) 由多個來源轉載時，每個來源各有一列
+ARTICLES_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        key TEXT NOT NULL,
+        site TEXT NOT NULL,
+        title TEXT NOT NULL,
+        link TEXT NOT NULL,
+        summary TEXT NOT NULL DEFAULT '',
+        published REAL,
+        first_seen REAL NOT NULL,
+        cluster TEXT,
+        PRIMARY KEY (site, key)
+    )
+"""
+
+
+class ArticleStore:
+    """
+    所有來源共用的文章庫。SQLite 以 (來源, GUID / 連結) 為鍵，只新增該來源尚未見過的文章，並維護分群與全文搜尋索引；
+    新文章同時追加到欄式歷史 (self.history)，報表與歷史匯出由歷史讀取。
+    背景輪詢器負責寫入，報表按鈕只需查詢各來源最新的 N 篇。
+    """
+
+    def __init__(self, path=STORE_PATH, history_path=None):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        history_path = history_path or os.path.join(os.path.dirname(path) or ".", "history")
+        self.history = ColumnarHistory(history_path)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(ARTICLES_TABLE.format(name="articles"))
+            table_info = conn.execute("PRAGMA table_info(articles)").fetchall()
+            # 舊版資料庫沒有 cluster 欄位
+            if "cluster" not in {row[1] for row in table_info}:
+                conn.execute("ALTER TABLE articles ADD COLUMN cluster TEXT")
+            # 舊版只以 key 為主鍵，其他來源轉載同一連結時整列被忽略；改以 (site, key) 重建資料表
+            primary_key = [row[1] for row in sorted(table_info, key=lambda row: row[5]) if row[5]]
+            if primary_key != ["site", "key"]:
+                conn.execute(ARTICLES_TABLE.format(name="articles_rebuilt"))
+                conn.execute(f"INSERT INTO articles_rebuilt ({ARTICLE_FIELDS}) SELECT {ARTICLE_FIELDS} FROM articles")
+                conn.execute("DROP TABLE articles")
+                conn.execute("ALTER TABLE articles_rebuilt RENAME TO articles")
+            # 沒有發佈時間的文章以第一次看到的時間排序，不會每次抓取都跳到最前面
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS articles_site_time
+                ON articles (site, COALESCE(published, first_seen) DESC)
+            """)
+            # 全文搜尋索引；升級前已存在的文章在第一次建立索引時補入
+            ensure_schema(conn)
+
+        self._dedup = None
+        self._dedup_lock = threading.Lock()
+        self._trends = None
+        self._trends_lock = threading.Lock()
+        self._history_backlog = []    # 已提交到 SQLite、但追加到欄式歷史失敗的文章
+        self._history_lock = threading.Lock()
+        self._reconcile_history()
+
+    @contextmanager
+    def _connect(self):
+        """一次交易用的連線：成功時提交、出錯時回復，結束後一律關閉。"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _reconcile_history(self):
+        """
+        把 SQLite 裡有、欄式歷史裡沒有的文章補寫入歷史。
+        升級前的資料庫沒有欄式歷史時會寫入全部文章；追加歷史失敗 (或程序在提交後中斷) 的文章
+        也在下次啟動時補上，不會從報表與匯出中永久消失。只讀取歷史的 key、site 欄位。
+        Returns:
+            int: 補寫入的文章數。
+        """
+        recorded = set()
+        for day in self.history.days():
+            table = self.history.read_day(day, ["key", "site"])
+            recorded.update(zip(table.column("key").to_pylist(), table.column("site").to_pylist()))
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {ARTICLE_FIELDS} FROM articles").fetchall()
+        missing = [
+            Article(key, site, title, link, summary, from_timestamp(published), from_timestamp(first_seen), cluster)
+            for key, site, title, link, summary, published, first_seen, cluster in rows
+            if (key, site) not in recorded
+        ]
+        if missing:
+            self.history.append(missing)
+        return len(missing)
+
+    def _append_history(self, articles):
+        """
+        追加到欄式歷史；失敗的文章保留到下一次追加時重試，例外照常拋出。
+        依日期逐一追加，已寫入的日期不會在重試時重複寫入。
+        """
+        with self._history_lock:
+            by_day = {}
+            for article in self._history_backlog + articles:
+                by_day.setdefault(article.first_seen.strftime("%Y-%m-%d"), []).append(article)
+            pending = list(by_day.values())
+            try:
+                with metrics.span("history_append"):
+                    while pending:
+                        self.history.append(pending[0])
+                        pending.pop(0)
+            finally:
+                self._history_backlog = [article for day_articles in pending for article in day_articles]
+
+    def dedup_index(self):
+        """
+        近似重複分群索引；第一次使用時由既有文章建立，之後每篇新文章增量加入。
+        尚未分群的舊文章 (例如升級前的資料) 會在這時補上群組。
+        """
+        with self._dedup_lock:
+            if self._dedup is None:
+                index = DedupIndex()
+                updates = []
+                with self._connect() as conn:
+                    rows = conn.execute(
+                        "SELECT site, key, title, link, cluster FROM articles ORDER BY first_seen"
+                    ).fetchall()
+                    for site, key, title, link, cluster in rows:
+                        assigned = index.add(key, title, link)
+                        if cluster != assigned:
+                            updates.append((assigned, site, key))
+                    conn.executemany("UPDATE articles SET cluster = ? WHERE site = ? AND key = ?", updates)
+                self._dedup = index
+            return self._dedup
+
+    def trend_tracker(self):
+        """熱門趨勢追蹤器；第一次使用時由最近 TREND_LOOKBACK 秒的文章建立，之後增量加入新文章。"""
+        with self._trends_lock:
+            if self._trends is None:
+                tracker = TrendTracker()
+                since = datetime.now(timezone.utc) - timedelta(seconds=TREND_LOOKBACK)
+                for article in sorted(self.history.articles_since(since), key=lambda a: a.first_seen):
+                    tracker.add(article.key, article.site, article.title, article.link,
+                                article.sort_time.timestamp(), article.cluster)
+                self._trends = tracker
+            return self._trends
+
+    def add_entries(self, site, entries, now=None):
+        """
+        新增一個來源的文章，該來源已存在的鍵會被忽略；新文章同時加入去重、全文搜尋與趨勢索引，
+        並追加到欄式歷史。其他來源已有相同鍵的文章 (轉載) 會歸入同一群組。
+        記憶體中的去重與趨勢索引、欄式歷史只在交易成功提交後更新，寫入失敗時不會留下
+        資料庫裡沒有的文章；群組寫回失敗的文章下次建立去重索引時會補上，追加歷史失敗的文章
+        在下一次追加或下次啟動時補上。
+        Args:
+            now (Optional[float]): 第一次看到的時間 (epoch 秒)，預設為現在。
+        Returns:
+            int: 實際新增的文章數。
+        """
+        first_seen = from_timestamp(time.time() if now is None else now)
+        with metrics.span("parse_entries", source=site):
+            articles = [Article.from_entry(site, entry, first_seen) for entry in entries]
+        index = self.dedup_index()
+        trends = self.trend_tracker()
+        added = []
+        with metrics.span("store_write", source=site), self._connect() as conn:
+            for article in articles:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+                    (
+                        article.key, site, article.title, article.link, article.summary,
+                        article.published.timestamp() if article.published else None,
+                        first_seen.timestamp(),
+                    ),
+                )
+                if cursor.rowcount:
+                    index_article(conn, site, article.key, article.title, article.summary)
+                    added.append(article)
+        if added:
+            for article in added:
+                article.cluster = index.add(article.key, article.title, article.link)
+                trends.add(article.key, site, article.title, article.link,
+                           article.sort_time.timestamp(), article.cluster)
+            with self._connect() as conn:
+                conn.executemany("UPDATE articles SET cluster = ? WHERE site = ? AND key = ?",
+                                 [(article.cluster, site, article.key) for article in added])
+            self._append_history(added)
+        metrics.count("articles_added", len(added), source=site)
+        return len(added)
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def search(self, query, limit=20, prefix=True):
+        """
+        以標題與摘要全文搜尋所有歷史文章，依相關度排序。
+        Returns:
+            list[Article]
+        """
+        with metrics.span("search"), self._connect() as conn:
+            return search_articles(conn, query, limit, prefix)
+
+    def latest_per_source(self, n=5, sites=None):
+        """
+        查詢每個來源最新的 n 篇文章 (由欄式歷史讀取)。
+        Returns:
+            list[Article]: 依時間新到舊。
+        """
+        return self.history.latest_per_source(n, sites)
+
+
+def latest_report(store, n=5, sites=None, dedupe=True):
+    """
+    以文章庫內容組出與 fetch_top5_each_site 相同欄位的報表 DataFrame。
+    dedupe=True 時，同一群組 (轉載或標題近似) 的文章合併為一列，「來源」列出所有來源。
+    """
+    with metrics.span("history_read"):
+        articles = store.latest_per_source(n, sites)
+    with metrics.span("report_dataframe"):
+        rows = [article.report_row() for article in articles]
+        if dedupe:
+            rows = collapse_clusters(rows, lambda i, row: articles[i].cluster or articles[i].link)
+        return pd.DataFrame(rows)
+
+
+def trending_report(store, n=10, now=None):
+    """
+    依升溫速度排序的熱門文章 DataFrame；同一群組只列一篇，「來源」列出所有來源。
+    """
+    with metrics.span("trending"):
+        hot = store.trend_tracker().hot_articles(n, now)
+    rows = [
+        {
+            "標題": article["title"],
+            "連結": article["link"],
+            "來源": "、".join(article["sources"]),
+            "熱度": round(article["score"], 1),
+            "熱門關鍵詞": "、".join(article["terms"]),
+        }
+        for article in hot
+    ]
+    return pd.DataFrame(rows)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_article_store():
+    """取得整個程序共用的 ArticleStore。"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArticleStore()
+        return _default_store
@@ -0,0 +1,293 @@
+"""
+團隊共用的 Prompt 模板庫 (SQLite)。
+
+每次儲存產生新版本 (舊版本保留，可查詢與還原)，刪除只標記為已刪除。
+名稱與標籤查詢走索引；名稱清單、標籤清單與模板內容在程序內快取。每次寫入會遞增資料庫中的
+寫入世代 (template_meta)，讀取時先比對世代，其他 session 或程序寫入後快取即失效。
+多個 Streamlit session 同時寫入時以 SQLite 的 BEGIN IMMEDIATE 排隊，
+並可傳入 expected_version 做樂觀鎖，避免覆蓋別人剛儲存的版本。
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+
+from hotnews import DATA_DIR
+
+TEMPLATE_STORE_PATH = os.path.join(DATA_DIR, "templates.sqlite3")
+NAME_LIST_LIMIT = 200     # 側邊欄一次最多列出幾個模板名稱
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateRecord:
+    name: str
+    body: str
+    version: int
+    tags: tuple
+    updated_at: float
+
+
+class TemplateConflict(Exception):
+    """儲存或刪除時，模板已被其他 session 更新 (版本與預期不符)。"""
+
+    def __init__(self, name, expected_version, current_version):
+        if expected_version == 0:
+            message = f"已有名為「{name}」的模板"
+        else:
+            message = f"模板「{name}」已被其他人更新 (你編輯的是第 {expected_version} 版，目前為第 {current_version} 版)"
+        super().__init__(message)
+        self.name = name
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+def normalize_tags(tags):
+    """接受逗號分隔字串或可迭代物件，回傳排序、去重、去空白後的 tuple。"""
+    if isinstance(tags, str):
+        tags = tags.replace("，", ",").split(",")
+    return tuple(sorted({tag.strip() for tag in tags or () if tag.strip()}))
+
+
+class TemplateStore:
+    """
+    Prompt 模板庫。第一次建立時匯入 seed 中的模板 (版本 1)。
+    Args:
+        path (str): SQLite 檔案路徑。
+        seed (Optional[Mapping[str, str]]): 空資料庫時匯入的 {名稱: 內容}。
+    """
+
+    def __init__(self, path=TEMPLATE_STORE_PATH, seed=None):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._cache_lock = threading.Lock()
+        self._cache = {}
+        self._generation = None     # 快取內容對應的寫入世代
+        self._local = threading.local()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS templates (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS template_versions (
+                    name TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    body TEXT NOT NULL,
+                    tags TEXT NOT NULL DEFAULT '',
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (name, version)
+                );
+                CREATE TABLE IF NOT EXISTS template_tags (
+                    tag TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (tag, name)
+                );
+                CREATE TABLE IF NOT EXISTS template_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO template_meta (key, value) VALUES ('generation', 0);
+            """)
+        if seed and not self.count(include_deleted=True):
+            for name, body in seed.items():
+                self.save(name, body)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=10000")
+        return conn
+
+    # ================= 讀取 (程序內快取) =================
+
+    def _db_generation(self):
+        # 每次讀取都會檢查，沿用每個執行緒自己的連線 (autocommit，不會停留在舊的快照)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn.execute("SELECT value FROM template_meta WHERE key = 'generation'").fetchone()[0]
+
+    def _cached(self, key, load):
+        # 先讀世代再載入：載入期間若有寫入，下次讀取時世代不同，快取會被清除
+        generation = self._db_generation()
+        with self._cache_lock:
+            if generation != self._generation:
+                self._cache.clear()
+                self._generation = generation
+            elif key in self._cache:
+                return self._cache[key]
+        value = load()
+        with self._cache_lock:
+            if generation == self._generation:
+                self._cache[key] = value
+        return value
+
+    def count(self, include_deleted=False):
+        with closing(self._connect()) as conn:
+            sql = "SELECT COUNT(*) FROM templates" + ("" if include_deleted else " WHERE deleted = 0")
+            return conn.execute(sql).fetchone()[0]
+
+    def names(self, prefix="", tag=None, limit=NAME_LIST_LIMIT):
+        """
+        依名稱排序的模板名稱。prefix 與 tag 皆以索引查詢，不會掃描整張表。
+        Args:
+            prefix (str): 名稱開頭。
+            tag (Optional[str]): 只列出有此標籤的模板。
+            limit (Optional[int]): 最多幾筆；None 表示全部。
+        """
+        def load():
+            params = []
+            if tag:
+                sql = ("SELECT t.name FROM template_tags g JOIN templates t ON t.name = g.name "
+                       "WHERE g.tag = ? AND t.deleted = 0")
+                params.append(tag)
+                column = "g.name"
+            else:
+                sql = "SELECT name FROM templates WHERE deleted = 0"
+                column = "name"
+            if prefix:
+                # 以範圍條件取代 LIKE，才能使用主鍵索引
+                sql += f" AND {column} >= ? AND {column} < ?"
+                params += [prefix, prefix + "\U0010ffff"]
+            sql += f" ORDER BY {column}"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            with closing(self._connect()) as conn:
+                return [row[0] for row in conn.execute(sql, params)]
+        return list(self._cached(("names", prefix, tag, limit), load))
+
+    def tags(self):
+        """所有使用中的標籤 (排序)。"""
+        def load():
+            with closing(self._connect()) as conn:
+                return [row[0] for row in conn.execute(
+                    "SELECT DISTINCT g.tag FROM template_tags g JOIN templates t ON t.name = g.name "
+                    "WHERE t.deleted = 0 ORDER BY g.tag"
+                )]
+        return list(self._cached(("tags",), load))
+
+    def get(self, name, version=None):
+        """
+        取得模板目前 (或指定) 版本；不存在或已刪除時回傳 None (指定版本時仍可讀取已刪除模板的歷史)。
+        Returns:
+            Optional[TemplateRecord]
+        """
+        def load():
+            with closing(self._connect()) as conn:
+                if version is None:
+                    row = conn.execute(
+                        "SELECT v.name, v.body, v.version, v.tags, t.updated_at FROM templates t "
+                        "JOIN template_versions v ON v.name = t.name AND v.version = t.version "
+                        "WHERE t.name = ? AND t.deleted = 0",
+                        (name,),
+                    ).fetchone()
+                else:
+                    row = conn.execute(
+                        "SELECT name, body, version, tags, created_at FROM template_versions "
+                        "WHERE name = ? AND version = ?",
+                        (name, version),
+                    ).fetchone()
+            if row is None:
+                return None
+            return TemplateRecord(row[0], row[1], row[2], normalize_tags(row[3]), row[4])
+        return self._cached(("get", name, version), load)
+
+    def versions(self, name):
+        """模板的所有版本 [(版本, 建立時間)]，新到舊。"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT version, created_at FROM template_versions WHERE name = ? ORDER BY version DESC",
+                (name,),
+            ).fetchall()
+
+    # ================= 寫入 =================
+
+    def _write(self, name, expected_version, apply):
+        """在 BEGIN IMMEDIATE 交易中檢查版本後執行 apply(conn, 目前版本)。"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT version, deleted FROM templates WHERE name = ?", (name,)).fetchone()
+            current = row[0] if row else 0
+            live_version = current if row and not row[1] else 0
+            if expected_version is not None and expected_version != live_version:
+                raise TemplateConflict(name, expected_version, live_version)
+            result = apply(conn, current)
+            conn.execute("UPDATE template_meta SET value = value + 1 WHERE key = 'generation'")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return result
+
+    def save(self, name, body, tags=(), expected_version=None):
+        """
+        儲存新版本。
+        Args:
+            expected_version (Optional[int]): 編輯時讀到的版本 (新模板為 0)；與目前版本不符時
+                拋出 TemplateConflict。None 表示不檢查 (直接覆蓋)。
+        Returns:
+            int: 新版本號。
+        Raises:
+            ValueError: 名稱為空。
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("模板名稱不可為空")
+        tags = normalize_tags(tags)
+
+        def apply(conn, current):
+            version = current + 1
+            now = time.time()
+            conn.execute(
+                "INSERT INTO template_versions (name, version, body, tags, created_at) VALUES (?, ?, ?, ?, ?)",
+                (name, version, body, ",".join(tags), now),
+            )
+            conn.execute(
+                "INSERT INTO templates (name, version, deleted, updated_at) VALUES (?, ?, 0, ?) "
+                "ON CONFLICT (name) DO UPDATE SET version = excluded.version, deleted = 0, "
+                "updated_at = excluded.updated_at",
+                (name, version, now),
+            )
+            conn.execute("DELETE FROM template_tags WHERE name = ?", (name,))
+            conn.executemany("INSERT INTO template_tags (tag, name) VALUES (?, ?)", ((tag, name) for tag in tags))
+            return version
+
+        return self._write(name, expected_version, apply)
+
+    def delete(self, name, expected_version=None):
+        """標記模板為已刪除 (版本紀錄保留，之後以同名儲存會接續版本號)。"""
+        def apply(conn, current):
+            conn.execute("UPDATE templates SET deleted = 1, updated_at = ? WHERE name = ?", (time.time(), name))
+
+        self._write(name, expected_version, apply)
+
+    def restore(self, name, version, expected_version=None):
+        """以舊版本的內容與標籤儲存為新版本。"""
+        record = self.get(name, version)
+        if record is None:
+            raise KeyError(f"找不到模板「{name}」第 {version} 版")
+        return self.save(name, record.body, record.tags, expected_version)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_template_store():
+    """取得整個程序共用的 TemplateStore；第一次建立時匯入預設模板。"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            from hotnews.prompts import DEFAULT_TEMPLATES
+            _default_store = TemplateStore(seed=DEFAULT_TEMPLATES)
+        return _default_store
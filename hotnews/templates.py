@@ -0,0 +1,219 @@
+"""
+Prompt 模板引擎：模板編譯一次後快取為片段清單，之後每次套用只需一次 join。
+
+語法：
+    {{ 變數 }}                        以變數值取代
+    {{ 變數 | default:未定 }}          沒有值 (或為空字串) 時使用預設值
+    {{ 變數 | strip | upper }}         依序套用過濾器 (見 FILTERS)
+    {{ 變數 | truncate:20 }}           有參數的過濾器以冒號分隔
+    \\{{ 文字 }}                       反斜線開頭時原樣輸出 {{ 文字 }}
+
+過濾器名稱與參數在編譯時檢查 (未知的過濾器、不接受參數的過濾器帶了參數、參數格式錯誤都會引發 TemplateError)，
+套用時不會再因為模板內容而失敗。
+只有後面接著已知過濾器名稱的 | 才是過濾器的分隔，舊版模板中含有 | 的變數名稱 (例如 {{品牌|產品}}) 照常可用；
+第一個過濾器之後的每一段都必須是已知的過濾器。
+沒有值也沒有預設值的變數保留原本的 {{...}} 文字 (與舊版 str.replace 行為相同)。
+變數值只在最後一次組合時放入，不會再被其他變數取代。
+"""
+import csv
+import html
+import re
+from functools import lru_cache
+
+_FIELD = re.compile(r"(\\)?\{\{([^}]+)\}\}")
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|>~])")
+TEMPLATE_CACHE_SIZE = 256
+
+
+def _truncate(value, length=50):
+    return value if len(value) <= length else value[:max(0, length - 1)] + "…"
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise ValueError("必須為正整數")
+    return value
+
+
+def _hashtag(value):
+    """轉為 hashtag 可用的文字：去除空白與標點 (保留中文、英數與底線)。"""
+    return re.sub(r"[^\w]", "", value)
+
+
+FILTERS = {
+    "strip": lambda value: value.strip(),
+    "upper": lambda value: value.upper(),
+    "lower": lambda value: value.lower(),
+    "title": lambda value: value.title(),
+    "truncate": _truncate,
+    "hashtag": _hashtag,
+    "html": lambda value: html.escape(value, quote=True),
+    "markdown": lambda value: _MARKDOWN_SPECIAL.sub(r"\\\1", value),
+    "oneline": lambda value: " ".join(value.split()),
+}
+
+# 接受一個參數的過濾器：{名稱: 編譯時轉換參數的函式 (格式錯誤時引發 ValueError)}；其餘過濾器不接受參數
+FILTER_ARGUMENTS = {
+    "truncate": _positive_int,
+}
+
+# render(escape=...) 可用的自動跳脫方式；個別欄位可用 raw 過濾器略過
+ESCAPES = {None: None, "html": FILTERS["html"], "markdown": FILTERS["markdown"]}
+
+
+class TemplateError(ValueError):
+    """模板語法錯誤 (例如未知的過濾器)。"""
+
+
+class _Field:
+    __slots__ = ("name", "filters", "default", "raw", "source")
+
+    def __init__(self, name, filters, default, raw, source):
+        self.name = name
+        self.filters = filters      # ((函式, 參數), ...)
+        self.default = default      # None 表示沒有預設值
+        self.raw = raw
+        self.source = source        # 原始的 {{...}} 文字
+
+    def render(self, values, escape):
+        value = values.get(self.name)
+        if value is None or value == "":
+            if self.default is None:
+                return self.source
+            value = self.default
+        value = str(value)
+        for func, args in self.filters:
+            value = func(value, *args)
+        if escape is not None and not self.raw:
+            value = escape(value)
+        return value
+
+
+def _filter_args(filter_name, arg, source):
+    """編譯時檢查並轉換過濾器參數，回傳傳給過濾器的參數 tuple。"""
+    if not arg:
+        return ()
+    convert = FILTER_ARGUMENTS.get(filter_name)
+    if convert is None:
+        raise TemplateError(f"過濾器「{filter_name}」不接受參數：{source}")
+    try:
+        return (convert(arg),)
+    except ValueError:
+        raise TemplateError(f"過濾器「{filter_name}」的參數「{arg}」無效：{source}") from None
+
+
+def _is_filter(part):
+    name = part.partition(":")[0].strip()
+    return name in ("default", "raw") or name in FILTERS
+
+
+def _parse_field(expression, source):
+    parts = expression.split("|")
+    # 變數名稱到第一個已知的過濾器為止 (名稱本身可以含有 |)
+    first_filter = next((i for i in range(1, len(parts)) if _is_filter(parts[i])), len(parts))
+    name, filters, default, raw = "|".join(parts[:first_filter]).strip(), [], None, False
+    if not name:
+        raise TemplateError(f"變數名稱不可為空：{source}")
+    for part in parts[first_filter:]:
+        filter_name, _, arg = part.partition(":")
+        filter_name = filter_name.strip()
+        if filter_name == "default":
+            default = arg.strip()
+        elif filter_name == "raw":
+            _filter_args(filter_name, arg.strip(), source)
+            raw = True
+        elif filter_name in FILTERS:
+            filters.append((FILTERS[filter_name], _filter_args(filter_name, arg.strip(), source)))
+        else:
+            raise TemplateError(f"未知的過濾器「{filter_name}」：{source} (可用：default、raw、{'、'.join(FILTERS)})")
+    return _Field(name, tuple(filters), default, raw, source)
+
+
+class CompiledTemplate:
+    """編譯後的模板：固定文字與變數欄位交錯的片段清單。"""
+
+    def __init__(self, text):
+        self.text = text
+        parts = []
+        fields = []
+        position = 0
+        for match in _FIELD.finditer(text):
+            literal = text[position:match.start()]
+            if match.group(1):
+                # \{{...}}：跳脫，原樣輸出 (去掉反斜線)
+                literal += match.group(0)[1:]
+            else:
+                if literal:
+                    parts.append(literal)
+                literal = ""
+                fields.append((len(parts), _parse_field(match.group(2), match.group(0))))
+                parts.append(None)
+            if literal:
+                parts.append(literal)
+            position = match.end()
+        if position < len(text):
+            parts.append(text[position:])
+        self._parts = parts
+        self._fields = tuple(fields)
+        # 沒有過濾器與預設值的欄位 (最常見) 走快速路徑，不經過 _Field.render
+        self._plain = tuple(
+            (index, field.name, field.source) for index, field in fields
+            if not field.filters and field.default is None and not field.raw
+        )
+        self._complex = tuple(
+            (index, field) for index, field in fields
+            if field.filters or field.default is not None or field.raw
+        )
+        self.variables = sorted({field.name for _, field in fields})
+        # 至少出現一次沒有預設值的變數才是必填
+        self.required = sorted({field.name for _, field in fields if field.default is None})
+
+    def render(self, values, escape=None):
+        """
+        以變數值組合出文字。
+        Args:
+            values (Mapping[str, Any]): {變數名稱: 值}。
+            escape (Optional[str]): 自動跳脫變數值："html"、"markdown" 或 None (不跳脫)。
+        """
+        if escape not in ESCAPES:
+            raise TemplateError(f"不支援的跳脫方式：{escape}")
+        escape = ESCAPES[escape]
+        out = self._parts.copy()
+        if escape is None:
+            get = values.get
+            for index, name, source in self._plain:
+                value = get(name)
+                out[index] = source if value is None or value == "" else str(value)
+            for index, field in self._complex:
+                out[index] = field.render(values, None)
+        else:
+            for index, field in self._fields:
+                out[index] = field.render(values, escape)
+        return "".join(out)
+
+    def render_rows(self, rows, escape=None):
+        """對多列變數值 (例如 csv.DictReader) 逐列套用模板 (產生器)。"""
+        for values in rows:
+            yield self.render(values, escape)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text):
+    """
+    編譯模板並快取 (以模板文字為鍵；字串的雜湊值由 Python 快取，重複查詢不會重新計算)。
+    Raises:
+        TemplateError: 語法錯誤。
+    """
+    return CompiledTemplate(text)
+
+
+def read_csv_rows(file):
+    """
+    讀取變數值 CSV (第一列為變數名稱)，回傳逐列的 dict 產生器。
+    Args:
+        file: 文字模式的檔案物件，或 bytes (UTF-8，可含 BOM)。
+    """
+    if isinstance(file, bytes):
+        file = file.decode("utf-8-sig").splitlines()
+    return csv.DictReader(file)
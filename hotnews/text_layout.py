@@ -0,0 +1,133 @@
+"""
+依實際字寬換行的標題排版。
+
+舊版以字數 (CHAR_LIMIT) 換行，中英混排時會超出畫面或參差不齊。這裡以字型量測每個字元的
+前進寬度並快取，依中文排版的避頭尾規則斷行，放不下時自動縮小字級。
+"""
+import re
+import threading
+
+# 不可出現在行首的標點 (避頭)
+NO_LINE_START = set("，。、；：！？）」』】〉》〕｝’”…‥・ー～,.;:!?)]}%'\"")
+# 不可出現在行尾的標點 (避尾)
+NO_LINE_END = set("（「『【〈《〔｛‘“([{")
+
+# 英文單字、數字等連續的拉丁字元視為一個單位，不在中間斷開
+_TOKEN_RE = re.compile(r"[A-Za-z0-9À-ɏ][A-Za-z0-9À-ɏ'’\-_.@#&+/]*|\s+|.", re.S)
+
+
+class GlyphWidthCache:
+    """以 (字型檔, 字級) 為單位快取每個字元的前進寬度 (像素)。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._widths = {}
+
+    @staticmethod
+    def _font_key(font):
+        path = getattr(font, "path", None)
+        return (path, getattr(font, "size", None)) if path else ("id", id(font))
+
+    def widths_for(self, font):
+        key = self._font_key(font)
+        table = self._widths.get(key)
+        if table is None:
+            with self._lock:
+                table = self._widths.setdefault(key, {})
+        return table
+
+    def measure(self, text, font):
+        table = self.widths_for(font)
+        total = 0.0
+        for char in text:
+            width = table.get(char)
+            if width is None:
+                width = table[char] = font.getlength(char)
+            total += width
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._widths.clear()
+
+
+glyph_widths = GlyphWidthCache()
+
+
+def _split_long_token(token, font, max_width, widths):
+    """單字本身比一行還寬時，逐字切開。"""
+    pieces, current = [], ""
+    for char in token:
+        if current and widths.measure(current + char, font) > max_width:
+            pieces.append(current)
+            current = char
+        else:
+            current += char
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def wrap_text(text, font, max_width, widths=glyph_widths):
+    """
+    依像素寬度換行，保留使用者輸入的換行，並套用避頭尾規則。
+    避頭標點若放不下，允許懸掛在行尾 (略為超出)，不會單獨落到下一行行首。
+    Returns:
+        list[str]: 去除頭尾空白後的非空行。
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        current, current_width = "", 0.0
+        for token in _TOKEN_RE.findall(paragraph):
+            token_width = widths.measure(token, font)
+            if current_width + token_width <= max_width:
+                current += token
+                current_width += token_width
+                continue
+            if token.isspace():
+                # 在空白處換行，空白本身不保留
+                lines.append(current)
+                current, current_width = "", 0.0
+                continue
+            if token[0] in NO_LINE_START and current.strip():
+                # 避頭：標點懸掛在目前這一行
+                current += token
+                current_width += token_width
+                continue
+            if current.strip():
+                # 避尾：行尾的開括號移到下一行
+                carry = ""
+                while current and current[-1] in NO_LINE_END:
+                    carry = current[-1] + carry
+                    current = current[:-1]
+                lines.append(current)
+                current, current_width = carry, widths.measure(carry, font)
+            if current_width + token_width > max_width:
+                # 單字本身比一行還寬，只好逐字切開
+                pieces = _split_long_token(current + token, font, max_width, widths)
+                lines.extend(pieces[:-1])
+                current = pieces[-1]
+                current_width = widths.measure(current, font)
+            else:
+                current += token
+                current_width += token_width
+        lines.append(current)
+    return [line.strip() for line in lines if line.strip()]
+
+
+def fit_text(text, get_font, max_width, max_height, max_size, min_size, line_spacing=1.3, step=2):
+    """
+    從 max_size 開始逐步縮小字級，直到換行後的文字高度放得進 max_height。
+    縮到 min_size 仍放不下時，使用 min_size 的結果 (由呼叫端決定是否允許超出)。
+    Args:
+        get_font (Callable[[int], FreeTypeFont]): 依字級取得字型的函式。
+    Returns:
+        tuple[int, FreeTypeFont, list[str]]: (字級, 字型, 各行文字)
+    """
+    size = max_size
+    while True:
+        font = get_font(size)
+        lines = wrap_text(text, font, max_width)
+        if len(lines) * size * line_spacing <= max_height or size <= min_size:
+            return size, font, lines
+        size = max(min_size, size - step)
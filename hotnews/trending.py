@@ -0,0 +1,253 @@
+"""
+以話題升溫速度 (而非發佈時間) 排序的熱門趨勢。
+
+每篇文章的標題切成詞 (中文二字詞、英數字單字)，每個詞維護兩個指數衰減計數器：
+短窗口 (半衰期數小時) 反映「現在」的提及量，長窗口 (半衰期數天) 作為基準。
+升溫速度 = 短窗口頻率 / 長窗口頻率，只有明顯高於基準的詞才計分；同一個詞在越多來源同時出現，分數越高。
+計數器只在有新文章時更新並延遲衰減，每篇新文章的成本與歷史總量無關。
+"""
+import heapq
+import math
+import threading
+import time
+from collections import deque
+
+from hotnews.search import tokenize
+
+SHORT_HALF_LIFE = 6 * 3600        # 短窗口半衰期 (秒)
+LONG_HALF_LIFE = 3 * 86400        # 長窗口 (基準) 半衰期
+SOURCE_WINDOW = 12 * 3600         # 多少時間內在不同來源出現算是跨來源共同報導
+ARTICLE_WINDOW = 48 * 3600        # 熱門清單只考慮這段時間內的文章
+MIN_MENTIONS = 2.0                # 短窗口提及量低於此值的詞不計分
+MIN_VELOCITY = 2.0                # 升溫速度 (短窗口 / 長窗口頻率) 低於此值的詞不計分
+BASELINE_PRIOR = 0.5 / 86400      # 長窗口頻率的先驗值，避免全新詞的分數無限大
+SOURCE_BONUS = 0.5                # 每多一個來源，分數乘上 (1 + SOURCE_BONUS)
+PRUNE_EVERY = 5000                # 每新增多少篇文章清理一次衰減到接近 0 的詞
+PRUNE_BELOW = 0.05
+HOT_TERM_CANDIDATES = 50          # 熱門文章的候選來源：前幾個熱門詞
+
+
+def _decayed(value, last, now, half_life):
+    return value * 0.5 ** ((now - last) / half_life) if now > last else value
+
+
+class DecayedCounter:
+    """指數衰減計數器：只記錄數值與最後更新時間，讀取時才依經過時間衰減。"""
+
+    __slots__ = ("value", "last")
+
+    def __init__(self):
+        self.value = 0.0
+        self.last = None
+
+    def add(self, timestamp, half_life, amount=1.0):
+        if self.last is None:
+            self.value, self.last = amount, timestamp
+        elif timestamp >= self.last:
+            self.value = _decayed(self.value, self.last, timestamp, half_life) + amount
+            self.last = timestamp
+        else:
+            # 晚到的舊文章：以它與最後更新時間的差距折算
+            self.value += amount * 0.5 ** ((self.last - timestamp) / half_life)
+
+    def at(self, now, half_life):
+        return _decayed(self.value, self.last, now, half_life) if self.last is not None else 0.0
+
+
+class _TermStats:
+    __slots__ = ("short", "long", "sources", "postings")
+
+    def __init__(self):
+        self.short = DecayedCounter()
+        self.long = DecayedCounter()
+        self.sources = {}           # 來源 -> 最後出現時間
+        self.postings = deque()     # 窗口內含有這個詞的文章
+
+
+def title_terms(title):
+    """標題中用來計算趨勢的詞 (去除重複)。"""
+    return set(tokenize(title))
+
+
+class TrendTracker:
+    """
+    增量式的熱門趨勢計算。add() 的成本只與該篇標題的詞數有關。
+
+    沒有新提及時，詞的分數只會隨時間下降 (短窗口衰減得比長窗口快)，
+    因此每次更新時算出的分數就是之後分數的上限。查詢時依上限由高到低重新計分，
+    一旦上限低於目前第 k 名的實際分數即可停止，不必掃描所有詞。
+    """
+
+    def __init__(self, short_half_life=SHORT_HALF_LIFE, long_half_life=LONG_HALF_LIFE,
+                 source_window=SOURCE_WINDOW, article_window=ARTICLE_WINDOW):
+        self.short_half_life = short_half_life
+        self.long_half_life = long_half_life
+        self.source_window = source_window
+        self.article_window = article_window
+        self._lock = threading.Lock()
+        self._terms = {}
+        self._bounds = {}           # 詞 -> 分數上限 (只記錄可能大於 0 的詞)
+        self._recent = deque()      # (時間, 文章 dict)，依加入順序
+        self._seen = set()
+        self._latest = None
+        self._since_prune = 0
+
+    def add(self, key, site, title, link, timestamp, cluster=None):
+        """加入一篇文章；同一來源的同一 key 重複加入會被忽略 (其他來源轉載的同一篇仍會計入)。"""
+        with self._lock:
+            if (site, key) in self._seen:
+                return
+            self._seen.add((site, key))
+            terms = title_terms(title)
+            article = {
+                "key": key, "site": site, "title": title, "link": link,
+                "timestamp": timestamp, "cluster": cluster or key, "terms": terms,
+            }
+            for term in terms:
+                stats = self._terms.get(term)
+                if stats is None:
+                    stats = self._terms[term] = _TermStats()
+                stats.short.add(timestamp, self.short_half_life)
+                stats.long.add(timestamp, self.long_half_life)
+                if timestamp > stats.sources.get(site, float("-inf")):
+                    stats.sources[site] = timestamp
+                stats.postings.append(article)
+                bound = self._term_score(stats, max(timestamp, stats.short.last))[0]
+                if bound > 0:
+                    self._bounds[term] = bound
+            self._recent.append((timestamp, article))
+            if self._latest is None or timestamp > self._latest:
+                self._latest = timestamp
+            self._expire(self._latest)
+            self._since_prune += 1
+            if self._since_prune >= PRUNE_EVERY:
+                self._prune(self._latest)
+
+    def _expire(self, now):
+        cutoff = now - self.article_window
+        while self._recent and self._recent[0][0] < cutoff:
+            _, article = self._recent.popleft()
+            self._seen.discard((article["site"], article["key"]))
+
+    def _prune(self, now):
+        """移除已衰減到接近 0 的詞、分數已歸零的上限，以及超出窗口的文章參照。"""
+        self._since_prune = 0
+        cutoff = now - self.article_window
+        for term in list(self._terms):
+            stats = self._terms[term]
+            if stats.long.at(now, self.long_half_life) < PRUNE_BELOW:
+                del self._terms[term]
+                self._bounds.pop(term, None)
+                continue
+            _trim(stats.postings, cutoff)
+            if term in self._bounds and self._term_score(stats, now)[0] == 0:
+                del self._bounds[term]
+
+    def _term_score(self, stats, now):
+        short = stats.short.at(now, self.short_half_life)
+        if short < MIN_MENTIONS:
+            return 0.0, 0
+        # 以「每秒頻率」比較兩個窗口；穩定出現的詞約為 1，突然爆量的詞遠大於 1
+        short_rate = short / self.short_half_life
+        long_rate = stats.long.at(now, self.long_half_life) / self.long_half_life
+        velocity = short_rate / (long_rate + BASELINE_PRIOR)
+        if velocity < MIN_VELOCITY:
+            return 0.0, 0
+        cutoff = now - self.source_window
+        sources = sum(1 for seen in stats.sources.values() if seen >= cutoff)
+        # 只計算高於基準的部分，長期大量出現的詞 (品牌名、常用字) 不會因為量大而上榜
+        return (velocity - 1) * math.log1p(short) * (1 + SOURCE_BONUS) ** max(0, sources - 1), sources
+
+    def _top_terms(self, k, now):
+        """依分數上限由高到低重新計分，回傳前 k 個 (分數, 詞, 來源數)。"""
+        top = []
+        for term, bound in sorted(self._bounds.items(), key=lambda item: item[1], reverse=True):
+            if len(top) == k and bound <= top[0][0]:
+                break
+            score, sources = self._term_score(self._terms[term], now)
+            if score > 0:
+                # 目前的分數即為之後的新上限
+                self._bounds[term] = score
+                if len(top) < k:
+                    heapq.heappush(top, (score, term, sources))
+                else:
+                    heapq.heappushpop(top, (score, term, sources))
+            else:
+                del self._bounds[term]
+        return sorted(top, reverse=True)
+
+    def hot_terms(self, n=20, now=None):
+        """
+        目前升溫最快的詞。
+        Returns:
+            list[dict]: {"term", "score", "sources"}，分數由高到低。
+        """
+        with self._lock:
+            now = time.time() if now is None else now
+            top = self._top_terms(n, now)
+        return [{"term": term, "score": score, "sources": sources} for score, term, sources in top]
+
+    def hot_articles(self, n=10, now=None):
+        """
+        依文章標題中最熱的兩個詞計分，同一群組 (轉載或近似標題) 只保留一篇並合併來源，
+        同一話題只列一篇。候選文章為含有前 HOT_TERM_CANDIDATES 個熱門詞的窗口內文章。
+        Returns:
+            list[dict]: {"title", "link", "site", "sources", "score", "terms", "timestamp"}，分數由高到低。
+        """
+        with self._lock:
+            now = time.time() if now is None else now
+            cutoff = now - self.article_window
+            term_scores = {}
+            candidates = {}
+            for score, term, _ in self._top_terms(max(HOT_TERM_CANDIDATES, n * 5), now):
+                term_scores[term] = score
+                postings = self._terms[term].postings
+                _trim(postings, cutoff)
+                for article in postings:
+                    if article["timestamp"] >= cutoff:
+                        candidates[article["site"], article["key"]] = article
+
+            clusters = {}
+            for article in sorted(candidates.values(), key=lambda a: a["timestamp"]):
+                scores = []
+                for term in article["terms"]:
+                    if term not in term_scores:
+                        stats = self._terms.get(term)
+                        term_scores[term] = self._term_score(stats, now)[0] if stats else 0.0
+                    if term_scores[term] > 0:
+                        scores.append((term_scores[term], term))
+                if not scores:
+                    continue
+                best = heapq.nlargest(2, scores)
+                score = sum(s for s, _ in best)
+                group = clusters.get(article["cluster"])
+                if group is None:
+                    clusters[article["cluster"]] = {
+                        "title": article["title"], "link": article["link"], "site": article["site"],
+                        "sources": [article["site"]], "score": score, "terms": [t for _, t in best],
+                        "timestamp": article["timestamp"],
+                    }
+                    continue
+                if article["site"] not in group["sources"]:
+                    group["sources"].append(article["site"])
+                if score > group["score"]:
+                    group.update(title=article["title"], link=article["link"], site=article["site"],
+                                 score=score, terms=[t for _, t in best], timestamp=article["timestamp"])
+        # 同一個話題 (最熱的詞相同) 只列分數最高的一篇，讓清單涵蓋不同話題
+        hot, covered = [], set()
+        for group in sorted(clusters.values(), key=lambda a: (a["score"], a["timestamp"]), reverse=True):
+            if group["terms"][0] in covered:
+                continue
+            covered.update(group["terms"])
+            hot.append(group)
+            if len(hot) == n:
+                break
+        return hot
+
+    def __len__(self):
+        return len(self._terms)
+
+
+def _trim(postings, cutoff):
+    while postings and postings[0]["timestamp"] < cutoff:
+        postings.popleft()
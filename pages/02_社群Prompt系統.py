@@ -1,107 +1,90 @@
+import csv
 import streamlit as st
-import re
-import json
+from datetime import datetime
 
 # --- 1. 定義常數與預設數據 ---
 
-# 預設的風格清單及其描述 (S1.1, S1.2)
-STYLE_CONFIG = {
-    "專業正式 (Professional)": {
-        "description": "嚴謹、數據導向，適合商業報告、正式公告。",
-        "prompt_prefix": "請以專業且正式的語氣，基於以下內容生成社群貼文。確保語法嚴謹，並在結尾加上相關數據或結論。",
-    },
-    "幽默活潑 (Casual & Lively)": {
-        "description": "用語輕鬆、貼近年輕人，適合互動、娛樂內容。",
-        "prompt_prefix": "請以幽默、活潑且具吸引力的語氣，改寫以下內容。多使用表情符號和網路流行語。",
-    },
-    "緊急促銷 (Urgent Promo)": {
-        "description": "強調時效性、稀缺性，促使使用者立即行動 (CTA)。",
-        "prompt_prefix": "請以緊急促銷的語氣生成貼文。必須包含強烈的行動呼籲 (CTA) 和截止日期。",
-    },
-    "教育分享 (Educational)": {
-        "description": "清晰、步驟化、知識性，適合教學或深度解說。",
-        "prompt_prefix": "請將以下內容整理為步驟清晰、易於理解的教育分享貼文。每個重點請使用條列式呈現。",
-    },
-}
-
-# 預設模板 (T2.1, T2.2)
-DEFAULT_TEMPLATES = {
-    "活動宣傳基礎模板": """
-🎉 重磅消息！我們的 [活動名稱] 活動即將開始！
-日期：{{日期}}
-地點：{{地點}}
-主題：{{主題}}
-
-詳細內容：
-{{核心內容}}
-
-趕快點擊 {{報名連結}} 了解更多資訊並報名參加吧！
-#{{Hashtag1}} #{{Hashtag2}}
-""",
-    "產品發表模板": """
-✨ 全新登場！隆重介紹我們的 {{產品名稱}}！
-這款產品擁有以下突破性特色：
-1. {{特色一}}
-2. {{特色二}}
-
-{{核心內容}}
-
-立即體驗，享受 {{限時優惠}}！
-👉 購買連結：{{購買連結}}
-""",
-}
-
-# --- 2. Session State 初始化 (T2.1, T2.3) ---
+# 風格設定、預設模板與 Prompt 組合邏輯位於 hotnews/prompts.py
+from hotnews.prompts import (
+    CORE_CONTENT_COLUMN, STYLE_CONFIG,
+    extract_variables, generate_prompt, generate_prompts, required_variables,
+)
+from hotnews.template_store import NAME_LIST_LIMIT, TemplateConflict, get_template_store
+from hotnews.templates import FILTERS, TemplateError, read_csv_rows
+
+BATCH_PREVIEW_ROWS = 3   # 批次產生後預覽的筆數
+
+# --- 2. 模板庫與 Session State (T2.1, T2.3) ---
+
+# 模板存放在團隊共用的模板庫 (hotnews/template_store.py)，session_state 只記錄目前編輯的模板與版本
+ALL_TAGS = "全部"
+
 
 def initialize_session_state():
     """初始化 Streamlit Session State，確保狀態持久化。"""
-    if 'custom_templates' not in st.session_state:
-        # 將預設模板載入到 Session State
-        st.session_state.custom_templates = DEFAULT_TEMPLATES
-
     if 'selected_template_name' not in st.session_state:
-        st.session_state.selected_template_name = list(DEFAULT_TEMPLATES.keys())[0]
-
-# --- 3. 核心邏輯函式 ---
-
-def extract_variables(template_text):
-    """
-    從模板文字中提取所有 {{...}} 變數 (A3.2, T2.4)。
-    使用正則表達式尋找所有符合 {{變數名}} 格式的內容。
-    """
-    # 尋找所有被 {{ 和 }} 包裹的內容
-    variables = re.findall(r"\{\{([^}]+)\}\}", template_text)
-    # 移除重複的變數名並去除空白
-    return sorted(list(set(v.strip() for v in variables)))
-
-def generate_prompt(style_key, template_text, core_content, variable_values):
-    """
-    結合風格、模板、核心內容和變數，生成最終 Prompt (A3.3)。
-    """
-    # 1. 取得風格前綴 (指令)
-    style_prefix = STYLE_CONFIG.get(style_key, {}).get("prompt_prefix", "")
-
-    # 2. 替換模板中的變數
-    processed_template = template_text
-    for var, value in variable_values.items():
-        placeholder = f"{{{{{var}}}}}"
-        # 使用使用者輸入的值替換模板中的變數
-        processed_template = processed_template.replace(placeholder, value)
-
-    # 3. 組合最終 Prompt
-    final_prompt = f"""
---- Prompt 指令 ---
-{style_prefix}
-
---- 核心內容 ---
-{core_content}
-
---- 套用模板後的貼文草稿 ---
-{processed_template}
-"""
-    return final_prompt
-
-# --- 4. 頁面 UI 佈局與事件處理 ---
+        names = get_template_store().names(limit=1)
+        st.session_state.selected_template_name = names[0] if names else ""
+    st.session_state.setdefault('loaded_template_name', None)
+    st.session_state.setdefault('editing_version', 0)
+    st.session_state.setdefault('template_message', None)
+
+
+def load_template_into_editor(name):
+    """把模板目前版本載入編輯區 (需在編輯區元件建立前呼叫)。"""
+    record = get_template_store().get(name)
+    st.session_state.template_editor = record.body if record else ""
+    st.session_state.template_tags = "、".join(record.tags) if record else ""
+    st.session_state.new_template_name = name
+    st.session_state.editing_version = record.version if record else 0
+    st.session_state.loaded_template_name = name
+
+
+def save_template():
+    store = get_template_store()
+    name = st.session_state.new_template_name.strip()
+    if not name:
+        st.session_state.template_message = ("error", "請輸入模板名稱！")
+        return
+    # 覆寫目前編輯的模板時檢查版本；另存新名稱時要求該名稱尚未存在
+    expected = st.session_state.editing_version if name == st.session_state.loaded_template_name else 0
+    try:
+        version = store.save(name, st.session_state.template_editor,
+                             st.session_state.template_tags.replace("、", ","), expected_version=expected)
+    except TemplateConflict as exc:
+        st.session_state.template_message = ("error", f"{exc}，請重新載入後再儲存。")
+        return
+    st.session_state.selected_template_name = name
+    load_template_into_editor(name)
+    st.session_state.template_message = ("success", f"模板已儲存為：『{name}』(第 {version} 版)")
+
+
+def delete_template():
+    store = get_template_store()
+    name = st.session_state.loaded_template_name
+    try:
+        store.delete(name, expected_version=st.session_state.editing_version)
+    except TemplateConflict as exc:
+        st.session_state.template_message = ("error", str(exc))
+        return
+    # 刪除後，選擇列表中的第一個模板作為新的預設值
+    names = store.names(limit=1)
+    st.session_state.selected_template_name = names[0] if names else ""
+    st.session_state.template_message = ("warning", f"已刪除模板：『{name}』")
+
+
+def restore_template(version):
+    store = get_template_store()
+    name = st.session_state.loaded_template_name
+    try:
+        new_version = store.restore(name, version, expected_version=st.session_state.editing_version)
+    except TemplateConflict as exc:
+        st.session_state.template_message = ("error", str(exc))
+        return
+    load_template_into_editor(name)
+    st.session_state.template_message = ("success", f"已將第 {version} 版還原為第 {new_version} 版")
+
+# --- 3. 頁面 UI 佈局與事件處理 ---
 
 def prompt_system_page():
     """Streamlit 頁面的主函式，包含 UI 和邏輯。"""
@@ -110,6 +93,7 @@ def prompt_system_page():
     st.title("🤖 社群專用 Prompt 系統")
     st.markdown("---")
 
+    store = get_template_store()
     initialize_session_state()
     
     # 初始化一個字典來存儲動態變數的值
@@ -130,63 +114,85 @@ def prompt_system_page():
         st.markdown("---")
         st.header("📝 模板管理 (T2.1, T2.3)")
         
-        # 模板選擇器
-        template_names = list(st.session_state.custom_templates.keys())
-        # 使用 try-except 處理當模板剛被刪除，selected_template_name 尚未更新時可能出現的 KeyError
-        try:
-            default_index = template_names.index(st.session_state.selected_template_name)
-        except ValueError:
-             default_index = 0
+        # 模板很多時以標籤與名稱開頭縮小範圍 (皆為索引查詢，結果在程序內快取)
+        col_tag, col_prefix = st.columns(2)
+        with col_tag:
+            tag_filter = st.selectbox("標籤：", [ALL_TAGS] + store.tags(), key="template_tag_filter")
+        with col_prefix:
+            prefix = st.text_input("名稱開頭：", key="template_prefix")
+        template_names = store.names(prefix=prefix.strip(), tag=None if tag_filter == ALL_TAGS else tag_filter)
 
-        st.session_state.selected_template_name = st.selectbox(
+        # 篩選結果仍包含編輯中的模板時維持選取，不會因為改變篩選條件而重新載入編輯區
+        if template_names and st.session_state.selected_template_name not in template_names:
+            loaded = st.session_state.loaded_template_name
+            st.session_state.selected_template_name = loaded if loaded in template_names else template_names[0]
+        st.selectbox(
             "載入已儲存模板：",
             template_names,
-            index=default_index, # 確保預設選中正確的值
-            key='template_loader'
+            key='selected_template_name'
         )
+        if len(template_names) >= NAME_LIST_LIMIT:
+            st.caption(f"只列出前 {NAME_LIST_LIMIT} 個模板，請以標籤或名稱開頭縮小範圍。")
+        if template_names:
+            selected_name = st.session_state.selected_template_name or ""
+        else:
+            # 沒有符合篩選條件的模板：保留編輯區目前的內容
+            st.caption("沒有符合篩選條件的模板。")
+            selected_name = st.session_state.loaded_template_name or ""
+
+        # 切換模板時才重新載入編輯區，不會覆蓋編輯中的內容
+        if selected_name != st.session_state.loaded_template_name:
+            load_template_into_editor(selected_name)
         
         # 取得當前選中的模板內容
-        current_template = st.session_state.custom_templates.get(
-            st.session_state.selected_template_name, 
-            ""
-        )
+        record = store.get(selected_name) if selected_name else None
+        current_template = record.body if record else ""
         
         # 模板編輯區 (T2.2)
         st.markdown("##### 編輯/新增模板內容")
         edited_template = st.text_area(
             "請使用 {{變數名}} 定義可替換的欄位：",
-            value=current_template,
             height=200,
             key="template_editor"
         )
         
         # 儲存模板按鈕 (T2.3)
         st.markdown("---")
-        template_name_input = st.text_input(
+        st.text_input(
             "儲存為新模板名稱：", 
-            value=st.session_state.selected_template_name,
             key='new_template_name'
         )
+        st.text_input("標籤 (以、或逗號分隔)：", key="template_tags")
         
         col_save, col_delete = st.columns(2)
         with col_save:
-            if st.button("💾 儲存/更新模板"):
-                if template_name_input:
-                    st.session_state.custom_templates[template_name_input] = edited_template
-                    st.session_state.selected_template_name = template_name_input
-                    st.success(f"模板已儲存為：『{template_name_input}』")
-                    st.rerun() # 重新載入，更新模板選單
-                else:
-                    st.error("請輸入模板名稱！")
+            st.button("💾 儲存/更新模板", on_click=save_template)
         
         with col_delete:
             # 只有當模板數量大於 1 時才允許刪除 (保留至少一個模板)
-            if len(template_names) > 1 and st.button("🗑️ 刪除模板"):
-                del st.session_state.custom_templates[st.session_state.selected_template_name]
-                # 刪除後，選擇列表中的第一個模板作為新的預設值
-                st.session_state.selected_template_name = list(st.session_state.custom_templates.keys())[0]
-                st.warning(f"已刪除模板：『{st.session_state.selected_template_name}』")
-                st.rerun()
+            if record and store.count() > 1:
+                st.button("🗑️ 刪除模板", on_click=delete_template)
+
+        message = st.session_state.template_message
+        if message:
+            getattr(st, message[0])(message[1])
+            st.session_state.template_message = None
+            if message[0] == "error" and record:
+                # 版本衝突：放棄編輯中的內容，改載入別人剛儲存的版本
+                st.button("🔄 載入最新版本", on_click=load_template_into_editor, args=(record.name,))
+
+        if record:
+            with st.expander(f"🕘 版本紀錄 (目前第 {record.version} 版)"):
+                versions = store.versions(record.name)
+                version = st.selectbox(
+                    "版本：",
+                    [v for v, _ in versions],
+                    format_func=lambda v: f"第 {v} 版 — {datetime.fromtimestamp(dict(versions)[v]):%Y-%m-%d %H:%M}",
+                    key="template_version_select"
+                )
+                st.code(store.get(record.name, version).body, language=None)
+                if version != record.version:
+                    st.button("↩️ 還原此版本", on_click=restore_template, args=(version,))
 
 
     # --- 主內容區佈局 (使用兩欄) ---
@@ -208,39 +214,53 @@ def prompt_system_page():
         st.subheader("動態變數填充")
         
         # 取得編輯器中或已選模板中的變數
-        template_to_parse = st.session_state.custom_templates.get(st.session_state.selected_template_name, edited_template)
+        template_to_parse = current_template if record else edited_template
         
-        required_variables = extract_variables(template_to_parse)
+        # 模板只在內容改變時重新編譯，其餘重新執行直接使用快取
+        try:
+            all_variables = extract_variables(template_to_parse)
+            needed_variables = required_variables(template_to_parse)
+        except TemplateError as exc:
+            st.error(f"模板語法錯誤：{exc}")
+            return
 
-        if required_variables:
-            st.markdown("請填寫模板中的所有變數：")
+        if all_variables:
+            st.markdown("請填寫模板中的變數 (有預設值的變數可留白)：")
             
             # 動態生成變數輸入框
-            for var in required_variables:
+            for var in all_variables:
                 # 每個變數對應一個 text_input
                 value = st.text_input(
-                    f"**{var}**:", 
+                    f"**{var}**:" if var in needed_variables else f"{var} (選填):",
                     key=f"var_input_{var}",
                     placeholder=f"請輸入 {var} 的值"
                 )
                 variable_values[var] = value
         else:
             st.info("此模板中未偵測到任何變數 (e.g. {{日期}})。")
+        st.caption(
+            "語法：`{{變數 | default:預設值}}`、過濾器 `" + "`、`".join(FILTERS) + "`，"
+            "`\\{{...}}` 原樣輸出。"
+        )
             
     with col2:
         st.header("3️⃣ 最終 Prompt 生成")
         
         # 處理模板變數替換
-        all_variables_filled = all(variable_values.values()) or not required_variables
+        all_variables_filled = all(variable_values[var] for var in needed_variables)
         
         if core_content and all_variables_filled:
             # 生成最終 Prompt
-            final_prompt = generate_prompt(
-                selected_style, 
-                template_to_parse, 
-                core_content, 
-                variable_values
-            )
+            try:
+                final_prompt = generate_prompt(
+                    selected_style, 
+                    template_to_parse, 
+                    core_content, 
+                    variable_values
+                )
+            except TemplateError as exc:
+                st.error(f"Prompt 產生失敗：{exc}")
+                return
             
             st.success("✅ Prompt 已生成！")
             
@@ -258,6 +278,35 @@ def prompt_system_page():
         else:
             st.warning("請在左側填寫核心內容和所有動態變數後，才能生成 Prompt。")
 
+        # 批次產生：同一個模板套用到 CSV 的每一列
+        with st.expander("📚 批次產生 (CSV)"):
+            st.caption(
+                f"第一列為變數名稱 ({'、'.join(all_variables) or '無'})；"
+                f"可加上「{CORE_CONTENT_COLUMN}」欄位逐列覆寫核心內容。"
+            )
+            csv_file = st.file_uploader("上傳變數 CSV", type=["csv"], key="batch_csv")
+            if csv_file is not None:
+                try:
+                    rows = list(read_csv_rows(csv_file.getvalue()))
+                    prompts = list(generate_prompts(selected_style, template_to_parse, rows, core_content))
+                except UnicodeDecodeError:
+                    st.error("CSV 無法以 UTF-8 讀取，請另存為「CSV UTF-8」格式後重新上傳 (Excel 預設的 Big5 編碼不支援)。")
+                    return
+                except (TemplateError, csv.Error) as exc:
+                    st.error(f"批次產生失敗：{exc}")
+                    return
+                st.success(f"✅ 已產生 {len(prompts)} 則 Prompt")
+                for prompt in prompts[:BATCH_PREVIEW_ROWS]:
+                    st.code(prompt, language='markdown')
+                separator = "\n" + "=" * 40 + "\n"
+                st.download_button(
+                    "⬇️ 下載全部 Prompt (.txt)",
+                    data=separator.join(prompts),
+                    file_name="prompts.txt",
+                    mime="text/plain",
+                    on_click="ignore"
+                )
+
 
 # 確保此檔案作為 Streamlit 頁面執行
 if __name__ == "__main__":
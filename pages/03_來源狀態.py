@@ -0,0 +1,48 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from hotnews.sources import SOURCES_PATH, get_source_registry
+
+# 來源設定位於 hotnews/sources.json，熔斷器與健康紀錄位於 hotnews/sources.py
+
+STATE_LABELS = {"closed": "🟢 正常", "half_open": "🟡 試探中", "open": "🔴 熔斷"}
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%m-%d %H:%M:%S") if timestamp else ""
+
+
+def format_ms(seconds):
+    return round(seconds * 1000) if seconds is not None else None
+
+# ================= Streamlit UI =================
+
+st.title("🩺 來源狀態")
+st.caption(f"設定檔：{SOURCES_PATH}。統計為本程序最近的抓取紀錄，重新啟動後歸零。")
+
+
+@st.fragment(run_every=30)
+def source_status():
+    rows = get_source_registry().status()
+    st.dataframe(pd.DataFrame([
+        {
+            "來源": row["name"],
+            "格式": row["type"],
+            "狀態": STATE_LABELS[row["state"]] + (f" ({row['retry_in']:.0f} 秒後重試)" if row["state"] == "open" else ""),
+            "請求數": row["requests"],
+            "錯誤率": f"{row['error_rate']:.0%}" if row["error_rate"] is not None else "",
+            "p50 (ms)": format_ms(row["p50"]),
+            "p95 (ms)": format_ms(row["p95"]),
+            "上次成功": format_time(row["last_success"]),
+            "熔斷略過": row["skipped"],
+            "最後錯誤": row["last_error"] or "",
+            "錯誤時間": format_time(row["last_error_at"]),
+        }
+        for row in rows
+    ]), hide_index=True)
+    if not any(row["requests"] for row in rows):
+        st.info("尚未抓取任何來源，請先到主頁面產生報表 (背景輪詢啟動後會自動更新)。")
+
+
+source_status()
@@ -1,5 +1,11 @@
 import streamlit as st
-import streamlit.components.v1 as components
+
+from hotnews.canvas import render_canvas, render_canvas_bytes
+from hotnews.card_templates import get_card_registry
+from hotnews.encoding import FORMATS, available_formats
+
+# 800x450 橫幅的版面定義在 hotnews/card_templates.json
+BANNER_SPEC = get_card_registry().spec("news_banner")
 
 # 確保基礎變數存在，避免後續 NameError
 if 'article_title' not in st.session_state:
@@ -9,60 +15,28 @@ st.title("✨ 高級圖卡產生器 (Canvas 版)")
 
 # 提供輸入介面
 user_input = st.text_input("編輯標題內容：", value=st.session_state['article_title'])
+background_file = st.file_uploader("背景圖片 (選填，預設使用內建背景)：", type=["png", "jpg", "jpeg", "webp"])
 
-def render_canvas_generator(title):
-    # 轉義特殊字元，避免 JS 崩潰
-    clean_title = title.replace('\n', ' ').replace('"', '\\"').replace("'", "\\'")
-    
-    canvas_html = f"""
-    <div style="display: flex; flex-direction: column; align-items: center; background-color: #f8f9fa; padding: 20px; border-radius: 15px;">
-        <canvas id="newsCanvas" width="800" height="450" style="border:1px solid #d3d3d3; border-radius: 10px; max-width: 100%; box-shadow: 0 8px 16px rgba(0,0,0,0.1);"></canvas>
-        <p style="color: #888; font-size: 13px; margin-top: 15px;">💡 提示：按右鍵可直接「另存圖片」</p>
-    </div>
-
-    <script>
-        const canvas = document.getElementById('newsCanvas');
-        const ctx = canvas.getContext('2d');
-        const img = new Image();
-        
-        // 1. 設置背景圖片
-        img.crossOrigin = "anonymous"; 
-        img.src = 'https://images.unsplash.com/photo-1504711434969-e33886168f5c?auto=format&fit=crop&q=80&w=800'; 
-        
-        img.onload = () => {{
-            // 繪製背景
-            ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
-
-            // 2. 繪製底部半透明遮罩 (0.5 透明度黑色)
-            ctx.fillStyle = 'rgba(0, 0, 0, 0.5)';
-            ctx.fillRect(0, 0, canvas.width, 350);
-
-            // 3. 設定文字樣式
-            ctx.textAlign = 'center';
-            
-            // 主標題顏色與字型
-            ctx.fillStyle = 'white';
-            ctx.font = 'bold 65px "Noto Sans TC", "Microsoft JhengHei", sans-serif';
-            
-            const titleText = "{clean_title}";
-            
-            // 自動斷行處理 (以 12 個字為基準斷行，因字體變大)
-            if (titleText.length > 12) {{
-                ctx.fillText(titleText.substring(0, 12), canvas.width / 2, 120);
-                ctx.fillText(titleText.substring(12, 24), canvas.width / 2, 210);
-            }} else {{
-                ctx.fillText(titleText, canvas.width / 2, 160);
-            }}
-
-            // 4. 副標題 (黃色)
-            ctx.fillStyle = '#FFD700';
-            ctx.font = '500 45px "Noto Sans TC", "Microsoft JhengHei", sans-serif';
-            ctx.fillText('今日熱點新聞追蹤報告', canvas.width / 2, 310);
-        }};
-    </script>
+def render_canvas_generator(title, image_bytes=None):
+    """
+    在伺服器端依版面規格 (card_templates.json 的 news_banner) 繪製圖卡並提供下載。
+    標題與背景圖都沒變時，圖片與編碼結果直接取自快取；編碼只在按下下載時進行。
     """
-    components.html(canvas_html, height=550)
+    values = {"title": title}
+    st.image(render_canvas(BANNER_SPEC, values, image_bytes), width="stretch")
+
+    formats = available_formats()
+    for column, fmt in zip(st.columns(len(formats)), formats):
+        spec = FORMATS[fmt]
+        with column:
+            st.download_button(
+                f"⬇️ {spec.label}",
+                data=lambda fmt=fmt: render_canvas_bytes(BANNER_SPEC, values, image_bytes, fmt).data,
+                file_name=f"news_banner.{spec.extension}",
+                mime=spec.mime,
+                on_click="ignore"
+            )
 
 # 執行渲染
 if user_input:
-    render_canvas_generator(user_input)
+    render_canvas_generator(user_input, background_file.getvalue() if background_file else None)
@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+# 快取、文章庫等資料檔寫到暫存目錄，不影響工作目錄下的 .hotnews (必須在匯入 hotnews 之前設定)
+os.environ.setdefault("HOTNEWS_DATA_DIR", tempfile.mkdtemp(prefix="hotnews-tests-"))
+
+import pytest  # noqa: E402
+
+from benchmarks.fixtures import serve_fixtures  # noqa: E402
+
+
+@pytest.fixture
+def fixture_server():
+    """啟動 benchmarks.fixtures.serve_fixtures 的本機伺服器；回傳 start(routes) -> (網址前綴, 請求次數)。"""
+    servers = []
+
+    def start(routes):
+        server, base, hits = serve_fixtures(routes)
+        servers.append(server)
+        return base, hits
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,22 @@
+"""批次渲染 (hotnews/batch.py)：以 forkserver / spawn 啟動的行程池產生卡片。"""
+import multiprocessing
+
+from hotnews import batch
+from hotnews.batch import card_filename, render_cards_dir
+
+
+def test_pool_does_not_fork(tmp_path, monkeypatch):
+    contexts = []
+    get_context = multiprocessing.get_context
+
+    def recording_get_context(method=None):
+        contexts.append(method)
+        return get_context(method)
+
+    monkeypatch.setattr(batch.multiprocessing, "get_context", recording_get_context)
+    stats = render_cards_dir(["夏季防曬全攻略"], str(tmp_path), ratios=("1:1",), max_workers=1)
+
+    assert contexts == [batch.START_METHOD] and batch.START_METHOD != "fork"
+    assert stats["images"] == 1
+    path = tmp_path / card_filename(0, "夏季防曬全攻略", "1:1")
+    assert path.read_bytes().startswith(b"\x89PNG")
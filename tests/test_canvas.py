@@ -0,0 +1,35 @@
+"""卡片圖層 (hotnews/canvas.py)：文字代入與換行。"""
+from hotnews.canvas import _paint_text, _paint_textbox
+from hotnews.render import card_plan
+
+
+class RecordingDraw:
+    """只記錄 draw.text 畫出的文字。"""
+
+    def __init__(self):
+        self.lines = []
+
+    def text(self, xy, text, **options):
+        self.lines.append(text)
+
+
+def textbox_layer():
+    return next(layer for layer in card_plan("1:1").spec["layers"] if layer["type"] == "textbox")
+
+
+def test_textbox_keeps_manual_line_breaks():
+    draw = RecordingDraw()
+    _paint_textbox(draw, textbox_layer(), {"title": "秋冬保濕\n三步驟"})
+    assert draw.lines == ["秋冬保濕", "三步驟"]
+
+
+def test_fixed_line_text_layer_collapses_line_breaks():
+    layer = {"type": "text", "text": "{title}", "x": 100, "baselines": [[50]], "font": {"size": 20}}
+    draw = RecordingDraw()
+    _paint_text(draw, layer, {"title": "今日\n熱點"})
+    assert draw.lines == ["今日 熱點"]
+
+
+def test_rendered_card_differs_with_line_break():
+    plan = card_plan("1:1")
+    assert plan.render({"title": "秋冬保濕\n三步驟"}).tobytes() != plan.render({"title": "秋冬保濕 三步驟"}).tobytes()
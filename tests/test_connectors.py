@@ -0,0 +1,167 @@
+"""各來源格式的 connector (hotnews/connectors.py)：透過本機 fixture 伺服器以 fetch_feed 實際抓取與解析。"""
+import time
+
+import pytest
+
+from benchmarks.fixtures import make_json_feed, make_rss, make_sitemap
+from hotnews.connectors import get_connector
+from hotnews.feeds import fetch_feed
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>atom</title>
+  {entries}
+</feed>"""
+
+ATOM_ENTRY = """<entry>
+    <title>Atom 文章 {i}</title>
+    <link rel="alternate" href="https://example.com/atom/{i}"/>
+    <link rel="enclosure" href="https://example.com/atom/{i}.jpg"/>
+    <id>tag:example.com,2026:{i}</id>
+    <published>2026-06-0{day}T08:00:00+08:00</published>
+    <updated>2026-06-0{day}T09:00:00Z</updated>
+    <summary>摘要 {i}</summary>
+  </entry>"""
+
+
+def make_atom(n_items):
+    entries = "".join(ATOM_ENTRY.format(i=i, day=9 - i % 9) for i in range(n_items))
+    return ATOM.format(entries=entries).encode("utf-8")
+
+
+def fetch(fixture_server, body, connector, limit=5, parser="stream", **route):
+    base, hits = fixture_server({"/feed": {"body": body, **route}})
+    return fetch_feed("site", f"{base}/feed", timeout=5, limit=limit, parser=parser, connector=connector)
+
+
+def test_unknown_connector_is_rejected():
+    with pytest.raises(ValueError, match="不支援的來源類型"):
+        get_connector("gopher")
+
+
+# ================= RSS / Atom =================
+
+
+@pytest.mark.parametrize("parser", ["stream", "feedparser"])
+def test_rss_returns_first_items_in_document_order(fixture_server, parser):
+    result = fetch(fixture_server, make_rss(n_items=20, body_chars=100, tag="rss"), "rss", parser=parser)
+
+    assert result["error"] is None
+    entries = result["entries"]
+    assert [entry["link"] for entry in entries] == [f"https://example.com/rss/{i}" for i in range(5)]
+    assert entries[0]["title"] == "rss 熱門文章 0：夏季防曬與保濕全攻略"
+    assert entries[0]["id"] == "https://example.com/rss/0"
+    assert tuple(entries[0]["published_parsed"])[:4] == (2026, 6, 1, 0)
+
+
+def test_rss_stream_parser_stops_reading_after_limit(fixture_server):
+    body = make_rss(n_items=500, body_chars=2000)
+    base, _ = fixture_server({"/feed": {"body": body}})
+    connector = get_connector("rss")
+    from urllib.request import urlopen
+
+    with urlopen(f"{base}/feed", timeout=5) as response:
+        entries, size = connector(response, time.monotonic() + 5, 3, "stream")
+
+    assert len(entries) == 3
+    assert size < len(body) / 10
+
+
+def test_atom_entries_use_alternate_link_and_parse_dates(fixture_server):
+    result = fetch(fixture_server, make_atom(8), "atom", limit=3)
+
+    assert result["error"] is None
+    entries = result["entries"]
+    assert len(entries) == 3
+    assert entries[0]["link"] == "https://example.com/atom/0"
+    assert entries[0]["id"] == "tag:example.com,2026:0"
+    assert entries[0]["summary"] == "摘要 0"
+    # +08:00 轉為 UTC
+    assert tuple(entries[0]["published_parsed"])[:4] == (2026, 6, 9, 0)
+    assert tuple(entries[0]["updated_parsed"])[:4] == (2026, 6, 9, 9)
+
+
+def test_malformed_xml_falls_back_to_feedparser(fixture_server):
+    body = make_rss(n_items=6, body_chars=50).replace(b"</channel></rss>", b"<item><title>broken & unescaped")
+    result = fetch(fixture_server, body, "rss", limit=10)
+
+    assert result["error"] is None
+    links = [entry.get("link") for entry in result["entries"]]
+    assert links[:6] == [f"https://example.com/bench/{i}" for i in range(6)]
+
+
+def test_non_feed_body_returns_no_entries(fixture_server):
+    result = fetch(fixture_server, b"<html><body>503 maintenance</body></html>", "rss",
+                   content_type="text/html")
+
+    assert result["error"] is None
+    assert result["entries"] == []
+
+
+# ================= JSON Feed =================
+
+
+def test_json_feed_items_and_limit(fixture_server):
+    result = fetch(fixture_server, make_json_feed(n_items=30, tag="json"), "jsonfeed", limit=4)
+
+    assert result["error"] is None
+    entries = result["entries"]
+    assert [entry["link"] for entry in entries] == [f"https://example.com/json/{i}" for i in range(4)]
+    assert entries[0]["title"] == "json 熱門文章 0：夏季防曬與保濕全攻略"
+    assert entries[0]["summary"].startswith("美妝保養")
+    assert tuple(entries[1]["published_parsed"])[:4] == (2026, 5, 31, 23)
+
+
+def test_json_feed_without_title_uses_content_text(fixture_server):
+    body = b'{"version": "https://jsonfeed.org/version/1.1", "items": [{"id": "1", "url": "https://e/1", "content_text": "only text"}]}'
+    entries = fetch(fixture_server, body, "jsonfeed")["entries"]
+
+    assert entries[0]["title"] == "only text"
+    assert "published_parsed" not in entries[0]
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2, 3]"])
+def test_malformed_json_feed_is_reported_as_error(fixture_server, body):
+    result = fetch(fixture_server, body, "jsonfeed")
+
+    assert result["entries"] == []
+    assert result["error"].startswith("ValueError: JSON Feed 格式錯誤")
+    assert result["retryable"] is False
+
+
+# ================= Sitemap =================
+
+
+def test_sitemap_keeps_newest_urls_regardless_of_document_order(fixture_server):
+    result = fetch(fixture_server, make_sitemap(n_urls=200, tag="map"), "sitemap", limit=5)
+
+    assert result["error"] is None
+    assert [entry["link"] for entry in result["entries"]] == [f"https://example.com/map/{i}" for i in range(5)]
+    assert result["entries"][0]["title"] == "map 熱門文章 0：夏季防曬與保濕全攻略"
+
+
+def test_sitemap_without_news_title_derives_title_from_url(fixture_server):
+    body = (b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b"<url><loc>https://example.com/2026/summer-skin_care.html</loc><lastmod>2026-06-01</lastmod></url>"
+            b"<url><lastmod>2026-06-02</lastmod></url>"
+            b"</urlset>")
+    entries = fetch(fixture_server, body, "sitemap")["entries"]
+
+    assert len(entries) == 1        # 沒有 <loc> 的項目略過
+    assert entries[0]["title"] == "summer skin care"
+    assert tuple(entries[0]["updated_parsed"])[:3] == (2026, 6, 1)
+
+
+def test_sitemap_index_is_rejected(fixture_server):
+    body = (b'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b"<sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap></sitemapindex>")
+    result = fetch(fixture_server, body, "sitemap")
+
+    assert "不支援 sitemap index" in result["error"]
+
+
+def test_malformed_sitemap_is_reported_as_error(fixture_server):
+    result = fetch(fixture_server, b"<urlset><url><loc>https://e/1</loc></url>", "sitemap")
+
+    assert result["entries"] == []
+    assert result["error"].startswith("ParseError")
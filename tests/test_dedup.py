@@ -0,0 +1,33 @@
+"""跨來源去重 (hotnews/dedup.py)：轉載標題合併，數字不同的標題不合併。"""
+from hotnews.dedup import DedupIndex, numeric_tokens
+
+
+def test_numeric_tokens_ignore_site_suffix_and_leading_zeros():
+    assert numeric_tokens("今日星座運勢 10/06 - 妞新聞") == ("10", "6")
+    assert numeric_tokens("２０２６ 秋冬保養") == ("2026",)
+    assert numeric_tokens("夏季防曬全攻略") == ()
+
+
+def test_reprints_with_site_suffix_are_merged():
+    index = DedupIndex()
+    first = index.add("a", "夏季防曬全攻略：SPF 與 PA 怎麼挑", "https://example.com/a")
+    assert index.add("b", "夏季防曬全攻略！SPF與PA怎麼挑 - BEAUTY美人圈", "https://other.com/b") == first
+
+
+def test_titles_differing_only_in_numbers_are_not_merged():
+    index = DedupIndex()
+    clusters = [
+        index.add("a", "今日星座運勢 10/16", "https://example.com/a"),
+        index.add("b", "今日星座運勢 10/17", "https://example.com/b"),
+        index.add("c", "2026 秋冬必買唇膏 TOP 10", "https://example.com/c"),
+        index.add("d", "2026 秋冬必買唇膏 TOP 5", "https://example.com/d"),
+    ]
+    assert len(set(clusters)) == 4
+    # 同一天的轉載仍會合併
+    assert index.add("e", "今日星座運勢 10/16｜妞新聞", "https://other.com/e") == clusters[0]
+
+
+def test_same_url_is_merged_regardless_of_title():
+    index = DedupIndex()
+    first = index.add("a", "今日星座運勢 10/16", "https://www.example.com/a?utm_source=fb")
+    assert index.add("b", "今日星座運勢 10/17", "https://example.com/a") == first
@@ -0,0 +1,72 @@
+"""條件式請求快取 (hotnews/feed_cache.py)：快取的文章數與請求的 limit。"""
+import json
+import sqlite3
+
+from benchmarks.fixtures import make_rss
+from hotnews.feed_cache import FeedCache
+from hotnews.feeds import fetch_feed
+
+
+def fetch(cache, url, limit):
+    return fetch_feed("site", url, timeout=5, cache=cache, limit=limit)
+
+
+def test_smaller_limit_is_not_served_to_larger_request(fixture_server, tmp_path):
+    base, hits = fixture_server({"/feed": {"body": make_rss(n_items=30, body_chars=200)}})
+    cache = FeedCache(str(tmp_path / "cache.sqlite3"))
+    url = f"{base}/feed"
+
+    first = fetch(cache, url, 5)
+    assert (first["cache"], len(first["entries"])) == ("miss", 5)
+
+    # 只快取了 5 篇：需要 20 篇時重新下載，而不是拿 TTL 內的 5 篇
+    second = fetch(cache, url, 20)
+    assert (second["cache"], len(second["entries"])) == ("miss", 20)
+    assert hits["/feed"] == 2
+
+    # 快取已有 20 篇：較小或相同的 limit 都直接命中
+    assert [(r["cache"], len(r["entries"])) for r in (fetch(cache, url, 20), fetch(cache, url, 5))] == \
+        [("hit", 20), ("hit", 5)]
+    assert hits["/feed"] == 2
+    assert cache.stats()["fresh_hits"] == 2
+
+
+def test_short_feed_covers_any_limit(fixture_server, tmp_path):
+    base, hits = fixture_server({"/feed": {"body": make_rss(n_items=3, body_chars=200)}})
+    cache = FeedCache(str(tmp_path / "cache.sqlite3"))
+    url = f"{base}/feed"
+
+    assert len(fetch(cache, url, 5)["entries"]) == 3
+    # 以 limit 5 讀完整份來源只有 3 篇，代表來源本身只有 3 篇
+    result = fetch(cache, url, 20)
+    assert (result["cache"], len(result["entries"])) == ("hit", 3)
+    assert hits["/feed"] == 1
+
+
+def test_old_cache_without_limit_column_is_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE feeds (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, entries TEXT NOT NULL,
+                            body_size INTEGER NOT NULL DEFAULT 0, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)
+    """)
+    conn.execute("INSERT INTO feeds VALUES ('u', NULL, NULL, ?, 10, 0, 0)", ('[{"title": "a"}]',))
+    conn.commit()
+    conn.close()
+
+    cache = FeedCache(path)
+    cached = cache.get("u")
+    assert cached["limit"] is None
+    # 不知道當時的 limit：只有文章數足夠時才能使用
+    assert cache.covers(cached, 1) and not cache.covers(cached, 2)
+
+
+def test_eviction_counts_bytes_not_characters(tmp_path):
+    entries = [{"title": "夏季防曬與保濕全攻略" * 10}]
+    stored = len(json.dumps(entries, ensure_ascii=False))
+    # 以字元數計算時兩筆都放得下，以 UTF-8 位元組計算時只能保留最新的一筆
+    cache = FeedCache(str(tmp_path / "cache.sqlite3"), max_bytes=stored * 2)
+    cache.store("old", None, None, entries, 0, 20)
+    cache.store("new", None, None, entries, 0, 20)
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
@@ -0,0 +1,149 @@
+"""並行抓取引擎 (hotnews/feeds.py)：主機禮貌限制、單一來源逾時與整批期限。"""
+import threading
+import time
+
+from benchmarks.fixtures import make_rss
+from hotnews import feeds as feeds_module
+from hotnews.feeds import HostThrottle, fetch_all_feeds, fetch_report_articles
+from hotnews.sources import Source, SourceRegistry
+
+BODY = make_rss(n_items=10, body_chars=200)
+
+
+def make_registry(feeds, **options):
+    options.setdefault("retries", 0)
+    return SourceRegistry([Source(name=name, url=url, **options) for name, url in feeds.items()])
+
+
+def fetch(feeds, registry=None, **options):
+    options.setdefault("throttle", HostThrottle(min_interval=0, max_concurrency=1))
+    return fetch_all_feeds(feeds, registry=registry or make_registry(feeds), cache=False, **options)
+
+
+def test_host_throttle_serializes_and_spaces_requests_per_host():
+    throttle = HostThrottle(min_interval=0.1, max_concurrency=1)
+    entered = []
+    active = {"a": 0, "b": 0}
+    max_active = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def worker(host):
+        with throttle.slot(host):
+            with lock:
+                entered.append((host, time.monotonic()))
+                active[host] += 1
+                max_active[host] = max(max_active[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    threads = [threading.Thread(target=worker, args=(host,)) for host in ("a", "a", "a", "b", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_active == {"a": 1, "b": 1}
+    for host in ("a", "b"):
+        times = sorted(t for h, t in entered if h == host)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert all(gap >= 0.09 for gap in gaps), gaps
+    # 不同主機互不等待：b 的第一個請求不需要排在 a 的三個請求之後
+    first_a = min(t for h, t in entered if h == "a")
+    first_b = min(t for h, t in entered if h == "b")
+    assert abs(first_b - first_a) < 0.09
+
+
+def test_fetch_all_feeds_serializes_same_host_but_parallelizes_hosts(fixture_server):
+    base, hits = fixture_server({f"/feed{i}": {"body": BODY, "delay": 0.3} for i in range(4)})
+    same_host = {f"s{i}": f"{base}/feed{i}" for i in range(2)}
+    # localhost 與 127.0.0.1 是不同的主機名稱，各自有獨立的連線限制
+    other_host = {f"o{i}": f"{base.replace('127.0.0.1', 'localhost')}/feed{i + 2}" for i in range(2)}
+
+    started = time.monotonic()
+    results = fetch({**same_host, **other_host})
+    elapsed = time.monotonic() - started
+
+    assert [r["error"] for r in results] == [None] * 4
+    assert all(len(r["entries"]) == 5 for r in results)
+    # 每個主機兩個請求依序執行 (約 0.6 秒)，兩個主機同時進行
+    assert 0.55 <= elapsed < 1.1, elapsed
+    assert set(hits.values()) == {1}
+
+
+def test_feed_times_out_while_queued_behind_slow_request(fixture_server):
+    base, hits = fixture_server({"/slow": {"body": BODY, "delay": 0.8}, "/queued": {"body": BODY}})
+    feeds = {"slow": f"{base}/slow", "queued": f"{base}/queued"}
+    registry = SourceRegistry([
+        Source(name="slow", url=feeds["slow"], timeout=5, retries=0),
+        Source(name="queued", url=feeds["queued"], timeout=0.3, retries=0),
+    ])
+
+    results = {r["site"]: r for r in fetch(feeds, registry)}
+
+    assert results["slow"]["error"] is None
+    assert "等待主機空檔逾時" in results["queued"]["error"]
+    assert results["queued"]["latency"] is None      # 請求從未送出
+    assert hits["/queued"] == 0
+
+
+def test_global_deadline_caps_running_and_queued_feeds(fixture_server):
+    base, hits = fixture_server({f"/feed{i}": {"body": BODY, "delay": 0.5} for i in range(3)})
+    feeds = {f"f{i}": f"{base}/feed{i}" for i in range(3)}
+
+    started = time.monotonic()
+    results = fetch(feeds, deadline=0.8)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.2, elapsed
+    assert [r["site"] for r in results] == list(feeds)
+    assert results[0]["error"] is None
+    # 進行中的請求以剩餘期限為逾時，排隊中的來源不再送出請求
+    assert all(r["error"].startswith("TimeoutError") for r in results[1:])
+    time.sleep(0.6)
+    assert hits["/feed2"] == 0
+
+
+def test_global_deadline_abandons_overrunning_and_queued_feeds(monkeypatch):
+    # 模擬不遵守逾時的請求 (例如卡在 DNS 解析)：期限到時整批直接回傳，尚未開始的工作被取消
+    calls = []
+
+    def stuck_fetch_feed(site, url, *args):
+        calls.append(site)
+        time.sleep(0.5)
+        return {"site": site, "url": url, "entries": [], "elapsed": 0.5, "latency": 0.5, "error": None,
+                "cache": None, "retryable": False}
+
+    monkeypatch.setattr(feeds_module, "fetch_feed", stuck_fetch_feed)
+    feeds = {f"f{i}": f"http://127.0.0.1:9/{i}" for i in range(4)}
+
+    started = time.monotonic()
+    results = fetch(feeds, deadline=0.8, max_workers=1)
+    elapsed = time.monotonic() - started
+
+    assert 0.75 <= elapsed < 1.0, elapsed
+    assert results[0]["error"] is None
+    assert [r["error"] for r in results[1:]] == ["TimeoutError: 超過整批抓取期限"] * 3
+    time.sleep(0.4)
+    assert calls == ["f0", "f1"]
+
+
+def test_failed_feed_does_not_affect_others(fixture_server):
+    base, _ = fixture_server({"/ok": {"body": BODY}, "/broken": {"body": BODY, "status": 404}})
+    results = {r["site"]: r for r in fetch({"ok": f"{base}/ok", "broken": f"{base}/broken"})}
+
+    assert results["ok"]["error"] is None and len(results["ok"]["entries"]) == 5
+    assert "404" in results["broken"]["error"]
+    assert results["broken"]["retryable"] is False
+
+
+def test_report_articles_honour_limit(fixture_server):
+    base, _ = fixture_server({"/a": {"body": BODY}, "/b": {"body": BODY}})
+    feeds = {"a": f"{base}/a", "b": f"{base}/b"}
+    throttle = HostThrottle(min_interval=0, max_concurrency=1)
+    options = dict(registry=make_registry(feeds), cache=False, throttle=throttle)
+
+    articles, stats = fetch_report_articles(feeds, limit=8, **options)
+    assert len(articles) == 16 and {s["count"] for s in stats.values()} == {8}
+    articles, stats = fetch_report_articles(feeds, **options)
+    assert len(articles) == 10 and {s["count"] for s in stats.values()} == {5}
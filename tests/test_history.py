@@ -0,0 +1,94 @@
+"""欄式歷史 (hotnews/history.py)：latest_per_source 讀取的分割範圍，以及讀取與合併同時進行。"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+from hotnews import history as history_module
+from hotnews.history import LATEST_LOOKBACK_DAYS, ColumnarHistory
+from hotnews.models import Article
+
+START = datetime(2026, 6, 1, 8, tzinfo=timezone.utc)
+
+
+def article(site, i, first_seen):
+    return Article(f"{site}-{i}", site, f"{site} 文章 {i}", f"https://example.com/{site}/{i}", "", None, first_seen)
+
+
+def make_history(tmp_path, days=60):
+    history = ColumnarHistory(str(tmp_path / "history"))
+    # 「停更」只在最早的一天有文章，「日更」每天一篇
+    history.append([article("停更", 0, START)])
+    history.append([article("日更", i, START + timedelta(days=i)) for i in range(days)])
+    return history
+
+
+def count_reads(history, monkeypatch):
+    read = []
+    original = history.read_day
+    monkeypatch.setattr(history, "read_day", lambda day, columns=None: read.append(day) or original(day, columns))
+    return read
+
+
+def test_stops_once_every_site_has_n_articles(tmp_path, monkeypatch):
+    history = make_history(tmp_path)
+    read = count_reads(history, monkeypatch)
+    latest = history.latest_per_source(5, ["日更"])
+    assert [a.key for a in latest] == [f"日更-{i}" for i in range(59, 54, -1)]
+    assert len(read) == 5
+
+
+def test_dead_source_does_not_force_full_scan(tmp_path, monkeypatch):
+    history = make_history(tmp_path)
+    read = count_reads(history, monkeypatch)
+    latest = history.latest_per_source(5, ["日更", "停更"])
+    assert len(read) == LATEST_LOOKBACK_DAYS + 1
+    assert {a.site for a in latest} == {"日更"}
+
+    # 不限制回溯時仍可讀完整個歷史
+    read.clear()
+    latest = history.latest_per_source(5, ["日更", "停更"], lookback_days=None)
+    assert len(read) == 60
+    assert [a.key for a in latest if a.site == "停更"] == ["停更-0"]
+
+
+def test_all_sites_scan_is_bounded(tmp_path, monkeypatch):
+    history = make_history(tmp_path)
+    read = count_reads(history, monkeypatch)
+    history.latest_per_source(5)
+    assert len(read) == LATEST_LOOKBACK_DAYS + 1
+
+
+def test_reads_during_compaction_see_each_article_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_module, "COMPACT_AFTER", 3)
+    history = ColumnarHistory(str(tmp_path / "history"))
+    batches, batch_size = 60, 5
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        try:
+            for b in range(batches):
+                history.append([article("site", b * batch_size + i, START) for i in range(batch_size)])
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    day = START.strftime("%Y-%m-%d")
+    seen = []
+    while not done.is_set():
+        try:
+            keys = history.read_day(day, ["key"]).column("key").to_pylist()
+            counted = history.count()
+        except Exception as exc:
+            errors.append(exc)
+            break
+        # 讀到的每篇文章只出現一次，且數量只增不減
+        assert len(keys) == len(set(keys))
+        assert counted >= len(keys)
+        seen.append(len(keys))
+    thread.join()
+    assert errors == []
+    assert seen == sorted(seen)
+    assert history.count() == batches * batch_size
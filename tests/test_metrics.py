@@ -0,0 +1,39 @@
+"""效能量測 (hotnews/metrics.py)：各 session 的統計基準與程序層級的分析器鎖。"""
+import pytest
+
+from hotnews.metrics import Metrics, ProfilerBusy, RunProfiler
+
+
+def test_snapshot_since_only_counts_changes_after_baseline():
+    metrics = Metrics(enabled=True)
+    metrics.observe("render", 0.5, ratio="1:1")
+    metrics.count("feed_fetches", 3, source="a")
+    baseline = metrics.snapshot()
+
+    metrics.observe("render", 0.25, ratio="1:1")
+    metrics.observe("search", 0.1)
+    metrics.count("feed_fetches", 2, source="a")
+
+    since = metrics.snapshot_since(baseline)
+    assert [(s["name"], s["count"], s["total"], s["max"]) for s in since["spans"]] == [
+        ("render", 1, 0.25, None), ("search", 1, 0.1, None),
+    ]
+    assert since["counters"] == [{"name": "feed_fetches", "labels": {"source": "a"}, "value": 2}]
+    # 其他 session 看到的累計值不受影響
+    assert metrics.snapshot()["spans"][0]["count"] == 2
+    assert metrics.snapshot_since(metrics.snapshot()) == {"spans": [], "counters": []}
+
+
+def test_only_one_profiler_runs_at_a_time():
+    first = RunProfiler(trace_memory=False).start()
+    try:
+        with pytest.raises(ProfilerBusy):
+            RunProfiler(trace_memory=False).start()
+    finally:
+        first.stop()
+    assert "function calls" in first.stats_text
+    first.stop()    # 重複呼叫不會再次釋放鎖
+
+    second = RunProfiler(trace_memory=False).start()
+    second.stop()
+    assert not second.running
@@ -0,0 +1,129 @@
+"""背景輪詢器 (hotnews/poller.py)：以假時鐘驅動 tick()，檢查排程、失敗退避與增量寫入。"""
+import pytest
+
+from benchmarks.fixtures import make_rss
+from hotnews.poller import FeedPoller
+from hotnews.store import ArticleStore
+
+START = 1_780_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class StubFetcher:
+    """與 fetch_all_feeds 相同介面；failing 中的來源回傳錯誤，其餘每次回傳相同的兩篇文章。"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def __call__(self, feeds, **options):
+        self.calls.append(sorted(feeds))
+        results = []
+        for site, url in feeds.items():
+            failed = site in self.failing
+            entries = [] if failed else [
+                {"id": f"{url}/{i}", "title": f"{site} 文章 {i}", "link": f"{url}/{i}"} for i in range(2)
+            ]
+            results.append({"site": site, "url": url, "entries": entries, "elapsed": 0.1,
+                            "error": "HTTPError: 503" if failed else None})
+        return results
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / "articles.sqlite3"))
+
+
+def make_poller(store, fetcher, clock, intervals, **options):
+    feeds = {site: f"https://{site}.example.com/feed" for site in intervals}
+    return FeedPoller(feeds, store=store, intervals=intervals, clock=clock, fetcher=fetcher, cache=False,
+                      **options)
+
+
+def test_feeds_come_due_at_their_own_intervals(store):
+    clock, fetcher = FakeClock(), StubFetcher()
+    poller = make_poller(store, fetcher, clock, {"fast": 60, "slow": 300})
+
+    assert poller.tick() == {"fast": 2, "slow": 2}
+    clock.now += 59
+    assert poller.tick() == {}
+    clock.now += 1
+    poller.tick()
+    clock.now += 240
+    poller.tick()
+    assert fetcher.calls == [["fast", "slow"], ["fast"], ["fast", "slow"]]
+    assert poller.seconds_until_next() == 60
+
+
+def test_failures_back_off_exponentially_up_to_max_and_reset_on_success(store):
+    clock, fetcher = FakeClock(), StubFetcher()
+    poller = make_poller(store, fetcher, clock, {"site": 100}, max_backoff=350)
+    fetcher.failing.add("site")
+
+    delays = []
+    for _ in range(3):
+        poller.tick()
+        state = poller.status()["site"]
+        delays.append(state["next_due"] - clock.now)
+        clock.now = state["next_due"]
+    # 100 * 2^1、100 * 2^2 (上限 350)、上限 350
+    assert delays == [200, 350, 350]
+    assert poller.status()["site"]["failures"] == 3
+    assert poller.status()["site"]["last_error"] == "HTTPError: 503"
+
+    fetcher.failing.clear()
+    assert poller.tick() == {"site": 2}
+    state = poller.status()["site"]
+    assert (state["failures"], state["last_error"], state["next_due"] - clock.now) == (0, None, 100)
+
+
+def test_second_tick_over_same_feed_inserts_nothing(store, fixture_server):
+    base, hits = fixture_server({"/feed": {"body": make_rss(n_items=8, body_chars=100)}})
+    clock = FakeClock()
+    poller = FeedPoller({"site": f"{base}/feed"}, store=store, intervals={"site": 60}, clock=clock, cache=False)
+
+    assert poller.tick() == {"site": 8}
+    clock.now += 60
+    assert poller.tick() == {"site": 0}
+    assert hits["/feed"] == 2
+    assert store.count() == 8
+
+
+def test_store_error_is_recorded_per_site(store, monkeypatch):
+    clock, fetcher = FakeClock(), StubFetcher()
+    poller = make_poller(store, fetcher, clock, {"a": 100, "b": 100, "c": 100})
+    add_entries = store.add_entries
+
+    def locked_for_b(site, entries, now=None):
+        if site == "b":
+            raise RuntimeError("database is locked")
+        return add_entries(site, entries, now=now)
+
+    monkeypatch.setattr(store, "add_entries", locked_for_b)
+    assert poller.tick() == {"a": 2, "c": 2}
+    status = poller.status()
+    assert status["b"]["last_error"] == "RuntimeError: database is locked"
+    assert status["b"]["failures"] == 1
+    assert status["b"]["next_due"] == clock.now + 200
+    assert status["c"]["next_due"] == clock.now + 100
+    # 失敗的來源已安排退避，不會立刻再被抓取
+    assert poller.due_sites() == []
+
+
+def test_fetcher_crash_backs_off_every_requested_site(store):
+    clock = FakeClock()
+
+    def broken_fetcher(feeds, **options):
+        raise OSError("too many open files")
+
+    poller = make_poller(store, broken_fetcher, clock, {"a": 100, "b": 100})
+    assert poller.tick() == {}
+    assert {site: state["failures"] for site, state in poller.status().items()} == {"a": 1, "b": 1}
+    assert poller.due_sites() == []
@@ -0,0 +1,159 @@
+"""重試、退避與熔斷 (hotnews/sources.py 的 CircuitBreaker 與 hotnews/feeds.py 的 fetch_source)，以假時鐘測試。"""
+import pytest
+
+from hotnews import feeds
+from hotnews.feeds import fetch_source
+from hotnews.sources import CircuitBreaker, Source, SourceRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_breaker_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    clock.now += 20
+    assert breaker.retry_in() == pytest.approx(40)
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_probe_then_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.state == "half_open"
+
+    assert breaker.allow()          # 試探請求
+    assert not breaker.allow()      # 結果回報前不放行第二個
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0 and breaker.retry_in() == 0.0
+
+
+def test_half_open_probe_failure_reopens_for_a_full_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 61
+    assert breaker.allow()
+    clock.now += 5
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.retry_in() == pytest.approx(60)
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.state == "half_open"
+
+
+# ================= fetch_source =================
+
+
+def scripted_fetch_feed(outcomes, calls):
+    """依序回傳 outcomes 中的結果："ok"、"retryable" 或 "fatal"。"""
+    outcomes = iter(outcomes)
+
+    def fetch_feed(site, url, timeout, *args):
+        calls.append(timeout)
+        outcome = next(outcomes)
+        return {
+            "site": site, "url": url, "entries": [{"title": "t"}] if outcome == "ok" else [],
+            "elapsed": 0.0, "latency": 0.1,
+            "error": None if outcome == "ok" else f"{outcome} error",
+            "cache": None, "retryable": outcome == "retryable",
+        }
+
+    return fetch_feed
+
+
+def run(monkeypatch, clock, source, outcomes, **options):
+    calls = []
+    monkeypatch.setattr(feeds, "fetch_feed", scripted_fetch_feed(outcomes, calls))
+    registry = options.pop("registry", None) or SourceRegistry([source])
+    result = fetch_source(source, registry, clock=clock, sleep=clock.sleep, **options)
+    return result, calls, registry
+
+
+def test_retries_transient_errors_with_exponential_backoff(monkeypatch, clock):
+    source = Source(name="s", url="http://s", retries=3, backoff=1.0)
+    result, calls, _ = run(monkeypatch, clock, source, ["retryable", "retryable", "ok"])
+
+    assert result["error"] is None
+    assert result["attempts"] == 3
+    assert clock.sleeps == [1.0, 2.0]
+    assert result["elapsed"] == pytest.approx(3.0)
+
+
+def test_retries_stop_at_the_configured_limit(monkeypatch, clock):
+    source = Source(name="s", url="http://s", retries=2, backoff=0.5)
+    result, calls, registry = run(monkeypatch, clock, source, ["retryable"] * 10)
+
+    assert result["attempts"] == 3 and len(calls) == 3
+    assert clock.sleeps == [0.5, 1.0]
+    assert registry.breakers["s"].failures == 1      # 一次 fetch_source 只算一次失敗
+
+
+def test_non_retryable_errors_are_not_retried(monkeypatch, clock):
+    source = Source(name="s", url="http://s", retries=3)
+    result, calls, _ = run(monkeypatch, clock, source, ["fatal", "ok"])
+
+    assert result["error"] == "fatal error"
+    assert result["attempts"] == 1
+    assert clock.sleeps == []
+
+
+def test_backoff_never_sleeps_past_the_deadline(monkeypatch, clock):
+    source = Source(name="s", url="http://s", timeout=10, retries=5, backoff=1.0)
+    result, calls, _ = run(monkeypatch, clock, source, ["retryable"] * 10, deadline=clock() + 3.5)
+
+    # 等待 1、2 秒後，下一次需要 4 秒會超過期限，直接放棄
+    assert clock.sleeps == [1.0, 2.0]
+    assert result["attempts"] == 3
+    # 每次請求的逾時不超過剩餘期限
+    assert calls == [3.5, 2.5, 0.5]
+
+
+def test_open_breaker_skips_requests_until_cooldown_ends(monkeypatch, clock):
+    source = Source(name="s", url="http://s", retries=0, failure_threshold=2, cooldown=300)
+    registry = SourceRegistry([source])
+    registry.breakers["s"] = CircuitBreaker(2, 300, clock=clock)
+
+    for _ in range(2):
+        run(monkeypatch, clock, source, ["fatal"], registry=registry)
+    result, calls, _ = run(monkeypatch, clock, source, ["ok"], registry=registry)
+    assert result["skipped"] and result["attempts"] == 0 and calls == []
+    assert result["error"].startswith("CircuitOpen")
+    assert registry.health["s"].snapshot()["skipped"] == 1
+
+    clock.now += 300
+    result, calls, _ = run(monkeypatch, clock, source, ["ok"], registry=registry)
+    assert result["error"] is None and len(calls) == 1
+    assert registry.breakers["s"].state == "closed"
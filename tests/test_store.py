@@ -0,0 +1,113 @@
+"""文章庫 (hotnews/store.py)：SQLite 交易與記憶體索引、欄式歷史的一致性，以及多來源轉載。"""
+import sqlite3
+
+import pytest
+
+from hotnews import store as store_module
+from hotnews.store import ArticleStore, latest_report
+
+ENTRIES = [
+    {"id": "a", "title": "夏季防曬全攻略：SPF 與 PA 怎麼挑", "link": "https://example.com/a"},
+    {"id": "b", "title": "夏季防曬全攻略：SPF 與 PA 怎麼挑｜妞新聞", "link": "https://example.com/b"},
+    {"id": "c", "title": "秋冬保濕精華推薦", "link": "https://example.com/c"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / "articles.sqlite3"))
+
+
+def test_failed_write_leaves_indexes_and_history_untouched(store, monkeypatch):
+    calls = []
+
+    def failing_index_article(conn, site, key, title, summary):
+        calls.append(key)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store_module, "index_article", failing_index_article)
+    with pytest.raises(RuntimeError):
+        store.add_entries("site", ENTRIES, now=1_780_000_000)
+
+    assert store.count() == 0
+    assert len(store.dedup_index()) == 0
+    assert store.trend_tracker().hot_articles(10, now=1_780_000_000) == []
+    assert store.history.count() == 0
+
+    # 交易已回復，同一批文章可以重新寫入
+    monkeypatch.undo()
+    assert store.add_entries("site", ENTRIES, now=1_780_000_000) == 3
+    assert len(store.dedup_index()) == 3
+    assert store.history.count() == 3
+
+
+def test_clusters_are_written_after_commit(store):
+    store.add_entries("site", ENTRIES, now=1_780_000_000)
+    clusters = {article.key: article.cluster for article in store.latest_per_source(5)}
+    assert clusters["b"] == clusters["a"] != clusters["c"]
+    with store._connect() as conn:
+        assert dict(conn.execute("SELECT key, cluster FROM articles")) == clusters
+
+
+def test_failed_history_append_is_retried_and_reconciled(tmp_path, monkeypatch):
+    path = str(tmp_path / "articles.sqlite3")
+    store = ArticleStore(path)
+    append = store.history.append
+
+    def failing_append(articles):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store.history, "append", failing_append)
+    with pytest.raises(OSError):
+        store.add_entries("site", ENTRIES[:2], now=1_780_000_000)
+    assert store.count() == 2
+    assert store.history.count() == 0
+
+    # 同一程序內的下一次追加會一併補上先前失敗的文章
+    monkeypatch.setattr(store.history, "append", append)
+    assert store.add_entries("site", ENTRIES[2:], now=1_780_000_000) == 1
+    assert store.history.count() == 3
+
+    # 程序在追加歷史前中斷時，下次啟動由 SQLite 補寫
+    monkeypatch.setattr(store.history, "append", failing_append)
+    with pytest.raises(OSError):
+        store.add_entries("other", [{"id": "d", "title": "秋季旅遊景點", "link": "https://example.com/d"}],
+                          now=1_780_086_400)
+    reopened = ArticleStore(path)
+    assert reopened.history.count() == reopened.count() == 4
+    assert {article.key for article in reopened.latest_per_source(5)} == set("abcd")
+
+
+def test_syndicated_article_is_listed_under_every_source(store):
+    entry = {"id": "https://example.com/a", "title": "夏季防曬全攻略", "link": "https://example.com/a"}
+    assert store.add_entries("妞新聞", [entry], now=1_780_000_000) == 1
+    assert store.add_entries("女人我最大", [entry], now=1_780_000_000) == 1
+    assert store.add_entries("女人我最大", [entry], now=1_780_000_060) == 0
+
+    report = latest_report(store)
+    assert len(report) == 1
+    assert set(report.loc[0, "來源"].split("、")) == {"妞新聞", "女人我最大"}
+    assert {article.site for article in store.search("防曬")} == {"妞新聞", "女人我最大"}
+    hot = store.trend_tracker().hot_articles(5, now=1_780_000_000)
+    assert [set(article["sources"]) for article in hot] == [{"妞新聞", "女人我最大"}]
+
+
+def test_single_key_schema_is_migrated(tmp_path):
+    path = str(tmp_path / "articles.sqlite3")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE articles (key TEXT PRIMARY KEY, site TEXT NOT NULL, title TEXT NOT NULL,
+                                   link TEXT NOT NULL, summary TEXT NOT NULL DEFAULT '',
+                                   published REAL, first_seen REAL NOT NULL)
+        """)
+        conn.execute("INSERT INTO articles VALUES ('a', '妞新聞', '夏季防曬全攻略', 'https://example.com/a', '', NULL, 1780000000)")
+        conn.execute("CREATE VIRTUAL TABLE article_search USING fts5(key UNINDEXED, title, summary)")
+    conn.close()
+
+    store = ArticleStore(path)
+    assert store.add_entries("女人我最大", [{"id": "a", "title": "夏季防曬全攻略", "link": "https://example.com/a"}],
+                             now=1_780_000_060) == 1
+    assert store.count() == store.history.count() == 2
+    assert {article.site for article in store.search("防曬")} == {"妞新聞", "女人我最大"}
@@ -0,0 +1,36 @@
+"""Prompt 模板引擎 (hotnews/templates.py)：過濾器名稱與參數在編譯時檢查。"""
+import pytest
+
+from hotnews.templates import TemplateError, compile_template
+
+
+def test_filters_apply_in_order():
+    template = compile_template("{{ a | strip | truncate:4 }}/{{ b | default:未定 }}")
+    assert template.render({"a": "  abcdef  "}) == "abc…/未定"
+
+
+@pytest.mark.parametrize("text, message", [
+    ("{{a|truncate:abc}}", "參數「abc」無效"),
+    ("{{a|truncate:0}}", "參數「0」無效"),
+    ("{{a|truncate:-3}}", "參數「-3」無效"),
+    ("{{a|truncate:5:6}}", "參數「5:6」無效"),
+    ("{{a|upper:5}}", "不接受參數"),
+    ("{{a|raw:yes}}", "不接受參數"),
+    ("{{a|upper|shout}}", "未知的過濾器「shout」"),
+    ("{{ | upper}}", "變數名稱不可為空"),
+])
+def test_invalid_filters_fail_at_compile_time(text, message):
+    with pytest.raises(TemplateError, match=message):
+        compile_template(text)
+
+
+def test_truncate_without_argument_uses_default_length():
+    assert compile_template("{{a|truncate}}").render({"a": "x" * 60}) == "x" * 49 + "…"
+
+
+def test_pipe_is_part_of_name_unless_followed_by_a_filter():
+    # 舊版模板的變數名稱可以含有 |
+    template = compile_template("{{品牌|產品}} {{ 品牌|產品 | upper }} {{a|b|default:無}}")
+    assert template.variables == ["a|b", "品牌|產品"]
+    assert template.render({"品牌|產品": "Dior"}) == "Dior DIOR 無"
+    assert template.render({}) == "{{品牌|產品}} {{ 品牌|產品 | upper }} 無"